@@ -4,6 +4,10 @@ ASGI config for pms project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the site through this (e.g. ``gunicorn pms.asgi:application -k
+uvicorn.workers.UvicornWorker``) for the live dashboard streams under
+projects/live/; under WSGI they degrade to polling.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -186,6 +186,73 @@ SERVER_EMAIL = DEFAULT_FROM_EMAIL
 # Password reset token expiry (default is 3 days, we'll keep it)
 PASSWORD_RESET_TIMEOUT = 259200  # 3 days in seconds
 
+# Reporting rollup (projects.DailyMemberStats). When enabled, the timer/roster
+# write paths keep a per member, per day rollup up to date and reports covering
+# at least REPORTING_ROLLUP_MIN_DAYS days read from it. Schedule
+# `manage.py reconcile_daily_member_stats` nightly, and run it once with
+# --start-date before enabling to backfill history.
+REPORTING_ROLLUP_ENABLED = config('REPORTING_ROLLUP_ENABLED', default=False, cast=bool)
+REPORTING_ROLLUP_MIN_DAYS = config('REPORTING_ROLLUP_MIN_DAYS', default=90, cast=int)
+
+# Where running timers are kept (see projects/timers.py). The default uses the
+# ActiveTimer table only; 'projects.timers.CacheTimerBackend' serves them from
+# the ACTIVE_TIMER_CACHE cache alias, which should be a shared cache such as
+# Redis. Run `manage.py recover_active_timers` after the cache is cleared.
+ACTIVE_TIMER_BACKEND = config('ACTIVE_TIMER_BACKEND', default='projects.timers.DatabaseTimerBackend')
+ACTIVE_TIMER_CACHE = config('ACTIVE_TIMER_CACHE', default='default')
+
+# Timer audit log (projects/audit.py): entries are buffered and written with
+# one bulk insert when the transaction commits, or outside a transaction once
+# BATCH_SIZE entries or MAX_DELAY seconds have accumulated. Set
+# TIMER_AUDIT_LOG_SYNC to write each entry immediately instead.
+TIMER_AUDIT_LOG_SYNC = config('TIMER_AUDIT_LOG_SYNC', default=False, cast=bool)
+TIMER_AUDIT_LOG_BATCH_SIZE = config('TIMER_AUDIT_LOG_BATCH_SIZE', default=100, cast=int)
+TIMER_AUDIT_LOG_MAX_DELAY = config('TIMER_AUDIT_LOG_MAX_DELAY', default=5, cast=int)
+
+# Timers running longer than this many hours are auto-stopped at the cap by
+# `manage.py stop_stale_timers`; schedule it every few minutes.
+TIMER_MAX_SESSION_HOURS = config('TIMER_MAX_SESSION_HOURS', default=12, cast=int)
+
+# Live dashboard updates (Server-Sent Events, projects/live_views.py). Streams
+# need an ASGI server; under WSGI the browser polls every LIVE_POLL_RETRY_MS.
+# Change notifications go through LIVE_UPDATES_CACHE, which must be shared
+# between processes (e.g. Redis) for updates to arrive immediately.
+LIVE_UPDATES_CACHE = config('LIVE_UPDATES_CACHE', default='default')
+LIVE_STREAM_MAX_SECONDS = config('LIVE_STREAM_MAX_SECONDS', default=300, cast=int)
+LIVE_STREAM_RETRY_MS = config('LIVE_STREAM_RETRY_MS', default=3000, cast=int)
+LIVE_POLL_RETRY_MS = config('LIVE_POLL_RETRY_MS', default=10000, cast=int)
+# The DPMs' "who's working now" board is computed at most once per this many
+# seconds (and again as soon as a timer or logged time changes).
+WORKING_NOW_CACHE_SECONDS = config('WORKING_NOW_CACHE_SECONDS', default=5, cast=int)
+
+# Idempotency keys of the JSON timer API (projects/idempotency.py): responses
+# are remembered for IDEMPOTENCY_KEY_TTL seconds in IDEMPOTENCY_CACHE, which
+# should be shared between processes.
+IDEMPOTENCY_CACHE = config('IDEMPOTENCY_CACHE', default='default')
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=86400, cast=int)
+
+# Project lists: numbered pages stop at this page and "Next" continues with
+# keyset (cursor) pagination, which costs the same however deep the page is.
+CURSOR_PAGINATION_AFTER_PAGE = config('CURSOR_PAGINATION_AFTER_PAGE', default=5, cast=int)
+
+# Virtual roster (projects/roster.py): days without a DailyRoster row are shown
+# with their default status instead of writing a row when first read. Run
+# `manage.py prune_default_rosters` after enabling it to drop stored defaults.
+ROSTER_VIRTUAL_MODE = config('ROSTER_VIRTUAL_MODE', default=False, cast=bool)
+
+# Status classification (projects/status_registry.py): cached in
+# STATUS_REGISTRY_CACHE and reloaded at least every STATUS_REGISTRY_TTL seconds,
+# so processes that don't share the cache pick up status edits within that time.
+STATUS_REGISTRY_CACHE = config('STATUS_REGISTRY_CACHE', default='default')
+STATUS_REGISTRY_TTL = config('STATUS_REGISTRY_TTL', default=300, cast=int)
+
+# Holiday calendar (projects/holidays.py): each location's holidays are cached
+# a year at a time in HOLIDAY_CALENDAR_CACHE for HOLIDAY_CALENDAR_TTL seconds.
+# HOLIDAY_DEFAULT_LOCATION is the office used when no location is given.
+HOLIDAY_CALENDAR_CACHE = config('HOLIDAY_CALENDAR_CACHE', default='default')
+HOLIDAY_CALENDAR_TTL = config('HOLIDAY_CALENDAR_TTL', default=3600, cast=int)
+HOLIDAY_DEFAULT_LOCATION = config('HOLIDAY_DEFAULT_LOCATION', default='Gurgaon')
+
 # Configure warnings to help debug timezone issues
 # Just log warnings normally for now
 warnings.filterwarnings(
@@ -2,7 +2,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import ProductSubcategory, Product, ProjectStatusOption, Project, ProjectStatusHistory, ProductTask, ProjectTask, TaskAssignment
-from .models import ActiveTimer, TimeSession, DailyTimeTotal, TimerActionLog, DailyRoster, Holiday, ProjectDelivery, MiscHours
+from .models import ActiveTimer, TimeSession, DailyTimeTotal, TimeLedgerEntry, TimerActionLog, DailyRoster, Holiday, ProjectDelivery, MiscHours, IdSequence, DailyMemberStats
 
 
 @admin.register(ProductSubcategory)
@@ -432,15 +432,46 @@ class ActiveTimerAdmin(admin.ModelAdmin):
 
 @admin.register(TimeSession)
 class TimeSessionAdmin(admin.ModelAdmin):
+    """
+    Every change to logged time has to go through the time ledger, which the
+    admin would bypass, so the fields that count towards DailyTimeTotal are
+    read-only and sessions are added from the dashboard. Deleting is fine:
+    the post_delete signal records it in the ledger.
+    """
     list_display = ('assignment', 'team_member', 'date_worked', 'get_formatted_duration', 'session_type')
     list_filter = ('date_worked', 'session_type', 'team_member')
-    readonly_fields = ('created_at',)
+    readonly_fields = ('assignment', 'team_member', 'date_worked', 'duration_minutes', 'started_at', 'ended_at', 'created_at')
+
+    def has_add_permission(self, request):
+        return False
 
 @admin.register(DailyTimeTotal)
 class DailyTimeTotalAdmin(admin.ModelAdmin):
+    """
+    Totals are a projection of the time ledger; an edit here would be
+    overwritten by the next rebuild, so the minutes are read-only.
+    """
     list_display = ('assignment', 'team_member', 'date_worked', 'get_formatted_total', 'is_manually_edited')
     list_filter = ('date_worked', 'is_manually_edited', 'team_member')
-    readonly_fields = ('last_updated',)
+    readonly_fields = ('total_minutes', 'is_manually_edited', 'last_updated')
+
+@admin.register(TimeLedgerEntry)
+class TimeLedgerEntryAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the append-only time ledger.
+    """
+    list_display = ('assignment', 'team_member', 'date_worked', 'event_type', 'minutes_delta', 'created_at')
+    list_filter = ('event_type', 'date_worked')
+    search_fields = ('team_member__username', 'assignment__assignment_id')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 @admin.register(TimerActionLog)
 class TimerActionLogAdmin(admin.ModelAdmin):
@@ -456,6 +487,10 @@ class DailyRosterAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at')
     ordering = ('-date', 'team_member')
 
+    def get_queryset(self, request):
+        """Optimize query by annotating worked hours instead of querying per row."""
+        return super().get_queryset(request).select_related('team_member').with_hours()
+
 
 @admin.register(Holiday)
 class HolidayAdmin(admin.ModelAdmin):
@@ -522,4 +557,34 @@ class MiscHoursAdmin(admin.ModelAdmin):
         hours = obj.duration_minutes // 60
         minutes = obj.duration_minutes % 60
         return f"{hours:02d}:{minutes:02d}"
-    get_formatted_duration.short_description = 'Duration'
\ No newline at end of file
+    get_formatted_duration.short_description = 'Duration'
+
+@admin.register(IdSequence)
+class IdSequenceAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the identifier counters (HS_ID etc.).
+    Use the validate_hs_ids command to repair a sequence instead of editing it here.
+    """
+    list_display = ('name', 'last_value', 'updated_at')
+    readonly_fields = ('name', 'last_value', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(DailyMemberStats)
+class DailyMemberStatsAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the reporting rollup.
+    Rebuild it with the reconcile_daily_member_stats command instead of editing it here.
+    """
+    list_display = ('team_member', 'date', 'roster_status', 'assignment_minutes', 'misc_minutes', 'completed_assignments', 'refreshed_at')
+    list_filter = ('roster_status', 'date')
+    search_fields = ('team_member__username',)
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,188 @@
+# projects/api_views.py
+"""
+JSON endpoints for the team member dashboard's timer actions.
+
+Same actions as the dashboard's form POSTs (start/stop timer, add manual
+time, complete an assignment), but each answers with only what changed: the
+live state (running timer and today's totals, as in the live stream) and
+re-rendered fragments of the dashboard - the timer card, the stop timer
+form and the affected assignment rows (null for a row to remove). The page
+updates in place instead of redirecting and rebuilding the whole dashboard.
+
+Send an Idempotency-Key with every action so a double-click or a retry is
+only carried out once (see projects/idempotency.py).
+"""
+import functools
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from .forms import TimerStopForm, ManualTimeEntryForm
+from .idempotency import idempotent
+from .services import ProjectService
+from .timers import get_timer_backend
+
+
+def _team_member_action(view):
+    @login_required
+    @require_POST
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.user.role != 'TEAM_MEMBER':
+            return JsonResponse({'ok': False, 'error': "Timer actions are only for team members"}, status=403)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def _error(message, form=None):
+    payload = {'ok': False, 'error': message}
+    if form is not None:
+        payload['errors'] = {field: list(errors) for field, errors in form.errors.items()}
+    return JsonResponse(payload, status=400)
+
+
+def _changed(request, message, assignment_ids=(), timer_changed=False, warning=None):
+    """
+    The response to a successful action: the new live state plus the
+    dashboard fragments it changed.
+    """
+    team_member = request.user
+    success, state = ProjectService.get_live_state(team_member)
+    if not success:
+        return JsonResponse({'ok': False, 'error': state}, status=500)
+
+    active_timer = get_timer_backend().get(team_member)
+    row_ids = set(assignment_ids)
+    if active_timer:
+        # The rows and the timer card both need the running assignment
+        row_ids.add(active_timer.assignment_id)
+    assignments = ProjectService.get_dashboard_assignments(team_member, row_ids)
+
+    context = {'now': timezone.now(), 'active_timer': active_timer}
+    if active_timer:
+        active_timer.assignment = assignments.get(active_timer.assignment_id)
+        context['elapsed_time'] = ProjectService._get_elapsed_time(active_timer)
+
+    payload = {
+        'ok': True,
+        'message': message,
+        'warning': warning,
+        'state': state,
+        'rows': {
+            str(assignment_id): render_to_string(
+                'projects/includes/dashboard_assignment_row.html',
+                {**context, 'assignment': assignments[assignment_id]},
+                request
+            ) if assignment_id in assignments else None
+            for assignment_id in row_ids
+        },
+    }
+    if timer_changed:
+        payload['timer_card'] = render_to_string('projects/includes/dashboard_timer_card.html', context, request)
+        payload['stop_timer_body'] = render_to_string(
+            'projects/includes/dashboard_stop_timer_body.html',
+            {**context, 'timer_stop_form': TimerStopForm()},
+            request
+        )
+    return JsonResponse(payload)
+
+
+def _complete_after(assignment_id, team_member):
+    """
+    Complete an assignment after logging time.
+
+    Returns:
+        tuple: (success message, None) or (None, warning)
+    """
+    success, result = ProjectService.complete_assignment(assignment_id, team_member)
+    if success:
+        return f"Assignment {result.assignment_id} marked as completed!", None
+    return None, f"Time saved but couldn't complete assignment: {result}"
+
+
+@_team_member_action
+@idempotent('start_timer')
+def start_timer(request):
+    assignment_id = request.POST.get('assignment_id')
+    success, result = ProjectService.start_timer(assignment_id, request.user)
+    if not success:
+        return _error(result)
+
+    return _changed(
+        request,
+        f"Timer started for assignment {result.assignment.assignment_id}",
+        [result.assignment_id],
+        timer_changed=True
+    )
+
+
+@_team_member_action
+@idempotent('stop_timer')
+def stop_timer(request):
+    form = TimerStopForm(request.POST)
+    if not form.is_valid():
+        return _error("Please correct the errors below", form)
+
+    success, result = ProjectService.stop_timer(request.user, form.cleaned_data['description'])
+    if not success:
+        return _error(result)
+
+    # An overnight timer is saved as one session per day
+    total_minutes = sum(session.duration_minutes for session in result)
+    assignment_id = result[-1].assignment_id
+    message = f"Timer stopped. Session duration: {ProjectService._format_minutes(total_minutes)}"
+    warning = None
+    if form.cleaned_data['is_completed']:
+        completed, warning = _complete_after(assignment_id, request.user)
+        message = f"{message}. {completed}" if completed else message
+
+    return _changed(request, message, [assignment_id], timer_changed=True, warning=warning)
+
+
+@_team_member_action
+@idempotent('add_manual_time')
+def add_manual_time(request):
+    assignment_id = request.POST.get('assignment_id')
+    form = ManualTimeEntryForm(request.POST)
+    if not form.is_valid():
+        return _error("Please correct the errors below", form)
+
+    success, result = ProjectService.add_manual_time(
+        assignment_id=assignment_id,
+        team_member=request.user,
+        date_worked=form.cleaned_data['date'],
+        hours=form.cleaned_data['duration_hours'],
+        minutes=form.cleaned_data['duration_minutes'],
+        description=form.cleaned_data['description'],
+        reason=form.cleaned_data['reason']
+    )
+    if not success:
+        return _error(result)
+
+    total_minutes = (form.cleaned_data['duration_hours'] * 60) + form.cleaned_data['duration_minutes']
+    message = f"Added {ProjectService._format_minutes(total_minutes)} to your timesheet"
+    warning = None
+    timer_changed = False
+    if form.cleaned_data['is_completed']:
+        completed, warning = _complete_after(result.assignment_id, request.user)
+        message = f"{message}. {completed}" if completed else message
+        # Completing stops a timer running on the assignment
+        timer_changed = completed is not None
+
+    return _changed(request, message, [result.assignment_id], timer_changed=timer_changed, warning=warning)
+
+
+@_team_member_action
+@idempotent('complete_assignment')
+def complete_assignment(request):
+    success, result = ProjectService.complete_assignment(request.POST.get('assignment_id'), request.user)
+    if not success:
+        return _error(result)
+
+    return _changed(
+        request,
+        f"Assignment {result.assignment_id} marked as completed!",
+        [result.id],
+        timer_changed=True
+    )
@@ -0,0 +1,184 @@
+#projects/audit.py
+"""
+Buffered writer for the timer audit trail (TimerActionLog).
+
+Timer actions used to insert their TimerActionLog row inline, one INSERT per
+start/stop/manual add/edit/completion. TimerAuditLog.record() instead buffers
+the entry in the current thread:
+
+- Inside a transaction, entries are written when it commits
+  (transaction.on_commit), so an entry is saved if and only if the work it
+  describes is. Entries are grouped by the savepoint (atomic() block) they
+  were recorded in, and each group is written with a single bulk_create by
+  its own commit hook. Django drops the hooks of a savepoint that rolls back,
+  so entries from a rolled back transaction or nested atomic() block are
+  dropped with them.
+- Outside a transaction, entries are written once TIMER_AUDIT_LOG_BATCH_SIZE
+  have piled up or the oldest is TIMER_AUDIT_LOG_MAX_DELAY seconds old, and
+  whatever is left is written at the end of every request (request_finished).
+
+Set TIMER_AUDIT_LOG_SYNC to write every entry immediately instead.
+"""
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import TimerActionLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_DELAY = 5  # seconds
+
+
+class _SavepointEntries:
+    """Entries recorded in one savepoint of the open transaction, written by commit_hook."""
+
+    def __init__(self, savepoint_ids):
+        self.savepoint_ids = savepoint_ids
+        self.entries = []
+        self.commit_hook = None
+
+
+class _AuditBuffer(threading.local):
+    """Per-thread entries waiting to be written."""
+
+    def __init__(self):
+        # Entries belonging to the open transaction, one _SavepointEntries per savepoint
+        self.transaction_groups = []
+        # Entries recorded outside a transaction, written on a size/time threshold
+        self.pending = []
+        self.pending_since = None
+
+
+_buffer = _AuditBuffer()
+
+
+class TimerAuditLog:
+    """
+    Records TimerActionLog entries in batches.
+    """
+
+    @staticmethod
+    def record(assignment, team_member, action, details=""):
+        """
+        Record a timer action. Same arguments as TimerActionLog.objects.create.
+
+        Returns:
+            TimerActionLog: The entry (unsaved until the buffer is flushed)
+        """
+        entry = TimerActionLog(
+            assignment=assignment,
+            team_member=team_member,
+            action=action,
+            details=details,
+            timestamp=timezone.now()
+        )
+
+        if getattr(settings, 'TIMER_AUDIT_LOG_SYNC', False):
+            entry.save()
+            return entry
+
+        connection = transaction.get_connection()
+        TimerAuditLog._discard_rolled_back(connection)
+
+        if connection.in_atomic_block:
+            group = TimerAuditLog._savepoint_group(connection)
+            group.entries.append(entry)
+            if len(group.entries) >= TimerAuditLog._batch_size():
+                # Write early, still inside the savepoint so a rollback removes them too
+                TimerAuditLog._write(group.entries)
+                group.entries = []
+        else:
+            if not _buffer.pending:
+                _buffer.pending_since = time.monotonic()
+            _buffer.pending.append(entry)
+            max_delay = getattr(settings, 'TIMER_AUDIT_LOG_MAX_DELAY', DEFAULT_MAX_DELAY)
+            if (len(_buffer.pending) >= TimerAuditLog._batch_size()
+                    or time.monotonic() - _buffer.pending_since >= max_delay):
+                TimerAuditLog.flush()
+
+        return entry
+
+    @staticmethod
+    def flush():
+        """
+        Write the entries recorded outside a transaction. Entries of an open
+        transaction are left for its commit.
+
+        Returns:
+            int: Number of entries written
+        """
+        entries, _buffer.pending, _buffer.pending_since = _buffer.pending, [], None
+        if not entries:
+            return 0
+        try:
+            TimerAuditLog._write(entries)
+        except Exception as e:
+            logger.exception(f"Error writing {len(entries)} timer audit log entries: {str(e)}")
+            # Keep them for the next flush rather than losing them
+            _buffer.pending = entries + _buffer.pending
+            _buffer.pending_since = time.monotonic()
+            return 0
+        return len(entries)
+
+    @staticmethod
+    def _batch_size():
+        return getattr(settings, 'TIMER_AUDIT_LOG_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+    @staticmethod
+    def _write(entries):
+        TimerActionLog.objects.bulk_create(entries, batch_size=TimerAuditLog._batch_size())
+
+    @staticmethod
+    def _savepoint_group(connection):
+        """
+        The entries of the current savepoint, registering their commit hook
+        (inside the savepoint) the first time one is recorded.
+        """
+        savepoint_ids = tuple(connection.savepoint_ids)
+        for group in _buffer.transaction_groups:
+            if group.savepoint_ids == savepoint_ids:
+                return group
+        group = _SavepointEntries(savepoint_ids)
+        group.commit_hook = TimerAuditLog._make_commit_hook(group)
+        transaction.on_commit(group.commit_hook)
+        _buffer.transaction_groups.append(group)
+        return group
+
+    @staticmethod
+    def _make_commit_hook(group):
+        def commit_hook():
+            if group in _buffer.transaction_groups:
+                _buffer.transaction_groups.remove(group)
+            # The transaction has committed; queue the group's entries with the
+            # other committed ones and write them all now
+            _buffer.pending.extend(group.entries)
+            TimerAuditLog.flush()
+        return commit_hook
+
+    @staticmethod
+    def _discard_rolled_back(connection):
+        """
+        Drop the entries of savepoints or transactions that ended without
+        committing. A rolled back savepoint never runs its commit hooks and
+        Django drops them from the connection's pending on_commit callbacks;
+        committed groups remove themselves when their hook runs.
+        """
+        if not _buffer.transaction_groups:
+            return
+        pending_hooks = [func for _, func, _ in connection.run_on_commit] if connection.in_atomic_block else []
+        kept = []
+        for group in _buffer.transaction_groups:
+            if any(func is group.commit_hook for func in pending_hooks):
+                kept.append(group)
+            else:
+                logger.debug(f"Dropping {len(group.entries)} timer audit log entries from a rolled back transaction")
+        _buffer.transaction_groups = kept
+
+
+# Don't lose entries still waiting for a threshold when the process exits
+atexit.register(TimerAuditLog.flush)
@@ -818,6 +818,40 @@ class ManualTimeEntryForm(forms.Form):
         return cleaned_data
 
 
+class BulkTimeEntryForm(ManualTimeEntryForm):
+    """
+    One row of a bulk manual time entry (see BulkTimeEntryFormSet).
+    """
+    assignment = forms.ModelChoiceField(
+        queryset=TaskAssignment.objects.none(),
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'}),
+        empty_label="Select an assignment...",
+        help_text="The assignment you worked on"
+    )
+
+    # Completion is a separate action for bulk entries
+    is_completed = None
+
+    def __init__(self, *args, assignments=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if assignments is not None:
+            self.fields['assignment'].queryset = assignments
+        self.fields['description'].widget = forms.TextInput(attrs={
+            'class': 'form-control form-control-sm',
+            'placeholder': 'Optional'
+        })
+
+
+BulkTimeEntryFormSet = forms.formset_factory(
+    BulkTimeEntryForm,
+    extra=0,
+    min_num=1,
+    validate_min=True,
+    max_num=31,
+    validate_max=True
+)
+
+
 class EditSessionDurationForm(forms.Form):
     """
     Form for editing individual timer session durations.
@@ -0,0 +1,112 @@
+#projects/holidays.py
+"""
+Holiday calendar for the roster and reporting code.
+
+Every (location, year) is loaded with one query the first time it is needed
+and kept as a set of dates in the HOLIDAY_CALENDAR_CACHE cache, so
+is_holiday() and working_days() never query the database for a year that is
+already loaded. Saving or deleting a Holiday drops its year from the cache
+(see signals.py); HOLIDAY_CALENDAR_TTL bounds how stale another process's
+copy can get when the cache is not shared between processes (the default
+local-memory cache).
+
+Each office location has its own calendar; HOLIDAY_DEFAULT_LOCATION is used
+wherever no location is given.
+"""
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from .models import Holiday
+
+HOLIDAY_CALENDAR_CACHE_KEY = 'projects:holidays:{location}:{year}'
+DEFAULT_LOCATION = 'Gurgaon'
+DEFAULT_CALENDAR_TTL = 60 * 60  # seconds
+WEEKEND_DAYS = (5, 6)  # date.weekday(): Saturday, Sunday
+
+
+class HolidayCalendar:
+    """
+    Active holidays per office location, cached a year at a time.
+    """
+
+    @staticmethod
+    def cache():
+        return caches[getattr(settings, 'HOLIDAY_CALENDAR_CACHE', 'default')]
+
+    @staticmethod
+    def default_location():
+        return getattr(settings, 'HOLIDAY_DEFAULT_LOCATION', DEFAULT_LOCATION)
+
+    @staticmethod
+    def cache_key(location, year):
+        return HOLIDAY_CALENDAR_CACHE_KEY.format(location=location, year=year)
+
+    @staticmethod
+    def year(year, location=None):
+        """
+        A year's active holiday dates for a location.
+
+        Returns:
+            frozenset: Holiday dates
+        """
+        location = location or HolidayCalendar.default_location()
+        cache = HolidayCalendar.cache()
+        cache_key = HolidayCalendar.cache_key(location, year)
+        holidays = cache.get(cache_key)
+        if holidays is None:
+            holidays = frozenset(Holiday.objects.filter(
+                date__range=[date(year, 1, 1), date(year, 12, 31)],
+                location=location,
+                is_active=True
+            ).values_list('date', flat=True))
+            cache.set(cache_key, holidays, getattr(settings, 'HOLIDAY_CALENDAR_TTL', DEFAULT_CALENDAR_TTL))
+        return holidays
+
+    @staticmethod
+    def holidays(start_date, end_date, location=None):
+        """Active holiday dates in a range (one cache read per year it spans)."""
+        holidays = set()
+        for year in range(start_date.year, end_date.year + 1):
+            holidays.update(day for day in HolidayCalendar.year(year, location) if start_date <= day <= end_date)
+        return holidays
+
+    @staticmethod
+    def is_holiday(day, location=None):
+        return day in HolidayCalendar.year(day.year, location)
+
+    @staticmethod
+    def is_weekend(day):
+        return day.weekday() in WEEKEND_DAYS
+
+    @staticmethod
+    def weekdays(start_date, end_date):
+        """Monday to Friday days in a range, counted without walking it."""
+        if end_date < start_date:
+            return 0
+        total_days = (end_date - start_date).days + 1
+        full_weeks, remainder = divmod(total_days, 7)
+        extra = sum(
+            1 for offset in range(remainder)
+            if (start_date + timedelta(days=offset)).weekday() not in WEEKEND_DAYS
+        )
+        return full_weeks * (7 - len(WEEKEND_DAYS)) + extra
+
+    @staticmethod
+    def working_days(start_date, end_date, location=None):
+        """Days in a range that are neither weekend days nor holidays."""
+        weekday_holidays = sum(
+            1 for day in HolidayCalendar.holidays(start_date, end_date, location)
+            if not HolidayCalendar.is_weekend(day)
+        )
+        return HolidayCalendar.weekdays(start_date, end_date) - weekday_holidays
+
+    @staticmethod
+    def invalidate(location, year):
+        """
+        Drop a cached year, now and again once the transaction commits so a
+        read in between cannot cache the old holidays.
+        """
+        cache_key = HolidayCalendar.cache_key(location, year)
+        HolidayCalendar.cache().delete(cache_key)
+        transaction.on_commit(lambda: HolidayCalendar.cache().delete(cache_key))
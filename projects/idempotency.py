@@ -0,0 +1,111 @@
+#projects/idempotency.py
+"""
+Idempotency keys for the JSON timer API (projects/api_views.py).
+
+A client sends an Idempotency-Key header (or an idempotency_key field) with
+each action, the same key when it retries or the user double-clicks. The
+first request with a key claims it with an atomic cache add() and stores its
+response once it finishes; a repeat gets that stored response back instead
+of running the action again, or a 409 while the first one is still running.
+
+Keys are scoped to the user and the action and kept for IDEMPOTENCY_KEY_TTL
+seconds in the IDEMPOTENCY_CACHE cache, which must be shared between
+processes (e.g. Redis) to catch repeats that land on another process.
+"""
+import functools
+import json
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+IDEMPOTENCY_CACHE_KEY = 'projects:idempotency:{user_id}:{action}:{key}'
+DEFAULT_KEY_TTL = 24 * 60 * 60  # seconds
+MAX_KEY_LENGTH = 100
+PENDING = 'pending'
+
+
+class IdempotencyKeys:
+    """
+    Claims idempotency keys and remembers the responses sent for them.
+    """
+
+    @staticmethod
+    def cache():
+        return caches[getattr(settings, 'IDEMPOTENCY_CACHE', 'default')]
+
+    @staticmethod
+    def ttl():
+        return getattr(settings, 'IDEMPOTENCY_KEY_TTL', DEFAULT_KEY_TTL)
+
+    @staticmethod
+    def cache_key(user_id, action, key):
+        return IDEMPOTENCY_CACHE_KEY.format(user_id=user_id, action=action, key=key)
+
+    @staticmethod
+    def claim(user_id, action, key):
+        """
+        Claim a key for a new request.
+
+        Returns:
+            tuple: (claimed, stored) - stored is PENDING while the first request
+            with the key is running, else its {'status', 'content'} response
+        """
+        cache_key = IdempotencyKeys.cache_key(user_id, action, key)
+        cache = IdempotencyKeys.cache()
+        if cache.add(cache_key, PENDING, IdempotencyKeys.ttl()):
+            return True, None
+        stored = cache.get(cache_key)
+        if stored is None:
+            # Expired between add() and get(); treat it as still running rather than retrying
+            stored = PENDING
+        return False, stored
+
+    @staticmethod
+    def store(user_id, action, key, response):
+        IdempotencyKeys.cache().set(
+            IdempotencyKeys.cache_key(user_id, action, key),
+            {'status': response.status_code, 'content': response.content.decode()},
+            IdempotencyKeys.ttl()
+        )
+
+    @staticmethod
+    def release(user_id, action, key):
+        """Forget a key whose request failed, so a retry runs the action again."""
+        IdempotencyKeys.cache().delete(IdempotencyKeys.cache_key(user_id, action, key))
+
+
+def idempotent(action):
+    """
+    Decorator for JSON views: repeats of a request with the same idempotency
+    key get the first response instead of running the view again. Requests
+    without a key run as usual.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = request.headers.get('Idempotency-Key') or request.POST.get('idempotency_key')
+            if not key:
+                return view(request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return JsonResponse({'ok': False, 'error': "Idempotency key is too long"}, status=400)
+
+            claimed, stored = IdempotencyKeys.claim(request.user.id, action, key)
+            if not claimed:
+                if stored == PENDING:
+                    return JsonResponse({'ok': False, 'error': "This request is already being processed"}, status=409)
+                response = JsonResponse(json.loads(stored['content']), status=stored['status'])
+                response['Idempotent-Replayed'] = 'true'
+                return response
+
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception:
+                IdempotencyKeys.release(request.user.id, action, key)
+                raise
+            if response.status_code >= 500:
+                IdempotencyKeys.release(request.user.id, action, key)
+            else:
+                IdempotencyKeys.store(request.user.id, action, key, response)
+            return response
+        return wrapper
+    return decorator
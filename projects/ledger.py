@@ -0,0 +1,367 @@
+#projects/ledger.py
+"""
+Time ledger: the append-only source of truth for logged time.
+
+Every time session created, duration edited or session deleted appends a
+TimeLedgerEntry with the minutes it adds or removes. DailyTimeTotal is a
+projection of the ledger, one row per (assignment, team member, day) holding
+the sum of its entries:
+
+- The write paths append entries and then update the projection, either
+  incrementally with one upsert statement (TimeLedger.add_to_totals) or by
+  re-summing the affected days (TimeLedger.project).
+- TimeLedger.rebuild re-projects any member/date range in bulk, replacing
+  totals that drifted (manual admin edits, failed updates, raw SQL).
+- TimeLedger.verify compares the projection and the ledger with the
+  TimeSession sums using grouped queries; `manage.py verify_time_ledger`
+  reports (and with --fix repairs) the differences.
+"""
+import logging
+import uuid
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import TimeLedgerEntry, DailyTimeTotal, TimeSession, TaskAssignment
+from .rollups import DailyMemberRollup
+from .live import LiveUpdates
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+# The ledger sum of the conflicting row's day, used when it was manually edited
+_LEDGER_SUM = (
+    "COALESCE((SELECT SUM(ledger.minutes_delta) FROM {ledger_table} ledger"
+    " WHERE ledger.assignment_id = {total_table}.assignment_id"
+    " AND ledger.team_member_id = {total_table}.team_member_id"
+    " AND ledger.date_worked = {total_table}.date_worked), 0)"
+)
+
+# Single-statement increments per database vendor. The last parameter is the
+# is_manually_edited value to store (false). MySQL applies the assignments in
+# order, so total_minutes still sees the old is_manually_edited.
+UPSERT_SQL = {
+    'postgresql': (
+        "INSERT INTO {total_table} ({columns}) VALUES {rows}"
+        " ON CONFLICT (assignment_id, team_member_id, date_worked) DO UPDATE SET"
+        " total_minutes = CASE WHEN {total_table}.is_manually_edited THEN " + _LEDGER_SUM +
+        " ELSE {total_table}.total_minutes + EXCLUDED.total_minutes END,"
+        " is_manually_edited = %s,"
+        " last_updated = EXCLUDED.last_updated"
+    ),
+    'mysql': (
+        "INSERT INTO {total_table} ({columns}) VALUES {rows}"
+        " ON DUPLICATE KEY UPDATE"
+        " total_minutes = CASE WHEN {total_table}.is_manually_edited THEN " + _LEDGER_SUM +
+        " ELSE {total_table}.total_minutes + VALUES(total_minutes) END,"
+        " is_manually_edited = %s,"
+        " last_updated = VALUES(last_updated)"
+    ),
+}
+UPSERT_SQL['sqlite'] = UPSERT_SQL['postgresql']
+
+
+class TimeLedger:
+    """
+    Appends ledger entries and maintains the DailyTimeTotal projection.
+    """
+
+    @staticmethod
+    def key(obj):
+        """The (assignment id, team member id, date) a session, entry or total belongs to."""
+        return obj.assignment_id, obj.team_member_id, obj.date_worked
+
+    @staticmethod
+    def record_sessions(sessions):
+        """
+        Append SESSION_CREATED entries for newly created sessions.
+
+        Returns:
+            list: The created TimeLedgerEntry objects
+        """
+        return TimeLedger._append([
+            TimeLedger._entry(session, TimeLedgerEntry.SESSION_CREATED, session.duration_minutes)
+            for session in sessions
+        ])
+
+    @staticmethod
+    def record_edit(session, old_duration_minutes):
+        """Append a DURATION_EDITED entry for the change in a session's duration."""
+        delta = session.duration_minutes - old_duration_minutes
+        if delta == 0:
+            return []
+        return TimeLedger._append([TimeLedger._entry(session, TimeLedgerEntry.DURATION_EDITED, delta)])
+
+    @staticmethod
+    def record_deletions(sessions):
+        """Append SESSION_DELETED entries taking deleted sessions' minutes back out."""
+        return TimeLedger._append([
+            TimeLedger._entry(session, TimeLedgerEntry.SESSION_DELETED, -session.duration_minutes)
+            for session in sessions
+            if session.duration_minutes
+        ])
+
+    @staticmethod
+    def _entry(session, event_type, minutes_delta):
+        return TimeLedgerEntry(
+            assignment_id=session.assignment_id,
+            team_member_id=session.team_member_id,
+            date_worked=session.date_worked,
+            session_id=session.id,
+            event_type=event_type,
+            minutes_delta=minutes_delta,
+        )
+
+    @staticmethod
+    def _append(entries):
+        if entries:
+            TimeLedgerEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+            LiveUpdates.touch({entry.team_member_id for entry in entries})
+        return entries
+
+    @staticmethod
+    def add_to_totals(deltas):
+        """
+        Add minutes to the DailyTimeTotal rows of some days with one
+        INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE statement, creating
+        missing rows. A manually edited row is set to its ledger sum instead,
+        so record the ledger entries first.
+
+        Args:
+            deltas: (assignment id, team member id, date) -> minutes to add
+        """
+        deltas = {key: minutes for key, minutes in deltas.items() if minutes}
+        if not deltas:
+            return
+
+        upsert_sql = UPSERT_SQL.get(connection.vendor)
+        if upsert_sql is None:
+            # No upsert syntax for this database; re-sum the days instead
+            TimeLedger.project(deltas.keys())
+            return
+
+        now = timezone.now()
+        fields = {field.name: field for field in DailyTimeTotal._meta.concrete_fields}
+        columns = ['id', 'assignment', 'team_member', 'date_worked', 'total_minutes', 'is_manually_edited', 'last_updated']
+        quote = connection.ops.quote_name
+        row_sql = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        items = list(deltas.items())
+
+        with connection.cursor() as cursor:
+            # One statement per BATCH_SIZE days, to stay under the databases' parameter limits
+            for offset in range(0, len(items), BATCH_SIZE):
+                batch = items[offset:offset + BATCH_SIZE]
+                params = []
+                for (assignment_id, team_member_id, date_worked), minutes in batch:
+                    values = [uuid.uuid4(), assignment_id, team_member_id, date_worked, minutes, False, now]
+                    params.extend(
+                        fields[name].get_db_prep_save(value, connection)
+                        for name, value in zip(columns, values)
+                    )
+                cursor.execute(
+                    upsert_sql.format(
+                        total_table=quote(DailyTimeTotal._meta.db_table),
+                        ledger_table=quote(TimeLedgerEntry._meta.db_table),
+                        columns=', '.join(quote(fields[name].column) for name in columns),
+                        rows=', '.join([row_sql] * len(batch)),
+                    ),
+                    params + [False]
+                )
+
+        # Raw SQL skips the post_save signal that maintains the reporting rollup
+        TimeLedger._refresh_rollup(deltas.keys())
+
+    @staticmethod
+    def _refresh_rollup(keys):
+        """Refresh the reporting rollup for changed days and their assignments' completion days."""
+        if not keys or not DailyMemberRollup.is_enabled():
+            return
+        assignments = TaskAssignment.objects.in_bulk({key[0] for key in keys})
+        DailyMemberRollup.refresh(
+            [(team_member_id, date_worked) for _, team_member_id, date_worked in keys]
+            + [DailyMemberRollup.completion_key(assignment) for assignment in assignments.values()]
+        )
+
+    @staticmethod
+    def _filter_keys(queryset, keys):
+        """Narrow a queryset to the rows of some keys (a superset; check keys after)."""
+        return queryset.filter(
+            assignment_id__in={key[0] for key in keys},
+            team_member_id__in={key[1] for key in keys},
+            date_worked__in={key[2] for key in keys},
+        )
+
+    @staticmethod
+    def _filter_range(queryset, start_date=None, end_date=None, member_ids=None):
+        if start_date:
+            queryset = queryset.filter(date_worked__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(date_worked__lte=end_date)
+        if member_ids is not None:
+            queryset = queryset.filter(team_member_id__in=member_ids)
+        return queryset
+
+    @staticmethod
+    def _sums(queryset, field):
+        """Grouped sum of `field` per key, skipping keys that sum to 0."""
+        return {
+            (assignment_id, team_member_id, date_worked): minutes
+            for assignment_id, team_member_id, date_worked, minutes in queryset.order_by().values(
+                'assignment_id', 'team_member_id', 'date_worked'
+            ).annotate(minutes=Sum(field)).values_list(
+                'assignment_id', 'team_member_id', 'date_worked', 'minutes'
+            ).iterator(chunk_size=2000)
+            if minutes
+        }
+
+    @staticmethod
+    def ledger_totals(keys=None, start_date=None, end_date=None, member_ids=None):
+        """
+        Sum the ledger per (assignment id, team member id, date).
+
+        Returns:
+            dict: key -> minutes, for keys with a non-zero total
+        """
+        queryset = TimeLedger._filter_range(TimeLedgerEntry.objects.all(), start_date, end_date, member_ids)
+        if keys is not None:
+            queryset = TimeLedger._filter_keys(queryset, keys)
+        totals = TimeLedger._sums(queryset, 'minutes_delta')
+        if keys is not None:
+            totals = {key: minutes for key, minutes in totals.items() if key in keys}
+        return totals
+
+    @staticmethod
+    def project(keys):
+        """
+        Re-sum the ledger for some (assignment id, team member id, date) keys and
+        write the results to DailyTimeTotal, clearing is_manually_edited.
+        Days whose entries cancel out lose their DailyTimeTotal row.
+
+        Returns:
+            tuple: (rows written, rows deleted)
+        """
+        keys = set(keys)
+        if not keys:
+            return 0, 0
+        totals = TimeLedger.ledger_totals(keys=keys)
+        existing = TimeLedger._filter_keys(DailyTimeTotal.objects.all(), keys)
+        return TimeLedger._write_projection(totals, existing, keys)
+
+    @staticmethod
+    def rebuild(start_date=None, end_date=None, member_ids=None):
+        """
+        Rebuild DailyTimeTotal from the ledger for a date range (default: all
+        time) and optionally some team members, in bulk.
+
+        Returns:
+            tuple: (rows written, rows deleted)
+        """
+        totals = TimeLedger.ledger_totals(start_date=start_date, end_date=end_date, member_ids=member_ids)
+        existing = TimeLedger._filter_range(DailyTimeTotal.objects.all(), start_date, end_date, member_ids)
+        return TimeLedger._write_projection(totals, existing)
+
+    @staticmethod
+    def _write_projection(totals, existing, keys=None):
+        """
+        Make the DailyTimeTotal rows in `existing` match `totals`. Only rows
+        that change are written, and the rollup is refreshed for those days.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            current = {}
+            stale_ids = []
+            for total_id, assignment_id, team_member_id, date_worked, minutes, edited in existing.order_by().values_list(
+                'id', 'assignment_id', 'team_member_id', 'date_worked', 'total_minutes', 'is_manually_edited'
+            ).iterator(chunk_size=2000):
+                key = (assignment_id, team_member_id, date_worked)
+                if keys is not None and key not in keys:
+                    continue
+                if key in totals:
+                    current[key] = (minutes, edited)
+                else:
+                    stale_ids.append(total_id)
+
+            changed = [key for key, minutes in totals.items() if current.get(key) != (minutes, False)]
+
+            deleted = 0
+            for offset in range(0, len(stale_ids), BATCH_SIZE):
+                deleted += DailyTimeTotal.objects.filter(id__in=stale_ids[offset:offset + BATCH_SIZE]).delete()[0]
+
+            DailyTimeTotal.objects.bulk_create(
+                [
+                    DailyTimeTotal(
+                        assignment_id=assignment_id,
+                        team_member_id=team_member_id,
+                        date_worked=date_worked,
+                        total_minutes=totals[(assignment_id, team_member_id, date_worked)],
+                        is_manually_edited=False,
+                        last_updated=now,
+                    )
+                    for assignment_id, team_member_id, date_worked in changed
+                ],
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['assignment', 'team_member', 'date_worked'],
+                update_fields=['total_minutes', 'is_manually_edited', 'last_updated'],
+            )
+
+            # bulk_create skips the post_save signal that maintains the reporting rollup
+            TimeLedger._refresh_rollup(changed)
+
+        return len(changed), deleted
+
+    @staticmethod
+    def verify(start_date=None, end_date=None, member_ids=None):
+        """
+        Compare the TimeSession sums, the ledger and the DailyTimeTotal
+        projection with three grouped queries.
+
+        Returns:
+            dict: 'missing_events' (sessions the ledger disagrees with) and
+                'stale_totals' (totals that don't match the ledger), each
+                mapping key -> (expected, actual) minutes
+        """
+        session_totals = TimeLedger._sums(
+            TimeLedger._filter_range(TimeSession.objects.all(), start_date, end_date, member_ids),
+            'duration_minutes'
+        )
+        ledger_totals = TimeLedger.ledger_totals(start_date=start_date, end_date=end_date, member_ids=member_ids)
+        projected_totals = TimeLedger._sums(
+            TimeLedger._filter_range(DailyTimeTotal.objects.all(), start_date, end_date, member_ids),
+            'total_minutes'
+        )
+
+        def differences(expected, actual):
+            return {
+                key: (expected.get(key, 0), actual.get(key, 0))
+                for key in expected.keys() | actual.keys()
+                if expected.get(key, 0) != actual.get(key, 0)
+            }
+
+        return {
+            'missing_events': differences(session_totals, ledger_totals),
+            'stale_totals': differences(ledger_totals, projected_totals),
+        }
+
+    @staticmethod
+    def reconcile(missing_events):
+        """
+        Append RECONCILED entries bringing the ledger in line with the session
+        sums (for sessions written around the service layer), then re-project
+        those days.
+
+        Args:
+            missing_events: key -> (session minutes, ledger minutes), as returned by verify()
+        """
+        with transaction.atomic():
+            TimeLedger._append([
+                TimeLedgerEntry(
+                    assignment_id=assignment_id,
+                    team_member_id=team_member_id,
+                    date_worked=date_worked,
+                    event_type=TimeLedgerEntry.RECONCILED,
+                    minutes_delta=session_minutes - ledger_minutes,
+                )
+                for (assignment_id, team_member_id, date_worked), (session_minutes, ledger_minutes) in missing_events.items()
+            ])
+            return TimeLedger.project(missing_events.keys())
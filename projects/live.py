@@ -0,0 +1,75 @@
+#projects/live.py
+"""
+Change notifications for the live dashboard streams (projects/live_views.py).
+
+Every write that changes what a dashboard shows (timers starting/stopping,
+time being logged, misc hours, roster changes) calls LiveUpdates.touch()
+with the team members involved. That stores a new version token per member,
+plus one for the whole team, in the LIVE_UPDATES_CACHE cache once the
+transaction commits. A stream polls these tokens, which costs one cache read
+per tick, and only reloads its data from the database when one changes.
+
+Use a shared cache (e.g. Redis) when running several processes; with a
+process-local cache a stream still catches up every REFRESH_SECONDS.
+"""
+import logging
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'projects:live:{scope}'
+TEAM_SCOPE = 'team'
+# Streams reload at least this often even if no change was announced
+REFRESH_SECONDS = 30
+
+
+class LiveUpdates:
+    """
+    Version tokens that tell live streams their data changed.
+    """
+
+    @staticmethod
+    def cache():
+        return caches[getattr(settings, 'LIVE_UPDATES_CACHE', 'default')]
+
+    @staticmethod
+    def member_scope(team_member_id):
+        return f'member:{team_member_id}'
+
+    @staticmethod
+    def key(scope):
+        return VERSION_KEY.format(scope=scope)
+
+    @staticmethod
+    def touch(team_member_ids):
+        """
+        Announce a change for some team members (and so for the team board),
+        after the current transaction commits.
+        """
+        scopes = {LiveUpdates.member_scope(team_member_id) for team_member_id in team_member_ids if team_member_id}
+        if not scopes:
+            return
+        scopes.add(TEAM_SCOPE)
+
+        def announce():
+            token = uuid.uuid4().hex
+            try:
+                LiveUpdates.cache().set_many({LiveUpdates.key(scope): token for scope in scopes}, None)
+            except Exception as e:
+                # Streams fall back to their periodic refresh
+                logger.warning(f"Could not announce live update: {str(e)}")
+
+        transaction.on_commit(announce)
+
+    @staticmethod
+    def version(scope):
+        """The current version token of a scope (None until something changes)."""
+        return LiveUpdates.cache().get(LiveUpdates.key(scope))
+
+    @staticmethod
+    async def aversion(scope):
+        """The current version token of a scope (None until something changes)."""
+        return await LiveUpdates.cache().aget(LiveUpdates.key(scope))
@@ -0,0 +1,119 @@
+# projects/live_views.py
+"""
+Server-Sent Events streams that push timer and today's totals changes to open
+dashboards, replacing page reloads to see them.
+
+Each stream polls the LiveUpdates version tokens (one cache read a second)
+and reads the database only when its token changed, or every
+live.REFRESH_SECONDS as a safety net. A comment line every
+HEARTBEAT_SECONDS keeps proxies from closing an idle connection, and the
+stream ends after LIVE_STREAM_MAX_SECONDS so connections are recycled; the
+browser's EventSource reconnects by itself.
+
+Streaming needs an ASGI server (see pms/asgi.py). Under WSGI a stream would
+hold a worker thread for its whole life, so there the views send the current
+state once and close, and EventSource falls back to polling every
+LIVE_POLL_RETRY_MS milliseconds.
+"""
+import asyncio
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils import timezone
+from .live import LiveUpdates, TEAM_SCOPE, REFRESH_SECONDS
+from .services import ProjectService
+
+POLL_INTERVAL_SECONDS = 1
+HEARTBEAT_SECONDS = 15
+DEFAULT_STREAM_MAX_SECONDS = 300
+DEFAULT_POLL_RETRY_MS = 10000
+
+
+def _event(name, data):
+    payload = json.dumps({**data, 'server_time': timezone.now().isoformat()}, cls=DjangoJSONEncoder)
+    return f"event: {name}\ndata: {payload}\n\n"
+
+
+def _load(load_state):
+    success, result = load_state()
+    if not success:
+        raise RuntimeError(result)
+    return result
+
+
+async def _stream(scope, event_name, load_state):
+    """
+    Yield the state as an event whenever it changes, until the stream's time is up.
+    """
+    load = sync_to_async(_load)
+    yield f"retry: {getattr(settings, 'LIVE_STREAM_RETRY_MS', 3000)}\n\n"
+
+    deadline = time.monotonic() + getattr(settings, 'LIVE_STREAM_MAX_SECONDS', DEFAULT_STREAM_MAX_SECONDS)
+    last_version = last_state = None
+    last_load = last_sent = 0
+    while time.monotonic() < deadline:
+        now = time.monotonic()
+        version = await LiveUpdates.aversion(scope)
+        if last_state is None or version != last_version or now - last_load >= REFRESH_SECONDS:
+            last_version, last_load = version, now
+            state = await load(load_state)
+            if state != last_state:
+                last_state, last_sent = state, now
+                yield _event(event_name, state)
+        if now - last_sent >= HEARTBEAT_SECONDS:
+            last_sent = now
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+async def _respond(request, scope, event_name, load_state):
+    if not isinstance(request, ASGIRequest):
+        # No long-lived responses under WSGI: one event, then EventSource polls
+        state = await sync_to_async(_load)(load_state)
+        retry = getattr(settings, 'LIVE_POLL_RETRY_MS', DEFAULT_POLL_RETRY_MS)
+        response = HttpResponse(f"retry: {retry}\n\n" + _event(event_name, state), content_type='text/event-stream')
+    else:
+        response = StreamingHttpResponse(_stream(scope, event_name, load_state), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+async def my_live_updates(request):
+    """
+    The signed-in team member's running timer and today's totals.
+    """
+    user = await request.auser()
+    if user.role != 'TEAM_MEMBER':
+        return HttpResponseForbidden("Live updates are only for team members")
+
+    return await _respond(
+        request,
+        LiveUpdates.member_scope(user.id),
+        'state',
+        lambda: ProjectService.get_live_state(user)
+    )
+
+
+@login_required
+async def team_live_updates(request):
+    """
+    Everyone's running timers, for DPMs.
+    """
+    user = await request.auser()
+    if user.role != 'DPM':
+        return HttpResponseForbidden("Only a DPM can follow the team's timers")
+
+    return await _respond(
+        request,
+        TEAM_SCOPE,
+        'working_now',
+        ProjectService.get_working_now
+    )
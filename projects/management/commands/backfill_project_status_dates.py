@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from projects.models import Project
+
+class Command(BaseCommand):
+    help = 'Recomputes Project.latest_status_changed_at and Project.delivered_at from the status history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of projects to update per transaction',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        project_ids = list(Project.objects.order_by('pk').values_list('pk', flat=True))
+        total = len(project_ids)
+
+        self.stdout.write(f"Backfilling status dates for {total} projects...")
+
+        updated = 0
+        for start in range(0, total, batch_size):
+            batch = project_ids[start:start + batch_size]
+            with transaction.atomic():
+                updated += Project.refresh_status_dates(Project.objects.filter(pk__in=batch))
+            self.stdout.write(f"  ...{min(start + batch_size, total)}/{total}")
+
+        self.stdout.write(self.style.SUCCESS(f"Updated status dates for {updated} projects."))
@@ -0,0 +1,109 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from projects.models import Project, Product, ProjectStatusOption
+from projects.search import IContainsSearchBackend, get_search_backend
+from locations.models import City, Region
+from accounts.models import User
+
+
+class BenchmarkRollback(Exception):
+    """Raised to roll back the generated fixture once the benchmark is done."""
+
+
+class Command(BaseCommand):
+    help = 'Compares the icontains project search with the database-specific search backend on a generated fixture'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--projects',
+            type=int,
+            default=100000,
+            help='Number of projects to generate for the benchmark',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of times each search is run',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the generated projects instead of rolling them back',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                queries = self.create_fixture(options['projects'])
+                self.run_benchmark(queries, options['repeat'])
+                if not options['keep']:
+                    raise BenchmarkRollback()
+        except BenchmarkRollback:
+            self.stdout.write(self.style.WARNING('Generated projects rolled back.'))
+
+    def create_fixture(self, count):
+        self.stdout.write(f"Generating {count} projects...")
+        region, _ = Region.objects.get_or_create(name='Benchmark Region')
+        city, _ = City.objects.get_or_create(name='Benchmark City', defaults={'region': region})
+        product, _ = Product.objects.get_or_create(name='Benchmark Product', defaults={'expected_tat': 30})
+        status = ProjectStatusOption.objects.order_by('order').first() or ProjectStatusOption.objects.create(
+            name='Benchmark Status', category_one='Benchmark', category_two='Pipeline', order=1
+        )
+        dpm = User.objects.filter(role='DPM').first() or User.objects.create_user(
+            username='benchmark_dpm', password=None, role='DPM'
+        )
+
+        builders = ['Prestige', 'Sobha', 'Godrej', 'Lodha', 'Brigade', 'DLF', 'Tata Housing', 'Mahindra']
+        towns = ['Heights', 'Meadows', 'Residency', 'Greens', 'Towers', 'Enclave', 'Gardens', 'Vista']
+
+        projects = [
+            Project(
+                # The A1..Z999 HS_ID range is too small for a 100k fixture, so use synthetic IDs
+                hs_id=f'BM{number}',
+                opportunity_id=f'OPP-{number:07d}',
+                project_name=f'{builders[number % len(builders)]} {towns[(number // 7) % len(towns)]} Phase {number % 13}',
+                builder_name=f'{builders[number % len(builders)]} Developers',
+                city=city,
+                product=product,
+                quantity=1,
+                purchase_date=date.today(),
+                sales_confirmation_date=date.today(),
+                expected_tat=30,
+                account_manager='Benchmark',
+                dpm=dpm,
+                current_status=status,
+            )
+            for number in range(count)
+        ]
+        Project.objects.bulk_create(projects, batch_size=2000)
+
+        middle = projects[count // 2]
+        return [
+            ('HS_ID', middle.hs_id),
+            ('Opportunity ID', middle.opportunity_id),
+            ('Project name', 'Godrej Meadows'),
+            ('Builder', 'Sobha'),
+        ]
+
+    def run_benchmark(self, queries, repeat):
+        backends = [('icontains', IContainsSearchBackend())]
+        default_backend = get_search_backend()
+        if type(default_backend) is not IContainsSearchBackend:
+            backends.append((type(default_backend).__name__, default_backend))
+        else:
+            self.stdout.write(self.style.WARNING('No indexed search backend for this database; timing icontains only.'))
+
+        self.stdout.write(f"\n{'Query':<18}{'Backend':<32}{'Matches':>10}{'Avg ms':>12}")
+        for label, query in queries:
+            for backend_name, backend in backends:
+                timings = []
+                matches = 0
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    matches = backend.search(Project.objects.all(), query).count()
+                    timings.append((time.perf_counter() - started) * 1000)
+                average = sum(timings) / len(timings)
+                self.stdout.write(f"{label:<18}{backend_name:<32}{matches:>10}{average:>12.2f}")
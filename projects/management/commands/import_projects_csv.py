@@ -7,6 +7,7 @@ from projects.models import (
     Project, Product, ProductSubcategory, ProjectStatusOption, 
     ProjectStatusHistory
 )
+from projects.sequences import HS_ID_SEQUENCE, get_allocator
 from locations.models import City, Region
 from accounts.models import User
 
@@ -37,11 +38,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Run without making changes (preview mode)'
         )
+        parser.add_argument(
+            '--allocate-missing-hs-ids',
+            action='store_true',
+            help='Give rows without an HS_ID the next HS_IDs from the sequence instead of skipping them'
+        )
 
     def handle(self, *args, **options):
         projects_csv = options['projects_csv']
         statuses_csv = options['statuses_csv']
         dry_run = options['dry_run']
+        self.allocate_missing_hs_ids = options['allocate_missing_hs_ids']
         
         if dateutil_parse is None:
             self.stdout.write(self.style.ERROR(
@@ -105,6 +112,7 @@ class Command(BaseCommand):
                 else:
                     # Perform the actual bulk creation if not a dry run
                     if projects_to_create:
+                        # HS_IDs were filled in and registered by the allocator in import_projects()
                         Project.objects.bulk_create(projects_to_create, batch_size=500)
                         self.stdout.write(self.style.SUCCESS(f"Successfully created {len(projects_to_create)} projects."))
                         
@@ -120,6 +128,8 @@ class Command(BaseCommand):
 
                         if final_histories:
                             ProjectStatusHistory.objects.bulk_create(final_histories, batch_size=500, ignore_conflicts=True)
+                            # bulk_create skips ProjectStatusHistory.save(), so resync the project status dates
+                            Project.refresh_status_dates(Project.objects.filter(hs_id__in=created_projects_dict.keys()))
                             self.stdout.write(self.style.SUCCESS(f"Successfully created {len(final_histories)} status history entries."))
                             
                     transaction.savepoint_commit(sid)
@@ -215,6 +225,7 @@ class Command(BaseCommand):
     def import_projects(self, csv_file):
         self.stdout.write("\n--- Starting Project Import ---")
         projects_to_create = []
+        projects_missing_hs_id = []
         errors = []
         existing_hs_ids = set(Project.objects.values_list('hs_id', flat=True))
         
@@ -224,7 +235,7 @@ class Command(BaseCommand):
                 row_num = i + 2
                 hs_id = row.get('HS_ID', '').strip()
                 
-                if not hs_id:
+                if not hs_id and not self.allocate_missing_hs_ids:
                     errors.append(f"Row {row_num}: Skipped (Empty HS_ID)")
                     continue
                 
@@ -263,7 +274,7 @@ class Command(BaseCommand):
                     
                     dpm_to_assign = dpm_user or self.default_dpm
 
-                    projects_to_create.append(Project(
+                    project = Project(
                         hs_id=hs_id,
                         opportunity_id=row.get('Opp ID', '').strip(),
                         project_type=row.get('Event/\nNon-Event', '').strip(),
@@ -280,9 +291,23 @@ class Command(BaseCommand):
                         account_manager=(row.get('Sales') or 'Unknown').strip(),
                         dpm=dpm_to_assign,
                         current_status=current_status
-                    ))
+                    )
+                    projects_to_create.append(project)
+                    if not hs_id:
+                        projects_missing_hs_id.append(project)
                 except Exception as e:
                     errors.append(f"Row {row_num} (HS_ID: {hs_id}): CRITICAL ERROR - {str(e)}")
+
+        # bulk_create skips the pre_save signal: move the HS_ID sequence past the
+        # imported IDs, then reserve one block for every row that came without one
+        get_allocator(HS_ID_SEQUENCE).assign(projects_to_create)
+        if projects_missing_hs_id:
+            for project in projects_missing_hs_id:
+                if not project.project_name:
+                    project.project_name = project.hs_id
+            self.stdout.write(
+                f"  ...allocated HS_IDs {projects_missing_hs_id[0].hs_id} to {projects_missing_hs_id[-1].hs_id} for rows without one"
+            )
         
         return projects_to_create, errors
 
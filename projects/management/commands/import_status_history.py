@@ -97,6 +97,8 @@ class Command(BaseCommand):
                     self.stdout.write(self.style.SUCCESS('Old history records deleted.'))
 
                     ProjectStatusHistory.objects.bulk_create(history_to_create)
+                    # bulk_create skips ProjectStatusHistory.save(), so resync the project status dates
+                    Project.refresh_status_dates()
                     self.stdout.write(self.style.SUCCESS('Successfully imported new status history records.'))
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f'An error occurred during the database transaction. No changes were made. Error: {e}'))
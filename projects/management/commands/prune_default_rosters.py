@@ -0,0 +1,36 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from projects.roster import RosterDefaults
+
+class Command(BaseCommand):
+    help = 'Deletes auto-created roster rows that only repeat the default status (for ROSTER_VIRTUAL_MODE)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='First day to prune (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Last day to prune (YYYY-MM-DD)')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the redundant rows without deleting them',
+        )
+
+    def _parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        rows = RosterDefaults.redundant_rows(
+            self._parse_date(options['start_date']),
+            self._parse_date(options['end_date'])
+        )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"{rows.count()} roster rows only repeat the default status (dry run)."))
+            return
+
+        deleted, _ = rows.delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} roster rows that only repeated the default status."))
@@ -0,0 +1,32 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from projects.ledger import TimeLedger
+
+class Command(BaseCommand):
+    help = 'Rebuilds DailyTimeTotal from the time ledger for a date range and/or team members'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start-date',
+            type=date.fromisoformat,
+            help='First day to rebuild (YYYY-MM-DD, default: the beginning)',
+        )
+        parser.add_argument(
+            '--end-date',
+            type=date.fromisoformat,
+            help='Last day to rebuild (YYYY-MM-DD, default: the end)',
+        )
+        parser.add_argument(
+            '--member',
+            action='append',
+            dest='member_ids',
+            help='Only rebuild this team member (user id); repeat for several',
+        )
+
+    def handle(self, *args, **options):
+        start_date, end_date = options['start_date'], options['end_date']
+        if start_date and end_date and start_date > end_date:
+            raise CommandError('--start-date must be on or before --end-date')
+
+        written, deleted = TimeLedger.rebuild(start_date, end_date, options['member_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Rewrote {written} daily totals, removed {deleted} without ledger entries."))
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from projects.rollups import DailyMemberRollup
+
+class Command(BaseCommand):
+    help = 'Rebuilds the DailyMemberStats reporting rollup from the timer, roster and misc hours tables (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Number of days up to today to rebuild (ignored if --start-date is given)',
+        )
+        parser.add_argument(
+            '--start-date',
+            type=date.fromisoformat,
+            help='First day to rebuild (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--end-date',
+            type=date.fromisoformat,
+            help='Last day to rebuild (YYYY-MM-DD, default today)',
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='Number of days rebuilt per transaction',
+        )
+
+    def handle(self, *args, **options):
+        end_date = options['end_date'] or date.today()
+        start_date = options['start_date'] or end_date - timedelta(days=options['days'] - 1)
+        if start_date > end_date:
+            raise CommandError('--start-date must be on or before --end-date')
+
+        if not DailyMemberRollup.is_enabled():
+            self.stdout.write(self.style.WARNING(
+                'REPORTING_ROLLUP_ENABLED is off; reports will not read the rollup until it is enabled.'
+            ))
+
+        self.stdout.write(f"Rebuilding daily member stats from {start_date} to {end_date}...")
+
+        written = deleted = 0
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + timedelta(days=options['chunk_days'] - 1), end_date)
+            chunk_written, chunk_deleted = DailyMemberRollup.rebuild(chunk_start, chunk_end)
+            written += chunk_written
+            deleted += chunk_deleted
+            self.stdout.write(f"  ...{chunk_start} to {chunk_end}: {chunk_written} rows")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rows, removed {deleted} stale rows."))
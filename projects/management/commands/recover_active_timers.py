@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from projects.timers import CacheTimerBackend, get_timer_backend, recover_active_timers
+
+class Command(BaseCommand):
+    help = 'Rebuilds the cached running timers from the ActiveTimer rows after a cache loss or crash'
+
+    def handle(self, *args, **options):
+        backend = get_timer_backend()
+        if not isinstance(backend, CacheTimerBackend):
+            self.stdout.write(self.style.WARNING(
+                f"{type(backend).__name__} keeps timers in the database only; nothing to recover."
+            ))
+            return
+
+        restored, cleared = recover_active_timers(backend)
+        self.stdout.write(self.style.SUCCESS(
+            f"Restored {restored} cached timers, cleared {cleared} timers with no ActiveTimer row."
+        ))
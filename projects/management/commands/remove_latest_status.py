@@ -38,6 +38,7 @@ class Command(BaseCommand):
             with transaction.atomic():
                 from projects.models import ProjectStatusHistory
                 deleted_count, _ = ProjectStatusHistory.objects.filter(pk__in=histories_to_delete_pks).delete()
+                Project.refresh_status_dates()
                 self.stdout.write(self.style.SUCCESS(f'✅ Successfully deleted {deleted_count} status records.'))
         elif dry_run:
              self.stdout.write(self.style.WARNING('\nDRY RUN COMPLETE: The records listed above would be deleted.'))
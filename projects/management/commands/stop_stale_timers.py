@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from projects.services import ProjectService, DEFAULT_TIMER_MAX_SESSION_HOURS
+
+class Command(BaseCommand):
+    help = 'Auto-stops timers running longer than TIMER_MAX_SESSION_HOURS, splitting their time at local midnight'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-hours',
+            type=int,
+            default=getattr(settings, 'TIMER_MAX_SESSION_HOURS', DEFAULT_TIMER_MAX_SESSION_HOURS),
+            help='Stop timers that have been running for at least this many hours',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the stale timers without stopping them',
+        )
+
+    def handle(self, *args, **options):
+        max_hours = options['max_hours']
+        success, result = ProjectService.stop_stale_timers(max_hours=max_hours, dry_run=options['dry_run'])
+        if not success:
+            self.stderr.write(self.style.ERROR(result))
+            return
+
+        for timer in result:
+            started = timezone.localtime(timer.started_at).strftime('%Y-%m-%d %H:%M')
+            self.stdout.write(f"{timer.team_member.username}: {timer.assignment.assignment_id} since {started}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"{len(result)} timers running longer than {max_hours} hours (dry run)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Stopped {len(result)} timers running longer than {max_hours} hours."))
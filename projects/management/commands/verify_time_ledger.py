@@ -0,0 +1,64 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from projects.ledger import TimeLedger
+
+class Command(BaseCommand):
+    help = 'Compares DailyTimeTotal and the time ledger with the TimeSession sums and reports (or fixes) differences'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start-date',
+            type=date.fromisoformat,
+            help='First day to check (YYYY-MM-DD, default: the beginning)',
+        )
+        parser.add_argument(
+            '--end-date',
+            type=date.fromisoformat,
+            help='Last day to check (YYYY-MM-DD, default: the end)',
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Append reconciling ledger entries and rebuild the mismatched daily totals',
+        )
+        parser.add_argument(
+            '--show',
+            type=int,
+            default=20,
+            help='Number of differences of each kind to list',
+        )
+
+    def handle(self, *args, **options):
+        start_date, end_date = options['start_date'], options['end_date']
+        if start_date and end_date and start_date > end_date:
+            raise CommandError('--start-date must be on or before --end-date')
+
+        result = TimeLedger.verify(start_date, end_date)
+        missing_events, stale_totals = result['missing_events'], result['stale_totals']
+
+        self.report('Ledger differs from sessions', missing_events, 'sessions', 'ledger', options['show'])
+        self.report('Daily total differs from ledger', stale_totals, 'ledger', 'total', options['show'])
+
+        if not missing_events and not stale_totals:
+            self.stdout.write(self.style.SUCCESS('Daily totals, ledger and sessions all agree.'))
+            return
+
+        if not options['fix']:
+            self.stdout.write(self.style.WARNING('Run again with --fix to repair.'))
+            return
+
+        reconciled, _ = TimeLedger.reconcile(missing_events)
+        rewritten, deleted = TimeLedger.project(stale_totals.keys())
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled {len(missing_events)} days in the ledger; rewrote {reconciled + rewritten} and removed {deleted} daily totals."
+        ))
+
+    def report(self, label, differences, expected_label, actual_label, show):
+        self.stdout.write(f"{label}: {len(differences)}")
+        for (assignment_id, team_member_id, date_worked), (expected, actual) in sorted(
+            differences.items(), key=lambda item: (item[0][2], item[0][1])
+        )[:show]:
+            self.stdout.write(
+                f"  {date_worked} member {team_member_id} assignment {assignment_id}: "
+                f"{expected_label} {expected} min, {actual_label} {actual} min"
+            )
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-16 23:45
+
+import uuid
+from django.db import migrations, models
+
+
+def seed_hs_id_sequence(apps, schema_editor):
+    """Start the HS_ID counter after the highest HS_ID already in use."""
+    Project = apps.get_model('projects', 'Project')
+    IdSequence = apps.get_model('projects', 'IdSequence')
+
+    highest = 0
+    for hs_id in Project.objects.exclude(hs_id='').exclude(hs_id__isnull=True).values_list('hs_id', flat=True):
+        try:
+            number = int(hs_id[1:])
+        except (ValueError, IndexError):
+            continue
+        if not hs_id[0].isalpha() or not 1 <= number <= 999:
+            continue
+        value = (ord(hs_id[0].upper()) - ord('A')) * 999 + number
+        highest = max(highest, value)
+
+    IdSequence.objects.update_or_create(name='hs_id', defaults={'last_value': highest})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0026_timesession_reason'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdSequence',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text="Identifier family this counter belongs to (e.g. 'hs_id')", max_length=50, unique=True)),
+                ('last_value', models.PositiveBigIntegerField(default=0, help_text='Last value handed out from this sequence')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'ID Sequence',
+                'verbose_name_plural': 'ID Sequences',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(seed_hs_id_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-16 23:58
+
+from django.db import migrations
+
+
+def highest_number(queryset, field_name, prefix):
+    highest = 0
+    for identifier in queryset.values_list(field_name, flat=True):
+        if not identifier or not identifier.startswith(prefix):
+            continue
+        try:
+            highest = max(highest, int(identifier[len(prefix):]))
+        except ValueError:
+            continue
+    return highest
+
+
+def seed_sequences(apps, schema_editor):
+    """Start the TID_/ASID_ counters after the highest identifiers already in use."""
+    ProjectTask = apps.get_model('projects', 'ProjectTask')
+    TaskAssignment = apps.get_model('projects', 'TaskAssignment')
+    IdSequence = apps.get_model('projects', 'IdSequence')
+
+    IdSequence.objects.update_or_create(
+        name='task_id',
+        defaults={'last_value': highest_number(ProjectTask.objects.all(), 'task_id', 'TID_')}
+    )
+    IdSequence.objects.update_or_create(
+        name='assignment_id',
+        defaults={'last_value': highest_number(TaskAssignment.objects.all(), 'assignment_id', 'ASID_')}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0027_id_sequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-16 23:51
+
+from django.db import migrations, models
+
+
+def backfill_status_dates(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectStatusHistory = apps.get_model('projects', 'ProjectStatusHistory')
+
+    latest_change = ProjectStatusHistory.objects.filter(
+        project=models.OuterRef('pk')
+    ).order_by('-changed_at').values('changed_at')[:1]
+    first_delivery = ProjectStatusHistory.objects.filter(
+        project=models.OuterRef('pk'),
+        status__category_two__iexact='Final Delivery'
+    ).order_by('changed_at').values('changed_at')[:1]
+
+    Project.objects.update(
+        latest_status_changed_at=models.Subquery(latest_change),
+        delivered_at=models.Subquery(first_delivery)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0028_seed_task_assignment_sequences'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text="Timestamp of the first 'Final Delivery' status change", null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='latest_status_changed_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='Timestamp of the most recent status change', null=True),
+        ),
+        migrations.RunPython(backfill_status_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.4 on 2026-10-17 00:20
+
+from django.db import migrations
+
+# Indexes used by the backends in projects/search.py. SQLite has no equivalent
+# and keeps the plain icontains search.
+POSTGRES_TRIGRAM_COLUMNS = ['hs_id', 'project_name', 'opportunity_id', 'builder_name']
+MYSQL_FULLTEXT_INDEX = 'projects_project_search_ft'
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in POSTGRES_TRIGRAM_COLUMNS:
+            # icontains compiles to UPPER(column::text) LIKE UPPER(...), so index that expression
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS projects_project_{column}_trgm '
+                f'ON projects_project USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+            )
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            f'ALTER TABLE projects_project ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (project_name, builder_name)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for column in POSTGRES_TRIGRAM_COLUMNS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS projects_project_{column}_trgm')
+    elif vendor == 'mysql':
+        schema_editor.execute(f'ALTER TABLE projects_project DROP INDEX {MYSQL_FULLTEXT_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0029_project_status_dates'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
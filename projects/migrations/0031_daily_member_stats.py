@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-17 00:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0030_project_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMemberStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Day these totals cover')),
+                ('assignment_minutes', models.PositiveIntegerField(default=0, help_text='Minutes logged on assignments (sum of DailyTimeTotal)')),
+                ('misc_minutes', models.PositiveIntegerField(default=0, help_text='Misc minutes entered on the daily roster')),
+                ('misc_entry_minutes', models.PositiveIntegerField(default=0, help_text='Minutes from individual MiscHours entries')),
+                ('roster_status', models.CharField(blank=True, help_text='Roster status for the day, if a roster entry exists', max_length=20, null=True)),
+                ('completed_assignments', models.PositiveIntegerField(default=0, help_text='Assignments completed on this day')),
+                ('projected_minutes', models.PositiveIntegerField(default=0, help_text='Projected minutes of the assignments completed on this day')),
+                ('completed_worked_minutes', models.PositiveIntegerField(default=0, help_text='All minutes ever logged on the assignments completed on this day')),
+                ('rated_assignments', models.PositiveIntegerField(default=0, help_text='Completed assignments with a quality rating')),
+                ('rating_total', models.DecimalField(decimal_places=1, default=0, help_text='Sum of the quality ratings of the completed assignments', max_digits=8)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('team_member', models.ForeignKey(help_text='Team member these totals belong to', on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Member Stats',
+                'verbose_name_plural': 'Daily Member Stats',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='projects_da_date_3eb190_idx')],
+                'unique_together': {('team_member', 'date')},
+            },
+        ),
+    ]
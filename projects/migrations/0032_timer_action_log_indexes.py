@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-17 00:21
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0031_daily_member_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='timeractionlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='timeractionlog',
+            index=models.Index(fields=['team_member', '-timestamp'], name='projects_ti_team_me_a9256e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeractionlog',
+            index=models.Index(fields=['assignment', '-timestamp'], name='projects_ti_assignm_e2a637_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeractionlog',
+            index=models.Index(fields=['-timestamp'], name='projects_ti_timesta_d7c470_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0032_timer_action_log_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activetimer',
+            name='started_at',
+            field=models.DateTimeField(db_index=True, help_text='When the timer was started'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.4 on 2026-10-17 00:31
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_ledger(apps, schema_editor):
+    """
+    Seed the ledger with one SESSION_CREATED entry per existing session.
+    Existing daily totals are left alone; `manage.py verify_time_ledger`
+    lists the ones that differ from their sessions.
+    """
+    TimeSession = apps.get_model('projects', 'TimeSession')
+    TimeLedgerEntry = apps.get_model('projects', 'TimeLedgerEntry')
+
+    batch = []
+    for session in TimeSession.objects.order_by().iterator(chunk_size=2000):
+        if not session.duration_minutes:
+            continue
+        batch.append(TimeLedgerEntry(
+            assignment_id=session.assignment_id,
+            team_member_id=session.team_member_id,
+            date_worked=session.date_worked,
+            session_id=session.id,
+            event_type='SESSION_CREATED',
+            minutes_delta=session.duration_minutes,
+            created_at=session.created_at,
+        ))
+        if len(batch) >= 2000:
+            TimeLedgerEntry.objects.bulk_create(batch)
+            batch = []
+    TimeLedgerEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0033_active_timer_started_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeLedgerEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date_worked', models.DateField(help_text='The day the time counts towards')),
+                ('session_id', models.UUIDField(blank=True, db_index=True, help_text='The TimeSession this entry came from (kept after the session is deleted)', null=True)),
+                ('event_type', models.CharField(choices=[('SESSION_CREATED', 'Session Created'), ('DURATION_EDITED', 'Duration Edited'), ('SESSION_DELETED', 'Session Deleted'), ('RECONCILED', 'Reconciled')], help_text='What happened', max_length=20)),
+                ('minutes_delta', models.IntegerField(help_text="Minutes added to the day's total (negative for reductions)")),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('assignment', models.ForeignKey(help_text='The assignment the time was logged on', on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='projects.taskassignment')),
+                ('team_member', models.ForeignKey(help_text='Team member who logged the time', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Time Ledger Entry',
+                'verbose_name_plural': 'Time Ledger Entries',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['team_member', 'date_worked'], name='ledger_member_date_idx'), models.Index(fields=['date_worked'], name='ledger_date_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
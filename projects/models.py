@@ -7,6 +7,7 @@ from locations.models import City
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.db.models import Sum, Q
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
@@ -132,6 +133,41 @@ class ProjectStatusOption(models.Model):
         return f"{self.name} ({self.category_one} - {self.category_two})"
 
 
+class IdSequence(models.Model):
+    """
+    A named counter used to hand out human-readable identifiers.
+
+    Each row holds the last value handed out for one identifier family
+    (e.g. 'hs_id'). Allocation locks the row for the duration of the
+    surrounding transaction, so concurrent creates never receive the same
+    value and a rolled-back create gives its value back.
+    See projects/sequences.py for the allocation logic.
+    """
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    name = models.CharField(
+        max_length=50,
+        unique=True,
+        help_text="Identifier family this counter belongs to (e.g. 'hs_id')"
+    )
+    last_value = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Last value handed out from this sequence"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'ID Sequence'
+        verbose_name_plural = 'ID Sequences'
+
+    def __str__(self):
+        return f"{self.name} ({self.last_value})"
+
+
 class Project(models.Model):
     """
     The central model representing a project in the system.
@@ -265,6 +301,23 @@ class Project(models.Model):
         help_text="Delivery performance rating (1-5)"
     )
 
+    # Denormalized from ProjectStatusHistory so project lists can sort and
+    # filter by status dates from an index. Kept in sync by ProjectStatusHistory.save().
+    latest_status_changed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Timestamp of the most recent status change"
+    )
+    delivered_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Timestamp of the first 'Final Delivery' status change"
+    )
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -283,10 +336,8 @@ class Project(models.Model):
         Check if project is in a 'delivered' state based on category_two field.
         A project is delivered when its current status has category_two = 'Final Delivery'.
         """
-        if not self.current_status:
-            return False
-
-        return self.current_status.category_two == 'Final Delivery'
+        from .status_registry import StatusRegistry
+        return StatusRegistry.is_delivered(self.current_status_id)
 
     @property
     def delivery_date(self):
@@ -294,11 +345,44 @@ class Project(models.Model):
         Returns the date of the first status history entry that is considered
         a 'delivered' status (category_two = 'Final Delivery'). Returns None if not found.
         """
-        history_entry = self.status_history.filter(
-            status__category_two__iexact='Final Delivery'
-        ).order_by('changed_at').first()
+        return self.delivered_at
 
-        return history_entry.changed_at if history_entry else None
+    @classmethod
+    def refresh_status_dates(cls, queryset=None):
+        """
+        Recompute latest_status_changed_at and delivered_at from the status history
+        with a single UPDATE. Used after bulk changes to ProjectStatusHistory, which
+        bypass ProjectStatusHistory.save().
+
+        Args:
+            queryset: Projects to refresh (defaults to all projects)
+
+        Returns:
+            int: Number of projects updated
+        """
+        from .status_registry import StatusRegistry
+
+        if queryset is None:
+            queryset = cls.objects.all()
+
+        latest_change = ProjectStatusHistory.objects.filter(
+            project=models.OuterRef('pk')
+        ).order_by('-changed_at').values('changed_at')[:1]
+
+        delivered_status_ids = StatusRegistry.delivered_status_ids()
+        if delivered_status_ids:
+            first_delivery = models.Subquery(ProjectStatusHistory.objects.filter(
+                project=models.OuterRef('pk'),
+                status_id__in=delivered_status_ids
+            ).order_by('changed_at').values('changed_at')[:1])
+        else:
+            # An empty IN () would make Django skip the whole UPDATE
+            first_delivery = models.Value(None, output_field=models.DateTimeField())
+
+        return queryset.order_by().update(
+            latest_status_changed_at=models.Subquery(latest_change),
+            delivered_at=first_delivery
+        )
 
     @property
     def is_pipeline(self):
@@ -306,48 +390,18 @@ class Project(models.Model):
         Check if project is in pipeline state.
         A project is in pipeline if its current status category_two is not 'Final Delivery'.
         """
-        if not self.current_status:
-            return True  # New projects without status are considered pipeline
-
-        # Pipeline means category_two is not 'Final Delivery'
-        return self.current_status.category_two != 'Final Delivery'
+        # New projects without status are considered pipeline
+        return not self.is_delivered
 
     @classmethod
     def generate_hs_id(cls):
         """
-        Generates the next available HS_ID in sequence (A1, A2,...A999, B1, etc.)
+        Returns the next HS_ID in sequence (A1, A2,...A999, B1, etc.) without reserving it.
+        New projects get their HS_ID from the sequence table when they are saved;
+        see projects/sequences.py.
         """
-        # Get all projects with HS_IDs, including the current project being saved
-        projects = cls.objects.filter(hs_id__isnull=False).exclude(hs_id='').order_by('hs_id')
-
-        if not projects.exists():
-            return 'A1'  # Start with A1 if no projects exist
-
-        # Find the highest HS_ID by parsing all of them
-        max_letter = 'A'
-        max_number = 0
-
-        for project in projects:
-            if project.hs_id:
-                try:
-                    letter = project.hs_id[0]
-                    number = int(project.hs_id[1:])
-
-                    # Compare letter first, then number
-                    if letter > max_letter or (letter == max_letter and number > max_number):
-                        max_letter = letter
-                        max_number = number
-                except (ValueError, IndexError):
-                    # Skip invalid HS_IDs
-                    continue
-
-        # Generate next HS_ID
-        if max_number >= 999:
-            # Move to next letter
-            next_letter = chr(ord(max_letter) + 1)
-            return f'{next_letter}1'
-        else:
-            return f'{max_letter}{max_number + 1}'
+        from .sequences import SequenceService
+        return SequenceService.peek_hs_id()
 
     def __str__(self):
         return f"{self.project_name} ({self.opportunity_id})"
@@ -375,10 +429,17 @@ class Project(models.Model):
 
         # --- REMOVED: Flawed HS_ID generation logic ---
 
-        # Save the project instance first
-        super().save(*args, **kwargs)
+        # Save inside a transaction so an HS_ID taken from the sequence by the
+        # pre_save signal is given back if the insert fails
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._create_status_history(is_bulk_import, is_new, status_changed)
 
-        # After saving, create the initial status history, but skip if it's a bulk import
+    def _create_status_history(self, is_bulk_import, is_new, status_changed):
+        """
+        Create the status history entry for a new project or a status change.
+        """
+        # Skip status history for bulk imports
         if not is_bulk_import and (is_new or status_changed):
             # Get the custom status date if provided, otherwise use current datetime
             status_change_date = getattr(self, '_status_change_date', None)
@@ -405,8 +466,15 @@ def set_project_hs_id(sender, instance, **kwargs):
     Signal receiver to set the HS_ID for a new project only if it's not already set.
     This is the correct way to handle default value generation.
     """
-    if instance._state.adding and not instance.hs_id:
-        instance.hs_id = Project.generate_hs_id()
+    if not instance._state.adding:
+        return
+
+    from .sequences import SequenceService
+    if not instance.hs_id:
+        instance.hs_id = SequenceService.allocate_hs_id()
+    else:
+        # Explicit HS_IDs (imports, manual entry) must never be handed out again
+        SequenceService.register_hs_ids([instance.hs_id])
 
 
 class ProjectStatusHistory(models.Model):
@@ -467,6 +535,26 @@ class ProjectStatusHistory(models.Model):
             self.category_one_snapshot = self.status.category_one
             self.category_two_snapshot = self.status.category_two
         super().save(*args, **kwargs)
+        self._sync_project_status_dates()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._sync_project_status_dates()
+        return result
+
+    def _sync_project_status_dates(self):
+        """
+        Keep the project's latest_status_changed_at/delivered_at in line with its history,
+        including the in-memory project so a later project.save() doesn't overwrite them.
+        """
+        projects = Project.objects.filter(pk=self.project_id)
+        Project.refresh_status_dates(projects)
+
+        if ProjectStatusHistory.project.is_cached(self):
+            dates = projects.values('latest_status_changed_at', 'delivered_at').first()
+            if dates:
+                self.project.latest_status_changed_at = dates['latest_status_changed_at']
+                self.project.delivered_at = dates['delivered_at']
 
     class Meta:
         ordering = ['-changed_at']
@@ -591,21 +679,16 @@ class ProjectTask(models.Model):
         return f"{hours:02d}:{minutes:02d}"
 
     def save(self, *args, **kwargs):
-        # Generate task_id for new tasks
-        if not self.task_id:
-            last_task = ProjectTask.objects.order_by('-task_id').first()
-            if last_task:
-                last_number = int(last_task.task_id.split('_')[1])
-                new_number = last_number + 1
-            else:
-                new_number = 1
-            self.task_id = f"TID_{new_number:05d}"
-
         # Validate the task belongs to project's product
         if self.product_task.product_id != self.project.product_id:
             raise ValidationError("Task must belong to the project's product")
 
-        super().save(*args, **kwargs)
+        # Allocate task_id inside the save transaction so a failed insert gives it back
+        with transaction.atomic():
+            if not self.task_id:
+                from .sequences import get_allocator
+                self.task_id = get_allocator('task_id').allocate()
+            super().save(*args, **kwargs)
 
     @property
     def total_projected_hours(self):
@@ -616,6 +699,51 @@ class ProjectTask(models.Model):
 
 
 
+class TaskAssignmentQuerySet(models.QuerySet):
+    """
+    QuerySet for TaskAssignment with reusable reporting annotations.
+    """
+
+    def with_work_totals(self):
+        """
+        Annotate each assignment with its worked time, computed in the database:
+
+        - total_worked_minutes: sum of its DailyTimeTotal minutes (0 if none)
+        - progress_percentage: worked / projected * 100 (0 without a projection)
+        - productivity: projected / worked * 100 (None until both are set)
+        """
+        worked = Coalesce(
+            models.Subquery(
+                DailyTimeTotal.objects.filter(
+                    assignment=models.OuterRef('pk')
+                ).order_by().values('assignment').annotate(
+                    total=models.Sum('total_minutes')
+                ).values('total')[:1],
+                output_field=models.IntegerField()
+            ),
+            0
+        )
+        return self.annotate(total_worked_minutes=worked).annotate(
+            progress_percentage=models.Case(
+                models.When(
+                    projected_hours__gt=0,
+                    then=models.F('total_worked_minutes') * 100.0 / models.F('projected_hours')
+                ),
+                default=models.Value(0.0),
+                output_field=models.FloatField()
+            ),
+            productivity=models.Case(
+                models.When(
+                    projected_hours__gt=0,
+                    total_worked_minutes__gt=0,
+                    then=models.F('projected_hours') * 100.0 / models.F('total_worked_minutes')
+                ),
+                default=None,
+                output_field=models.FloatField()
+            ),
+        )
+
+
 class TaskAssignment(models.Model):
     """
     Represents an assignment of a project task to a team member.
@@ -711,6 +839,8 @@ class TaskAssignment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskAssignmentQuerySet.as_manager()
+
     class Meta:
         ordering = ['-assigned_date']
         verbose_name = 'Task Assignment'
@@ -736,32 +866,31 @@ class TaskAssignment(models.Model):
     # Add this new method to calculate total working hours
     def get_total_working_hours(self):
         """Calculate total hours worked across all daily totals"""
-        total_minutes = self.daily_totals.aggregate(
-            total=models.Sum('total_minutes')
-        )['total'] or 0
+        # Already annotated when loaded through TaskAssignment.objects.with_work_totals()
+        total_minutes = getattr(self, 'total_worked_minutes', None)
+        if total_minutes is None:
+            total_minutes = self.daily_totals.aggregate(
+                total=models.Sum('total_minutes')
+            )['total'] or 0
 
         hours = total_minutes // 60
         minutes = total_minutes % 60
         return f"{hours:02d}:{minutes:02d}"
 
     def save(self, *args, **kwargs):
-        # Generate assignment_id for new assignments
-        if not self.assignment_id:
-            last_assignment = TaskAssignment.objects.order_by('-assignment_id').first()
-            if last_assignment:
-                last_number = int(last_assignment.assignment_id.split('_')[1])
-                new_number = last_number + 1
-            else:
-                new_number = 1
-            self.assignment_id = f"ASID_{new_number:06d}"
-
         # Only validate assigned_by role for NEW assignments or when assigned_by is being changed
         if not self.pk or 'assigned_by' in getattr(self, '_changed_fields', []):
             if self.assigned_by and self.assigned_by.role != 'DPM':
                 raise ValidationError("Only DPMs can create assignments")
 
-        self.full_clean()  # This will run the validation
-        super().save(*args, **kwargs)
+        # Allocate assignment_id inside the save transaction so a failed insert gives it back
+        with transaction.atomic():
+            if not self.assignment_id:
+                from .sequences import get_allocator
+                self.assignment_id = get_allocator('assignment_id').allocate()
+
+            self.full_clean()  # This will run the validation
+            super().save(*args, **kwargs)
 
 
 class ActiveTimer(models.Model):
@@ -785,6 +914,7 @@ class ActiveTimer(models.Model):
     help_text="Team member with active timer"
     )
     started_at = models.DateTimeField(
+        db_index=True,
         help_text="When the timer was started"
     )
     last_updated = models.DateTimeField(auto_now=True)
@@ -943,6 +1073,78 @@ class DailyTimeTotal(models.Model):
         return f"{hours:02d}:{minutes:02d}"
 
 
+class TimeLedgerEntry(models.Model):
+    """
+    Append-only record of every change to logged time.
+
+    Each entry adds (or, for edits and deletions, subtracts) minutes for one
+    assignment, team member and day. DailyTimeTotal is a projection of this
+    table (see projects/ledger.py): the total for a day is the sum of its
+    entries, so it can always be rebuilt. Entries are never updated or deleted.
+    """
+    SESSION_CREATED = 'SESSION_CREATED'
+    DURATION_EDITED = 'DURATION_EDITED'
+    SESSION_DELETED = 'SESSION_DELETED'
+    RECONCILED = 'RECONCILED'
+
+    EVENT_CHOICES = [
+        (SESSION_CREATED, 'Session Created'),
+        (DURATION_EDITED, 'Duration Edited'),
+        (SESSION_DELETED, 'Session Deleted'),
+        (RECONCILED, 'Reconciled'),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    assignment = models.ForeignKey(
+        TaskAssignment,
+        on_delete=models.CASCADE,
+        related_name='ledger_entries',
+        help_text="The assignment the time was logged on"
+    )
+    team_member = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        help_text="Team member who logged the time"
+    )
+    date_worked = models.DateField(
+        help_text="The day the time counts towards"
+    )
+    session_id = models.UUIDField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="The TimeSession this entry came from (kept after the session is deleted)"
+    )
+    event_type = models.CharField(
+        max_length=20,
+        choices=EVENT_CHOICES,
+        help_text="What happened"
+    )
+    minutes_delta = models.IntegerField(
+        help_text="Minutes added to the day's total (negative for reductions)"
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        editable=False
+    )
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Time Ledger Entry'
+        verbose_name_plural = 'Time Ledger Entries'
+        indexes = [
+            models.Index(fields=['team_member', 'date_worked'], name='ledger_member_date_idx'),
+            models.Index(fields=['date_worked'], name='ledger_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} - {self.team_member_id} - {self.date_worked} - {self.minutes_delta:+d}"
+
+
 class TimerActionLog(models.Model):
     """
     Audit trail for all timer-related actions.
@@ -973,7 +1175,8 @@ class TimerActionLog(models.Model):
             ('COMPLETE', 'Task Completed')
         ]
     )
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action happens, not when the buffered entry is written (see projects/audit.py)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     details = models.TextField(
         blank=True,
         help_text="Additional details about this action"
@@ -983,10 +1186,61 @@ class TimerActionLog(models.Model):
         ordering = ['-timestamp']
         verbose_name = 'Timer Action Log'
         verbose_name_plural = 'Timer Action Logs'
+        indexes = [
+            models.Index(fields=['team_member', '-timestamp']),
+            models.Index(fields=['assignment', '-timestamp']),
+            models.Index(fields=['-timestamp']),
+        ]
 
     def __str__(self):
         return f"{self.assignment.assignment_id} - {self.action} - {self.timestamp}"
 
+class DailyRosterQuerySet(models.QuerySet):
+    """
+    QuerySet for DailyRoster with the day's worked time computed in the database.
+    """
+
+    def with_hours(self):
+        """
+        Annotate each roster entry with the minutes its properties would
+        otherwise query for, one entry at a time:
+
+        - assignment_minutes: sum of the member's DailyTimeTotal for the day
+        - misc_entry_minutes: sum of the member's MiscHours entries for the day
+        - total_minutes: both plus the legacy misc_hours field
+        """
+        assignment_minutes = Coalesce(
+            models.Subquery(
+                DailyTimeTotal.objects.filter(
+                    team_member=models.OuterRef('team_member'),
+                    date_worked=models.OuterRef('date')
+                ).order_by().values('team_member').annotate(
+                    total=models.Sum('total_minutes')
+                ).values('total')[:1],
+                output_field=models.IntegerField()
+            ),
+            0
+        )
+        misc_entry_minutes = Coalesce(
+            models.Subquery(
+                MiscHours.objects.filter(
+                    team_member=models.OuterRef('team_member'),
+                    date=models.OuterRef('date')
+                ).order_by().values('team_member').annotate(
+                    total=models.Sum('duration_minutes')
+                ).values('total')[:1],
+                output_field=models.IntegerField()
+            ),
+            0
+        )
+        return self.annotate(
+            assignment_minutes=assignment_minutes,
+            misc_entry_minutes=misc_entry_minutes,
+        ).annotate(
+            total_minutes=models.F('assignment_minutes') + models.F('misc_hours') + models.F('misc_entry_minutes')
+        )
+
+
 # In your models.py - Replace the DailyRoster class with this simplified version
 
 class DailyRoster(models.Model):
@@ -1062,51 +1316,68 @@ class DailyRoster(models.Model):
     def __str__(self):
         return f"{self.team_member.username} - {self.date} - {self.get_status_display()}"
 
+    objects = DailyRosterQuerySet.as_manager()
+
+    def _precomputed(self, cached_name, annotated_name):
+        """
+        A value set by DailyRosterQuerySet.with_hours() or cached by the roster
+        services (_cached_*), or None to compute it.
+        """
+        for name in (cached_name, annotated_name):
+            value = self.__dict__.get(name)
+            if value is not None:
+                return value
+        return None
+
     @property
     def assignment_hours(self):
         """Calculate assignment hours dynamically from DailyTimeTotal"""
-        return DailyTimeTotal.objects.filter(
-            team_member=self.team_member,
-            date_worked=self.date
-        ).aggregate(total=Sum('total_minutes'))['total'] or 0
+        minutes = self._precomputed('_cached_assignment_hours', 'assignment_minutes')
+        if minutes is None:
+            minutes = DailyTimeTotal.objects.filter(
+                team_member=self.team_member_id,
+                date_worked=self.date
+            ).aggregate(total=Sum('total_minutes'))['total'] or 0
+        return minutes
 
     @property
     def misc_hours_new(self):
         """Calculate misc hours dynamically from MiscHours model"""
-        return MiscHours.objects.filter(
-            team_member=self.team_member,
-            date=self.date
-        ).aggregate(total=Sum('duration_minutes'))['total'] or 0
+        minutes = self._precomputed('_cached_misc_hours_new', 'misc_entry_minutes')
+        if minutes is None:
+            minutes = MiscHours.objects.filter(
+                team_member=self.team_member_id,
+                date=self.date
+            ).aggregate(total=Sum('duration_minutes'))['total'] or 0
+        return minutes
 
     @property
     def total_hours(self):
         """Total hours worked (assignment + misc from both old and new models)"""
-        return self.assignment_hours + self.misc_hours + self.misc_hours_new
+        minutes = self._precomputed('_cached_total_hours', 'total_minutes')
+        if minutes is None:
+            minutes = self.assignment_hours + self.misc_hours + self.misc_hours_new
+        return minutes
+
+    @staticmethod
+    def _format_hhmm(total_minutes):
+        return f"{total_minutes // 60:02d}:{total_minutes % 60:02d}"
 
     def get_total_hours_formatted(self):
         """Get total hours in HH:MM format"""
-        total_minutes = self.total_hours
-        hours = total_minutes // 60
-        minutes = total_minutes % 60
-        return f"{hours:02d}:{minutes:02d}"
+        return self._format_hhmm(self.total_hours)
 
     def get_assignment_hours_formatted(self):
         """Get assignment hours in HH:MM format"""
-        hours = self.assignment_hours // 60
-        minutes = self.assignment_hours % 60
-        return f"{hours:02d}:{minutes:02d}"
+        return self._format_hhmm(self.assignment_hours)
 
     def get_misc_hours_formatted(self):
         """Get misc hours in HH:MM format"""
-        hours = self.misc_hours // 60
-        minutes = self.misc_hours % 60
-        return f"{hours:02d}:{minutes:02d}"
+        return self._format_hhmm(self.misc_hours)
 
     def get_misc_hours_new_formatted(self):
         """Get new misc hours in HH:MM format"""
-        hours = self.misc_hours_new // 60
-        minutes = self.misc_hours_new % 60
-        return f"{hours:02d}:{minutes:02d}"
+        return self._format_hhmm(self.misc_hours_new)
 
 
 class MiscHours(models.Model):
@@ -1293,4 +1564,81 @@ class ProjectDelivery(models.Model):
         """Calculate days variance dynamically"""
         if self.expected_completion_date and self.actual_completion_date:
             return (self.actual_completion_date - self.expected_completion_date).days
-        return 0
\ No newline at end of file
+        return 0
+
+class DailyMemberStats(models.Model):
+    """
+    Materialized per team member, per day totals for reporting.
+
+    Rebuilt from DailyTimeTotal, DailyRoster, MiscHours and TaskAssignment by
+    projects/rollups.py whenever one of those changes, and reconciled nightly
+    by the reconcile_daily_member_stats command. Only maintained when
+    REPORTING_ROLLUP_ENABLED is set.
+    """
+    team_member = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        help_text="Team member these totals belong to"
+    )
+    date = models.DateField(
+        help_text="Day these totals cover"
+    )
+
+    # Time worked on the day
+    assignment_minutes = models.PositiveIntegerField(
+        default=0,
+        help_text="Minutes logged on assignments (sum of DailyTimeTotal)"
+    )
+    misc_minutes = models.PositiveIntegerField(
+        default=0,
+        help_text="Misc minutes entered on the daily roster"
+    )
+    misc_entry_minutes = models.PositiveIntegerField(
+        default=0,
+        help_text="Minutes from individual MiscHours entries"
+    )
+    roster_status = models.CharField(
+        max_length=20,
+        null=True,
+        blank=True,
+        help_text="Roster status for the day, if a roster entry exists"
+    )
+
+    # Assignments completed on the day
+    completed_assignments = models.PositiveIntegerField(
+        default=0,
+        help_text="Assignments completed on this day"
+    )
+    projected_minutes = models.PositiveIntegerField(
+        default=0,
+        help_text="Projected minutes of the assignments completed on this day"
+    )
+    completed_worked_minutes = models.PositiveIntegerField(
+        default=0,
+        help_text="All minutes ever logged on the assignments completed on this day"
+    )
+    rated_assignments = models.PositiveIntegerField(
+        default=0,
+        help_text="Completed assignments with a quality rating"
+    )
+    rating_total = models.DecimalField(
+        max_digits=8,
+        decimal_places=1,
+        default=0,
+        help_text="Sum of the quality ratings of the completed assignments"
+    )
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['team_member', 'date']
+        ordering = ['-date']
+        verbose_name = 'Daily Member Stats'
+        verbose_name_plural = 'Daily Member Stats'
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.team_member_id} - {self.date}"
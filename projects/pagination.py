@@ -0,0 +1,204 @@
+#projects/pagination.py
+"""
+Keyset (cursor) pagination for the project lists.
+
+Django's Paginator runs a COUNT(*) and an OFFSET query per page, and both get
+slower the further into a large list you go. KeysetPaginator instead seeks
+straight to the row after (or before) the last one shown, using the list's
+sort key, so every page costs the same. The total shown next to the list is
+cached for a few minutes instead of being counted on every page view.
+"""
+import base64
+import hashlib
+import json
+import logging
+from datetime import datetime
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db.models import F, Q
+
+logger = logging.getLogger(__name__)
+
+COUNT_CACHE_TIMEOUT = 300  # seconds
+
+
+def cached_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    """
+    Count a queryset, reusing the result for identical queries for `timeout` seconds.
+    The number may lag behind by a few minutes, which is fine for a "N total" label.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    key = 'projects:count:' + hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class KeysetPage:
+    """
+    One page of a KeysetPaginator. Iterates like a Paginator page.
+    """
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset sorted descending on `keys`, with NULLs last.
+
+    The last key must be unique (e.g. the primary key) so every row has a
+    distinct position. Cursors are opaque strings safe to put in a URL.
+
+    Args:
+        queryset: The queryset to paginate (its ordering is replaced)
+        per_page: Rows per page
+        keys: Field names making up the sort key, most significant first
+        nullable: Field names among `keys` that may be NULL
+    """
+
+    def __init__(self, queryset, per_page, keys, nullable=()):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = list(keys)
+        self.nullable = set(nullable)
+
+    @property
+    def count(self):
+        """Approximate total, cached between page views."""
+        return cached_count(self.queryset.order_by())
+
+    def _ordering(self, reverse=False):
+        ordering = []
+        for key in self.keys:
+            if reverse:
+                ordering.append(F(key).asc(nulls_first=True) if key in self.nullable else F(key).asc())
+            else:
+                ordering.append(F(key).desc(nulls_last=True) if key in self.nullable else F(key).desc())
+        return ordering
+
+    def _after(self, values, index=0):
+        """Rows strictly after `values` in descending, NULLs-last order."""
+        key, value = self.keys[index], values[index]
+        is_last = index == len(self.keys) - 1
+        nullable = key in self.nullable
+
+        if value is None:
+            # Nothing sorts after NULL except other NULLs further down the remaining keys
+            if is_last:
+                return Q(pk__in=[])
+            return Q(**{f'{key}__isnull': True}) & self._after(values, index + 1)
+
+        condition = Q(**{f'{key}__lt': value})
+        if nullable:
+            condition |= Q(**{f'{key}__isnull': True})
+        if not is_last:
+            condition |= Q(**{key: value}) & self._after(values, index + 1)
+        return condition
+
+    def _before(self, values, index=0):
+        """Rows strictly before `values` in descending, NULLs-last order."""
+        key, value = self.keys[index], values[index]
+        is_last = index == len(self.keys) - 1
+
+        if value is None:
+            condition = Q(**{f'{key}__isnull': False})
+            if not is_last:
+                condition |= Q(**{f'{key}__isnull': True}) & self._before(values, index + 1)
+            return condition
+
+        condition = Q(**{f'{key}__gt': value})
+        if not is_last:
+            condition |= Q(**{key: value}) & self._before(values, index + 1)
+        return condition
+
+    def _encode(self, obj, direction):
+        values = []
+        for key in self.keys:
+            value = getattr(obj, key)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif value is not None and not isinstance(value, (int, float, str)):
+                value = str(value)
+            values.append(value)
+        payload = json.dumps({'d': direction, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def cursor_after(self, obj):
+        """A cursor for the page after `obj`, e.g. to continue from a numbered page."""
+        return self._encode(obj, 'next')
+
+    def _decode(self, cursor):
+        """
+        Returns:
+            tuple: (direction, values) or (None, None) for a missing/invalid cursor
+        """
+        if not cursor:
+            return None, None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            direction, raw_values = payload['d'], payload['v']
+            if direction not in ('next', 'prev') or len(raw_values) != len(self.keys):
+                raise ValueError("Cursor does not match this list")
+
+            model = self.queryset.model
+            values = [
+                None if raw is None else model._meta.get_field(key).to_python(raw)
+                for key, raw in zip(self.keys, raw_values)
+            ]
+            return direction, values
+        except (ValueError, KeyError, TypeError, ValidationError) as e:
+            logger.warning(f"Ignoring invalid pagination cursor: {str(e)}")
+            return None, None
+
+    def get_page(self, cursor=None):
+        """
+        Return the page that starts after (or ends before) the cursor.
+        A missing or invalid cursor returns the first page.
+        """
+        direction, values = self._decode(cursor)
+
+        if direction == 'prev':
+            rows = list(
+                self.queryset.filter(self._before(values)).order_by(*self._ordering(reverse=True))[:self.per_page + 1]
+            )
+            has_more_before = len(rows) > self.per_page
+            rows = list(reversed(rows[:self.per_page]))
+            has_more_after = True
+        else:
+            queryset = self.queryset
+            if direction == 'next':
+                queryset = queryset.filter(self._after(values))
+            rows = list(queryset.order_by(*self._ordering())[:self.per_page + 1])
+            has_more_after = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_more_before = direction == 'next'
+
+        next_cursor = self._encode(rows[-1], 'next') if rows and has_more_after else None
+        previous_cursor = self._encode(rows[0], 'prev') if rows and has_more_before else None
+        return KeysetPage(rows, self, next_cursor=next_cursor, previous_cursor=previous_cursor)
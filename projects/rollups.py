@@ -0,0 +1,258 @@
+#projects/rollups.py
+"""
+Per team member, per day rollup (DailyMemberStats) for the reports.
+
+ReportingService normally computes every report from DailyTimeTotal,
+DailyRoster, MiscHours and TaskAssignment. That is fine for a month but gets
+slow over multi-year ranges, so when REPORTING_ROLLUP_ENABLED is set the
+same totals are kept in one row per member and day:
+
+- Time totals, roster and misc entries refresh the row for their own day.
+- Assignments refresh the row for the day they were completed on, since
+  completions, projected time and ratings are counted there. Time logged on
+  an already completed assignment refreshes that row too.
+- The reconcile_daily_member_stats command rebuilds a date range from
+  scratch every night, catching anything written around the ORM.
+
+Reports covering at least REPORTING_ROLLUP_MIN_DAYS days read the rollup.
+"""
+import logging
+from datetime import date
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum, Count, Q, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import DailyMemberStats, DailyTimeTotal, DailyRoster, MiscHours, TaskAssignment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_DAYS = 90
+# Incremental refreshes for days further apart than this rebuild each day separately
+MAX_REFRESH_SPAN_DAYS = 31
+
+ROLLUP_FIELDS = [
+    'assignment_minutes',
+    'misc_minutes',
+    'misc_entry_minutes',
+    'roster_status',
+    'completed_assignments',
+    'projected_minutes',
+    'completed_worked_minutes',
+    'rated_assignments',
+    'rating_total',
+]
+
+
+class DailyMemberRollup:
+    """
+    Builds and maintains DailyMemberStats rows.
+    """
+
+    @staticmethod
+    def is_enabled():
+        return getattr(settings, 'REPORTING_ROLLUP_ENABLED', False)
+
+    @staticmethod
+    def covers(start_date, end_date):
+        """Whether a report over this range should read the rollup instead of the source tables."""
+        min_days = getattr(settings, 'REPORTING_ROLLUP_MIN_DAYS', DEFAULT_MIN_DAYS)
+        return DailyMemberRollup.is_enabled() and (end_date - start_date).days + 1 >= min_days
+
+    @staticmethod
+    def completion_key(assignment):
+        """
+        The (team member id, day) row an assignment's completion is counted in,
+        or None if it isn't completed.
+        """
+        if not assignment.is_completed or not assignment.completion_date:
+            return None
+        return assignment.assigned_to_id, timezone.localdate(assignment.completion_date)
+
+    @staticmethod
+    def compute(start_date, end_date, member_ids=None):
+        """
+        Compute the rollup rows for a date range from the source tables.
+
+        Args:
+            start_date: First day
+            end_date: Last day
+            member_ids: Limit to these team members (default: everyone)
+
+        Returns:
+            dict: (team member id, date) -> {field: value}, only for days with data
+        """
+        def scoped(queryset, member_field):
+            if member_ids is not None:
+                queryset = queryset.filter(**{f'{member_field}__in': member_ids})
+            return queryset.order_by()
+
+        rows = {}
+
+        def row(member_id, day):
+            key = (member_id, day)
+            if key not in rows:
+                rows[key] = {field: 0 for field in ROLLUP_FIELDS}
+                rows[key]['roster_status'] = None
+            return rows[key]
+
+        for item in scoped(DailyTimeTotal.objects.filter(
+            date_worked__range=[start_date, end_date]
+        ), 'team_member_id').values('team_member', 'date_worked').annotate(minutes=Sum('total_minutes')):
+            row(item['team_member'], item['date_worked'])['assignment_minutes'] = item['minutes'] or 0
+
+        for member_id, day, status, misc in scoped(DailyRoster.objects.filter(
+            date__range=[start_date, end_date]
+        ), 'team_member_id').values_list('team_member', 'date', 'status', 'misc_hours'):
+            roster_row = row(member_id, day)
+            roster_row['roster_status'] = status
+            roster_row['misc_minutes'] = misc or 0
+
+        for item in scoped(MiscHours.objects.filter(
+            date__range=[start_date, end_date]
+        ), 'team_member_id').values('team_member', 'date').annotate(minutes=Sum('duration_minutes')):
+            row(item['team_member'], item['date'])['misc_entry_minutes'] = item['minutes'] or 0
+
+        # Completions are counted on the (local) day the assignment was completed
+        rated = Q(quality_rating__isnull=False) & ~Q(quality_rating=0)
+        for item in scoped(TaskAssignment.objects.filter(
+            is_completed=True,
+            completion_date__date__range=[start_date, end_date]
+        ), 'assigned_to_id').annotate(day=TruncDate('completion_date')).values('assigned_to', 'day').annotate(
+            count=Count('id'),
+            projected=Sum('projected_hours'),
+            rated_count=Count('id', filter=rated),
+            rating_total=Sum('quality_rating', filter=rated),
+        ):
+            completion_row = row(item['assigned_to'], item['day'])
+            completion_row['completed_assignments'] = item['count']
+            completion_row['projected_minutes'] = item['projected'] or 0
+            completion_row['rated_assignments'] = item['rated_count']
+            completion_row['rating_total'] = item['rating_total'] or 0
+
+        # All time ever logged on those assignments by their assignee
+        for item in scoped(DailyTimeTotal.objects.filter(
+            assignment__assigned_to_id=F('team_member_id'),
+            assignment__is_completed=True,
+            assignment__completion_date__date__range=[start_date, end_date]
+        ), 'team_member_id').annotate(day=TruncDate('assignment__completion_date')).values('team_member', 'day').annotate(
+            minutes=Sum('total_minutes')
+        ):
+            row(item['team_member'], item['day'])['completed_worked_minutes'] = item['minutes'] or 0
+
+        return rows
+
+    @staticmethod
+    def rebuild(start_date, end_date, member_ids=None):
+        """
+        Rewrite the rollup rows for a date range, removing rows that no longer have data.
+
+        Returns:
+            tuple: (rows written, rows deleted)
+        """
+        rows = DailyMemberRollup.compute(start_date, end_date, member_ids)
+
+        with transaction.atomic():
+            existing = DailyMemberStats.objects.filter(date__range=[start_date, end_date])
+            if member_ids is not None:
+                existing = existing.filter(team_member_id__in=member_ids)
+            stale_ids = [
+                stats_id
+                for stats_id, member_id, day in existing.values_list('id', 'team_member_id', 'date')
+                if (member_id, day) not in rows
+            ]
+            deleted = 0
+            for offset in range(0, len(stale_ids), 500):
+                deleted += DailyMemberStats.objects.filter(id__in=stale_ids[offset:offset + 500]).delete()[0]
+
+            DailyMemberStats.objects.bulk_create(
+                [
+                    DailyMemberStats(team_member_id=member_id, date=day, refreshed_at=timezone.now(), **values)
+                    for (member_id, day), values in rows.items()
+                ],
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['team_member', 'date'],
+                update_fields=ROLLUP_FIELDS + ['refreshed_at'],
+            )
+
+        return len(rows), deleted
+
+    @staticmethod
+    def refresh(keys):
+        """
+        Incrementally refresh the rows for some (team member id, day) pairs.
+
+        Does nothing unless rollups are enabled. Errors are logged rather than
+        raised so a rollup problem never fails the timer/roster write that
+        triggered it; the nightly reconcile repairs the row.
+        """
+        if not DailyMemberRollup.is_enabled():
+            return
+
+        days_by_member = {}
+        for key in keys:
+            if key and key[0]:
+                member_id, day = key
+                if not isinstance(day, date):
+                    day = date.fromisoformat(str(day))
+                days_by_member.setdefault(member_id, set()).add(day)
+
+        for member_id, days in days_by_member.items():
+            # Nearby days (e.g. a month of auto-created rosters) are rebuilt as one range
+            if (max(days) - min(days)).days <= MAX_REFRESH_SPAN_DAYS:
+                spans = [(min(days), max(days))]
+            else:
+                spans = [(day, day) for day in sorted(days)]
+            for start_date, end_date in spans:
+                try:
+                    # Savepoint, so a failure doesn't break the caller's transaction
+                    with transaction.atomic():
+                        DailyMemberRollup.rebuild(start_date, end_date, [member_id])
+                except Exception as e:
+                    logger.exception(f"Error refreshing daily member stats for {member_id} from {start_date} to {end_date}: {str(e)}")
+
+    @staticmethod
+    def refresh_for_time_total(assignment, team_member_id, work_date):
+        """Refresh after a DailyTimeTotal change: the work day and, if completed, the completion day."""
+        DailyMemberRollup.refresh([
+            (team_member_id, work_date),
+            DailyMemberRollup.completion_key(assignment),
+        ])
+
+    @staticmethod
+    def get_range_totals(member_ids, start_date, end_date):
+        """
+        Sum the rollup over a date range, one row per team member.
+
+        Returns:
+            dict: team member id -> aggregated DailyMemberStats values
+        """
+        from django.db.models import Case, When, IntegerField, Value
+
+        return {
+            item['team_member']: item
+            for item in DailyMemberStats.objects.filter(
+                team_member_id__in=member_ids,
+                date__range=[start_date, end_date]
+            ).order_by().values('team_member').annotate(
+                projected=Sum('projected_minutes'),
+                assignment_count=Sum('completed_assignments'),
+                rated_count=Sum('rated_assignments'),
+                rating_total=Sum('rating_total'),
+                worked_on_completed=Sum('completed_worked_minutes'),
+                worked_in_range=Sum('assignment_minutes'),
+                available=Sum(Case(
+                    When(roster_status__in=['PRESENT', 'LEAVE', 'HALF_DAY'], then=Value(480)),
+                    default=Value(0),
+                    output_field=IntegerField()
+                )),
+                efficiency_available=Sum(Case(
+                    When(roster_status='PRESENT', then=Value(480)),
+                    When(roster_status='HALF_DAY', then=Value(240)),
+                    default=Value(0),
+                    output_field=IntegerField()
+                )),
+                misc=Sum('misc_minutes'),
+            )
+        }
@@ -0,0 +1,119 @@
+#projects/roster.py
+"""
+Default roster statuses and the virtual roster mode.
+
+Every day has a default status: HOLIDAY on an active holiday, WEEK_OFF on
+Saturday and Sunday, PRESENT otherwise. Normally a DailyRoster row holding
+the default is written the first time anyone reads the day (the dashboard,
+the monthly calendars).
+
+With ROSTER_VIRTUAL_MODE set, reads no longer write. Days without a row get
+an unsaved DailyRoster carrying the default (is_virtual=True), and only
+explicit edits (status changes) are stored, so DailyRoster holds exceptions
+only. Counts and availability that used to come from stored rows add the
+defaults of the days without one (RosterDefaults.default_day_counts).
+`manage.py prune_default_rosters` deletes stored rows that only repeat the
+default.
+"""
+from django.conf import settings
+from django.db.models import Count, Q
+from .holidays import HolidayCalendar
+from .models import DailyRoster, Holiday
+
+# Django's __week_day lookup numbers Sunday as 1 and Saturday as 7
+WEEKEND_WEEK_DAYS = (1, 7)
+
+
+class RosterDefaults:
+    """
+    Default statuses, and virtual roster entries built from them.
+    """
+
+    @staticmethod
+    def is_virtual():
+        return getattr(settings, 'ROSTER_VIRTUAL_MODE', False)
+
+    @staticmethod
+    def holidays(start_date, end_date):
+        """Active holiday dates in a range, from the holiday calendar."""
+        return HolidayCalendar.holidays(start_date, end_date)
+
+    @staticmethod
+    def default_status(day, holidays):
+        if day in holidays:
+            return 'HOLIDAY'
+        if HolidayCalendar.is_weekend(day):
+            return 'WEEK_OFF'
+        return 'PRESENT'
+
+    @staticmethod
+    def virtual(team_member, day, status):
+        """An unsaved roster entry holding a day's default."""
+        roster = DailyRoster(team_member=team_member, date=day, status=status, is_auto_created=True)
+        roster.is_virtual = True
+        return roster
+
+    @staticmethod
+    def default_day_counts(member_ids, start_date, end_date):
+        """
+        Days in a range each member has no stored roster row for, by default
+        status. Adding these to counts over stored rows gives the counts of
+        the virtual roster.
+
+        Returns:
+            dict: team member id -> {'PRESENT': days, 'WEEK_OFF': days, 'HOLIDAY': days}
+        """
+        holidays = RosterDefaults.holidays(start_date, end_date)
+        working_days = HolidayCalendar.working_days(start_date, end_date)
+        totals = {
+            'PRESENT': working_days,
+            'WEEK_OFF': (end_date - start_date).days + 1 - working_days - len(holidays),
+            'HOLIDAY': len(holidays),
+        }
+
+        weekend = Q(date__week_day__in=WEEKEND_WEEK_DAYS) & ~Q(date__in=holidays)
+        stored = {
+            row['team_member']: row
+            for row in DailyRoster.objects.filter(
+                team_member_id__in=member_ids,
+                date__range=[start_date, end_date]
+            ).order_by().values('team_member').annotate(
+                holiday=Count('id', filter=Q(date__in=holidays)),
+                week_off=Count('id', filter=weekend),
+                all_days=Count('id'),
+            )
+        }
+
+        counts = {}
+        for member_id in member_ids:
+            row = stored.get(member_id, {})
+            holiday, week_off = row.get('holiday', 0), row.get('week_off', 0)
+            counts[member_id] = {
+                'PRESENT': totals['PRESENT'] - (row.get('all_days', 0) - holiday - week_off),
+                'WEEK_OFF': totals['WEEK_OFF'] - week_off,
+                'HOLIDAY': totals['HOLIDAY'] - holiday,
+            }
+        return counts
+
+    @staticmethod
+    def redundant_rows(start_date=None, end_date=None):
+        """
+        Stored roster rows that only repeat their day's default: never edited,
+        no legacy misc hours, description or notes, and the default status.
+        """
+        rows = DailyRoster.objects.filter(is_auto_created=True, misc_hours=0, misc_description='', notes='')
+        holidays = Holiday.objects.filter(location=HolidayCalendar.default_location(), is_active=True)
+        if start_date:
+            rows = rows.filter(date__gte=start_date)
+            holidays = holidays.filter(date__gte=start_date)
+        if end_date:
+            rows = rows.filter(date__lte=end_date)
+            holidays = holidays.filter(date__lte=end_date)
+        holidays = set(holidays.values_list('date', flat=True))
+
+        weekend = Q(date__week_day__in=WEEKEND_WEEK_DAYS)
+        return rows.filter(
+            Q(date__in=holidays, status='HOLIDAY')
+            | (~Q(date__in=holidays) & weekend & Q(status='WEEK_OFF'))
+            | (~Q(date__in=holidays) & ~weekend & Q(status='PRESENT'))
+        )
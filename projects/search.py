@@ -0,0 +1,161 @@
+#projects/search.py
+"""
+Project search backends for ProjectService.get_project_list.
+
+The original search ORs four `icontains` lookups, which can't use a B-tree
+index and scans the whole project table on every search. Each backend below
+narrows a Project queryset to the rows matching a search string, using
+whatever index the database offers:
+
+- MySQL:    FULLTEXT index on project_name/builder_name (MATCH ... AGAINST),
+            UNIONed with substring matches on hs_id/opportunity_id
+- Postgres: pg_trgm GIN indexes, which make the existing icontains lookups indexable
+- SQLite:   the original four-way icontains (no index support)
+
+For a single token that looks like an HS_ID or opportunity ID, the indexed
+backends list the exact HS_ID / opportunity ID prefix matches first. Set
+PROJECT_SEARCH_BACKEND to a dotted class path to override the automatic
+choice.
+"""
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Case, When, Value, Func, FloatField, IntegerField
+from django.utils.module_loading import import_string
+
+# MySQL ignores FULLTEXT terms shorter than innodb_ft_min_token_size (3 by default)
+MYSQL_MIN_TOKEN_LENGTH = 3
+
+
+class ProjectSearchBackend:
+    """
+    Base class for project search backends.
+    """
+
+    def search(self, queryset, query):
+        """
+        Args:
+            queryset: Project queryset to narrow down
+            query: Search string entered by the user
+
+        Returns:
+            QuerySet: The matching projects
+        """
+        raise NotImplementedError
+
+
+class IContainsSearchBackend(ProjectSearchBackend):
+    """
+    Substring match on HS_ID, project name, opportunity ID and builder.
+    Works everywhere but can't use an index.
+    """
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(hs_id__icontains=query) |
+            Q(project_name__icontains=query) |
+            Q(opportunity_id__icontains=query) |
+            Q(builder_name__icontains=query)
+        )
+
+
+def union_of(queryset, *matches):
+    """
+    Narrow a queryset to the rows of several match querysets, run as a UNION
+    of separate SELECTs so each one can use its own index (an OR in a single
+    WHERE would stop MySQL from using the FULLTEXT index).
+    """
+    pk_queries = [match.order_by().values('pk') for match in matches]
+    return queryset.filter(pk__in=pk_queries[0].union(*pk_queries[1:]))
+
+
+class IdentifierFirstMixin:
+    """
+    List exact identifier matches (HS_ID A123, opportunity ID prefix OPP-0042)
+    ahead of the other results of an identifier-looking search.
+    """
+
+    identifier_pattern = re.compile(r'^[A-Za-z0-9_\-/.]+$')
+
+    def looks_like_identifier(self, query):
+        return bool(self.identifier_pattern.match(query)) and any(char.isdigit() for char in query)
+
+    def search(self, queryset, query):
+        # text_search() matches hs_id / opportunity_id substrings as well, so
+        # the identifier matches are already in its results
+        matches = self.text_search(queryset, query)
+        if self.looks_like_identifier(query):
+            identifier_match = Q(hs_id__iexact=query) | Q(opportunity_id__istartswith=query)
+            matches = matches.alias(
+                identifier_hit=Case(When(identifier_match, then=Value(1)), default=Value(0), output_field=IntegerField())
+            ).order_by('-identifier_hit', *queryset.query.order_by)
+        return matches
+
+    def text_search(self, queryset, query):
+        raise NotImplementedError
+
+
+class PostgresTrigramSearchBackend(IdentifierFirstMixin, IContainsSearchBackend):
+    """
+    Postgres: the pg_trgm GIN indexes on UPPER(column) (migration 0030) let the
+    planner answer the icontains lookups from the index.
+    """
+
+    def text_search(self, queryset, query):
+        return IContainsSearchBackend.search(self, queryset, query)
+
+
+class BooleanModeMatch(Func):
+    """
+    MySQL MATCH (columns) AGAINST (query IN BOOLEAN MODE). The columns are
+    compiled as expressions so they follow the table alias of a subquery.
+    """
+    template = 'MATCH (%(expressions)s) AGAINST (%%s IN BOOLEAN MODE)'
+    output_field = FloatField()
+
+    def __init__(self, *columns, against):
+        super().__init__(*columns)
+        self.against = against
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(compiler, connection, **extra_context)
+        return sql, (*params, self.against)
+
+
+class MySQLFullTextSearchBackend(IdentifierFirstMixin, ProjectSearchBackend):
+    """
+    MySQL: boolean-mode MATCH ... AGAINST on the FULLTEXT index over
+    project_name and builder_name, requiring every search word as a prefix.
+    The substring match on hs_id and opportunity_id the icontains search gave
+    runs as a separate SELECT in a UNION, so it doesn't stop the MATCH from
+    using the FULLTEXT index.
+    """
+
+    def text_search(self, queryset, query):
+        terms = [term for term in re.split(r'[^\w]+', query) if term]
+        if not terms or any(len(term) < MYSQL_MIN_TOKEN_LENGTH for term in terms):
+            # Too short for the FULLTEXT index; keep the old behaviour
+            return IContainsSearchBackend().search(queryset, query)
+
+        boolean_query = ' '.join(f'+{term}*' for term in terms)
+        fulltext_matches = queryset.alias(
+            search_relevance=BooleanModeMatch('project_name', 'builder_name', against=boolean_query)
+        ).filter(search_relevance__gt=0)
+        identifier_matches = queryset.filter(Q(hs_id__icontains=query) | Q(opportunity_id__icontains=query))
+        return union_of(queryset, fulltext_matches, identifier_matches)
+
+
+VENDOR_BACKENDS = {
+    'mysql': MySQLFullTextSearchBackend,
+    'postgresql': PostgresTrigramSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Return the project search backend for the current database.
+    """
+    backend_path = getattr(settings, 'PROJECT_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(connection.vendor, IContainsSearchBackend)()
@@ -0,0 +1,332 @@
+#projects/sequences.py
+"""
+Counter-backed identifier allocation.
+
+Identifiers such as HS_ID, TID_ and ASID_ used to be derived by scanning every existing row
+for the current maximum, which costs O(total rows) per insert and races under
+concurrent creates. Instead, each identifier family owns one IdSequence row
+that is locked while values are taken from it. The lock is held until the
+surrounding transaction commits, and a rolled-back create also rolls back the
+counter, so the sequence stays free of duplicates and gaps.
+
+SequenceService works on raw counter values. IdAllocator subclasses turn
+those values into formatted identifiers; models look them up by name with
+get_allocator().
+"""
+import logging
+from django.db import transaction, IntegrityError
+from .models import IdSequence
+
+logger = logging.getLogger(__name__)
+
+HS_ID_SEQUENCE = 'hs_id'
+HS_ID_NUMBERS_PER_LETTER = 999
+
+
+def format_hs_id(value):
+    """
+    Convert a 1-based sequence value into an HS_ID.
+
+    1 -> 'A1', 999 -> 'A999', 1000 -> 'B1', ...
+    """
+    letter_index, number = divmod(value - 1, HS_ID_NUMBERS_PER_LETTER)
+    return f"{chr(ord('A') + letter_index)}{number + 1}"
+
+
+def parse_hs_id(hs_id):
+    """
+    Convert an HS_ID back into its sequence value.
+    Returns None for values that don't follow the letter + number format.
+    """
+    if not hs_id or len(hs_id) < 2 or not hs_id[0].isalpha():
+        return None
+    try:
+        number = int(hs_id[1:])
+    except ValueError:
+        return None
+    if number < 1 or number > HS_ID_NUMBERS_PER_LETTER:
+        return None
+    letter_index = ord(hs_id[0].upper()) - ord('A')
+    return letter_index * HS_ID_NUMBERS_PER_LETTER + number
+
+
+class SequenceService:
+    """
+    Hands out values from named IdSequence counters.
+    All methods must be safe to call concurrently from many requests.
+    """
+
+    @staticmethod
+    def _lock(name, seed=None):
+        """
+        Fetch the counter row for `name` with a row lock, creating it on first use.
+        Must be called inside a transaction.
+
+        Args:
+            name: Sequence name
+            seed: Optional callable returning the starting value for a new counter
+        """
+        try:
+            return IdSequence.objects.select_for_update().get(name=name)
+        except IdSequence.DoesNotExist:
+            initial_value = seed() if seed else 0
+            try:
+                # Savepoint so a concurrent creator doesn't poison the outer transaction
+                with transaction.atomic():
+                    IdSequence.objects.create(name=name, last_value=initial_value)
+                logger.info(f"Created ID sequence '{name}' starting after {initial_value}")
+            except IntegrityError:
+                pass
+            return IdSequence.objects.select_for_update().get(name=name)
+
+    @staticmethod
+    def reserve(name, count=1, seed=None):
+        """
+        Reserve a block of consecutive values from a sequence.
+
+        Args:
+            name: Sequence name
+            count: Number of values to reserve
+            seed: Optional callable returning the starting value for a new counter
+
+        Returns:
+            int: The first reserved value (the block is first..first + count - 1)
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+
+        with transaction.atomic():
+            sequence = SequenceService._lock(name, seed)
+            first_value = sequence.last_value + 1
+            sequence.last_value += count
+            sequence.save(update_fields=['last_value', 'updated_at'])
+
+        return first_value
+
+    @staticmethod
+    def peek(name, seed=None):
+        """
+        Return the next value a sequence would hand out, without consuming it.
+        """
+        sequence = IdSequence.objects.filter(name=name).only('last_value').first()
+        if sequence:
+            return sequence.last_value + 1
+        return (seed() if seed else 0) + 1
+
+    @staticmethod
+    def advance_to(name, value, seed=None):
+        """
+        Make sure a sequence never hands out `value` or anything below it.
+        Used when identifiers are assigned explicitly (imports, manual entries).
+        """
+        with transaction.atomic():
+            sequence = SequenceService._lock(name, seed)
+            if sequence.last_value < value:
+                sequence.last_value = value
+                sequence.save(update_fields=['last_value', 'updated_at'])
+
+    @staticmethod
+    def reset(name, value):
+        """
+        Set a sequence's last value outright (e.g. after renumbering).
+        """
+        with transaction.atomic():
+            sequence = SequenceService._lock(name)
+            sequence.last_value = value
+            sequence.save(update_fields=['last_value', 'updated_at'])
+
+    # HS_ID helpers
+
+    @staticmethod
+    def allocate_hs_id():
+        """Allocate the next HS_ID (A1, A2, ... A999, B1, ...)."""
+        return HS_ID_ALLOCATOR.allocate()
+
+    @staticmethod
+    def reserve_hs_ids(count):
+        """
+        Reserve a block of HS_IDs in one round trip, for bulk imports.
+
+        Returns:
+            list: `count` consecutive HS_IDs
+        """
+        return HS_ID_ALLOCATOR.allocate_block(count)
+
+    @staticmethod
+    def peek_hs_id():
+        """Return the next HS_ID without consuming it."""
+        return HS_ID_ALLOCATOR.peek()
+
+    @staticmethod
+    def register_hs_ids(hs_ids):
+        """
+        Move the HS_ID sequence past explicitly assigned HS_IDs so they are
+        never handed out again. Unparseable values are ignored.
+        """
+        HS_ID_ALLOCATOR.register(hs_ids)
+
+
+class IdAllocator:
+    """
+    Turns values from one named sequence into formatted identifiers.
+
+    Subclasses define how a sequence value is written (format) and read back
+    (parse). Register an instance with register_allocator() to make it
+    available through get_allocator().
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def format(self, value):
+        raise NotImplementedError
+
+    def parse(self, identifier):
+        """Return the sequence value for an identifier, or None if it isn't one of ours."""
+        raise NotImplementedError
+
+    def seed(self):
+        """Starting value used when the sequence row doesn't exist yet."""
+        return 0
+
+    def allocate(self):
+        """Allocate the next identifier."""
+        return self.format(SequenceService.reserve(self.name, seed=self.seed))
+
+    def allocate_block(self, count):
+        """
+        Allocate `count` consecutive identifiers with a single locked update.
+
+        Returns:
+            list: The allocated identifiers, in order
+        """
+        first_value = SequenceService.reserve(self.name, count, seed=self.seed)
+        return [self.format(value) for value in range(first_value, first_value + count)]
+
+    def peek(self):
+        """Return the next identifier without consuming it."""
+        return self.format(SequenceService.peek(self.name, seed=self.seed))
+
+    def register(self, identifiers):
+        """
+        Move the sequence past explicitly assigned identifiers so they are
+        never handed out again. Identifiers that don't parse are ignored.
+        """
+        values = [value for value in (self.parse(identifier) for identifier in identifiers) if value]
+        if values:
+            SequenceService.advance_to(self.name, max(values), seed=self.seed)
+
+
+class ModelIdAllocator(IdAllocator):
+    """
+    Allocator for an identifier stored on a model field.
+
+    Knows which model and field it fills in, so it can seed a new sequence
+    from the rows already in the table and fill in identifiers for objects
+    that are about to be bulk created.
+    """
+
+    def __init__(self, name, model_label, field_name):
+        super().__init__(name)
+        self.model_label = model_label
+        self.field_name = field_name
+
+    def get_model(self):
+        from django.apps import apps
+        return apps.get_model(self.model_label)
+
+    def seed(self):
+        """
+        The highest identifier already in the table. This scan only runs once,
+        when the sequence row is first created.
+        """
+        highest = 0
+        identifiers = self.get_model().objects.exclude(
+            **{self.field_name: ''}
+        ).values_list(self.field_name, flat=True)
+        for identifier in identifiers.iterator():
+            value = self.parse(identifier)
+            if value and value > highest:
+                highest = value
+        return highest
+
+    def assign(self, instances):
+        """
+        Fill in identifiers for every instance that doesn't have one yet,
+        using one block reservation. Use before bulk_create(), which skips
+        the model's save() and signals.
+
+        Returns:
+            list: The same instances
+        """
+        instances = list(instances)
+        missing = [instance for instance in instances if not getattr(instance, self.field_name)]
+        missing_ids = {id(instance) for instance in missing}
+
+        # Register explicit identifiers first so the new block can't overlap them
+        self.register(
+            getattr(instance, self.field_name) for instance in instances
+            if id(instance) not in missing_ids
+        )
+        if missing:
+            for instance, identifier in zip(missing, self.allocate_block(len(missing))):
+                setattr(instance, self.field_name, identifier)
+        return instances
+
+
+class HsIdAllocator(ModelIdAllocator):
+    """Letter + number identifiers: A1 ... A999, B1, ..."""
+
+    def format(self, value):
+        return format_hs_id(value)
+
+    def parse(self, identifier):
+        return parse_hs_id(identifier)
+
+
+class PrefixedIdAllocator(ModelIdAllocator):
+    """Zero-padded identifiers behind a fixed prefix, e.g. TID_00001."""
+
+    def __init__(self, name, model_label, field_name, prefix, width):
+        super().__init__(name, model_label, field_name)
+        self.prefix = prefix
+        self.width = width
+
+    def format(self, value):
+        return f"{self.prefix}{value:0{self.width}d}"
+
+    def parse(self, identifier):
+        if not identifier or not identifier.startswith(self.prefix):
+            return None
+        try:
+            return int(identifier[len(self.prefix):])
+        except ValueError:
+            return None
+
+
+_allocators = {}
+
+
+def register_allocator(allocator):
+    """Make an allocator available through get_allocator(). Returns the allocator."""
+    _allocators[allocator.name] = allocator
+    return allocator
+
+
+def get_allocator(name):
+    """Return the registered allocator for a sequence name."""
+    try:
+        return _allocators[name]
+    except KeyError:
+        raise LookupError(f"No ID allocator registered for '{name}'")
+
+
+HS_ID_ALLOCATOR = register_allocator(
+    HsIdAllocator(HS_ID_SEQUENCE, 'projects.Project', 'hs_id')
+)
+TASK_ID_ALLOCATOR = register_allocator(
+    PrefixedIdAllocator('task_id', 'projects.ProjectTask', 'task_id', prefix='TID_', width=5)
+)
+ASSIGNMENT_ID_ALLOCATOR = register_allocator(
+    PrefixedIdAllocator('assignment_id', 'projects.TaskAssignment', 'assignment_id', prefix='ASID_', width=6)
+)
@@ -1,6 +1,15 @@
 #projects/services.py
 import logging
 from django.core.exceptions import ValidationError
+from .status_registry import StatusRegistry
+from .search import get_search_backend
+from .pagination import KeysetPaginator
+from .rollups import DailyMemberRollup
+from .timers import get_timer_backend
+from .audit import TimerAuditLog
+from .ledger import TimeLedger
+from .live import LiveUpdates, TEAM_SCOPE
+from .roster import RosterDefaults
 from .models import Project, DailyRoster, ProjectStatusHistory, ProjectStatusOption, ProductTask, ProjectTask, TaskAssignment, Product, ActiveTimer, TimeSession, DailyTimeTotal, TimerActionLog, ProjectDelivery
 from django.db.models import Sum, Q, Subquery, OuterRef, F, Prefetch, Count
 from django.http import Http404
@@ -12,10 +21,31 @@ from django.utils import timezone
 from django.db import transaction
 from datetime import date, datetime, timedelta
 import calendar
-from django.db.models import Avg
+from django.db.models import Avg, Case, When, Value, Func, ExpressionWrapper, DurationField, IntegerField
+from django.db.models.functions import Coalesce
+from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TIMER_MAX_SESSION_HOURS = 12
+DEFAULT_WORKING_NOW_CACHE_SECONDS = 5
+DEFAULT_CURSOR_PAGINATION_AFTER_PAGE = 5
+WORKING_NOW_CACHE_KEY = 'projects:working_now:{version}'
+
+
+class DurationMinutes(Func):
+    """
+    Whole minutes in a duration expression (e.g. ended_at - started_at), rounded down.
+    Postgres subtracts timestamps into an interval; SQLite and MySQL give microseconds.
+    """
+    output_field = IntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, template='FLOOR((%(expressions)s) / 60000000)', **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, template='FLOOR(EXTRACT(EPOCH FROM (%(expressions)s)) / 60)', **extra_context)
+
 class ProjectService:
     """
     Service class that handles all business logic related to projects.
@@ -63,8 +93,7 @@ class ProjectService:
                 else:
                     project.expected_tat = project_data['expected_tat']
 
-                # Generate HS_ID explicitly before saving
-                project.hs_id = Project.generate_hs_id()
+                # HS_ID is allocated from the sequence table when the project is saved
 
                 # Save the new project
                 project._current_user = user
@@ -198,7 +227,7 @@ class ProjectService:
                 return False, f"An error occurred: {str(e)}"
 
     @staticmethod
-    def get_project_list(search_query=None, status=None, product=None, region=None, city=None, dpm=None, date_from=None, date_to=None, page=1, items_per_page=10, project_type='pipeline'):
+    def get_project_list(search_query=None, status=None, product=None, region=None, city=None, dpm=None, date_from=None, date_to=None, page=1, items_per_page=10, project_type='pipeline', cursor=None, pagination='page'):
         """
         Retrieves a filtered, searched, and paginated list of projects.
 
@@ -209,54 +238,47 @@ class ProjectService:
             region: Region ID to filter by
             city: City ID to filter by
             dpm: DPM user ID to filter by
-            date_from: Start date for filtering (applies to latest_status_date for pipeline, delivery_date for delivered)
-            date_to: End date for filtering (applies to latest_status_date for pipeline, delivery_date for delivered)
+            date_from: Start date for filtering (applies to latest_status_changed_at for pipeline, delivered_at for delivered)
+            date_to: End date for filtering (applies to latest_status_changed_at for pipeline, delivered_at for delivered)
             page: Page number for pagination
             items_per_page: Number of items to show per page
             project_type: 'pipeline' (default), 'delivered', or 'all'
+            cursor: Cursor from a previous page, used when pagination is 'cursor'
+            pagination: 'page' (numbered pages, default) or 'cursor' (keyset pagination,
+                constant cost for deep pages, with a cached approximate total).
+                Numbered pages past CURSOR_PAGINATION_AFTER_PAGE link on in cursor
+                mode (page_obj.next_cursor)
 
         Returns:
             tuple: (success, result)
                 - If successful: (True, (page_obj, filters_applied))
+                  In cursor mode page_obj is a KeysetPage
                 - If failed: (False, error_message)
         """
         try:
-            # Create a subquery to get the latest status change date for each project
-            latest_status_date_subquery = ProjectStatusHistory.objects.filter(
-                project=OuterRef('pk')
-            ).order_by('-changed_at').values('changed_at')[:1]
-
-            # Start with all projects, annotating them with the latest status date
+            # Start with all projects. The latest status date is a denormalized,
+            # indexed column; it's exposed as latest_status_date for the templates.
             queryset = Project.objects.annotate(
-                latest_status_date=Subquery(latest_status_date_subquery)
+                latest_status_date=F('latest_status_changed_at')
             ).select_related(
                 'current_status',
                 'product',
                 'city',
                 'city__region',
                 'dpm'
-            ).order_by(F('latest_status_date').desc(nulls_last=True), '-created_at')
+            ).order_by(F('latest_status_changed_at').desc(nulls_last=True), '-created_at', '-id')
 
-            # Define the statuses that are considered 'delivered' based on category_two field
-            delivered_status_query = Q(category_two__iexact='Final Delivery')
+            # Statuses that are considered 'delivered' (category_two = 'Final Delivery'), from the cached registry
+            delivered_statuses = StatusRegistry.delivered_status_ids()
 
             # Apply project type filter
             if project_type == 'pipeline':
-                # Get all status IDs that indicate a "delivered" or "terminated" state
-                delivered_statuses = ProjectStatusOption.objects.filter(
-                    delivered_status_query
-                ).values_list('id', flat=True)
-
                 # Exclude these projects from the pipeline
                 if delivered_statuses:
                     queryset = queryset.exclude(current_status_id__in=delivered_statuses)
 
             elif project_type == 'delivered':
-                # Get only projects with a "delivered" or "terminated" status
-                delivered_statuses = ProjectStatusOption.objects.filter(
-                    delivered_status_query
-                ).values_list('id', flat=True)
-
+                # Get only projects with a "delivered" status
                 if delivered_statuses:
                     queryset = queryset.filter(current_status_id__in=delivered_statuses)
                 else:
@@ -275,14 +297,9 @@ class ProjectService:
                 'date_to': date_to,
             }
 
-            # Apply search filter
+            # Apply search filter through the database-specific search backend
             if search_query:
-                queryset = queryset.filter(
-                    Q(hs_id__icontains=search_query) |
-                    Q(project_name__icontains=search_query) |
-                    Q(opportunity_id__icontains=search_query) |
-                    Q(builder_name__icontains=search_query)
-                )
+                queryset = get_search_backend().search(queryset, search_query.strip())
 
             # Apply other filters
             if status:
@@ -296,34 +313,41 @@ class ProjectService:
             if dpm:
                 queryset = queryset.filter(dpm_id=dpm)
             
-            # Apply date range filters
+            # Apply date range filters as datetime ranges so the indexed columns are used
             if date_from or date_to:
-                if project_type == 'delivered':
-                    # For delivered projects, filter by delivery date (status history with Final Delivery)
-                    delivery_history_subquery = ProjectStatusHistory.objects.filter(
-                        project=OuterRef('pk'),
-                        status__category_two__iexact='Final Delivery'
-                    ).order_by('changed_at').values('changed_at')[:1]
-                    
-                    queryset = queryset.annotate(
-                        delivery_date_annotated=Subquery(delivery_history_subquery)
-                    )
-                    
-                    if date_from:
-                        queryset = queryset.filter(delivery_date_annotated__date__gte=date_from)
-                    if date_to:
-                        queryset = queryset.filter(delivery_date_annotated__date__lte=date_to)
-                else:
-                    # For pipeline projects, filter by latest_status_date
-                    if date_from:
-                        queryset = queryset.filter(latest_status_date__date__gte=date_from)
-                    if date_to:
-                        queryset = queryset.filter(latest_status_date__date__lte=date_to)
+                # Delivered projects filter by delivery date, pipeline projects by latest status date
+                date_field = 'delivered_at' if project_type == 'delivered' else 'latest_status_changed_at'
+                if date_from:
+                    start = timezone.make_aware(datetime.combine(date_from, datetime.min.time()))
+                    queryset = queryset.filter(**{f'{date_field}__gte': start})
+                if date_to:
+                    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+                    queryset = queryset.filter(**{f'{date_field}__lt': end})
 
             # Paginate the results
+            keyset_paginator = KeysetPaginator(
+                queryset,
+                items_per_page,
+                keys=('latest_status_changed_at', 'created_at', 'id'),
+                nullable=('latest_status_changed_at',)
+            )
+            if pagination == 'cursor':
+                page_obj = keyset_paginator.get_page(cursor)
+                logger.debug(f"Retrieved filtered project list ({project_type}) cursor page with {len(page_obj)} projects")
+                return True, (page_obj, filters_applied)
+
             paginator = Paginator(queryset, items_per_page)
             page_obj = paginator.get_page(page)
 
+            # OFFSET pages get slower the deeper they are, so numbered pages stop
+            # at CURSOR_PAGINATION_AFTER_PAGE and Next continues in cursor mode
+            page_obj.last_numbered_page = getattr(
+                settings, 'CURSOR_PAGINATION_AFTER_PAGE', DEFAULT_CURSOR_PAGINATION_AFTER_PAGE
+            )
+            page_obj.next_cursor = None
+            if page_obj.has_next() and page_obj.number >= page_obj.last_numbered_page:
+                page_obj.next_cursor = keyset_paginator.cursor_after(page_obj[-1])
+
             logger.debug(f"Retrieved filtered project list ({project_type}) with {paginator.count} total projects")
             return True, (page_obj, filters_applied)
         except Exception as e:
@@ -656,7 +680,7 @@ class ProjectService:
             assignments = task.assignments.select_related(
                 'assigned_to',
                 'assigned_by'
-            ).order_by('-assigned_date')
+            ).with_work_totals().order_by('-assigned_date')
 
             logger.debug(f"Retrieved task {task_id} with {assignments.count()} assignments")
             return True, (task, assignments)
@@ -752,14 +776,9 @@ class ProjectService:
             # Start with projects assigned to the DPM
             projects_qs = Project.objects.filter(dpm=dpm)
 
-            # Exclude projects with certain statuses
-            excluded_statuses = [
-                "Final Delivery",
-                "Opp Dropped",
-                "Deemed Consumed"
-            ]
+            # Exclude delivered and dropped projects
             if pipeline_only:
-                projects_qs = projects_qs.exclude(current_status__name__in=excluded_statuses)
+                projects_qs = projects_qs.exclude(current_status_id__in=StatusRegistry.closed_status_ids())
 
             # Prefetch related data for performance
             projects_with_tasks = projects_qs.select_related(
@@ -887,6 +906,10 @@ class ProjectService:
                         current_letter = chr(ord(current_letter) + 1)
                         current_number = 1
 
+                # Point the allocator at the end of the renumbered sequence
+                from .sequences import SequenceService, HS_ID_SEQUENCE, parse_hs_id
+                SequenceService.reset(HS_ID_SEQUENCE, parse_hs_id(f'{current_letter}{current_number}') - 1)
+
                 return True, f"Fixed {fixed_count} HS_ID issues"
 
         except Exception as e:
@@ -899,14 +922,14 @@ class ProjectService:
     def start_timer(assignment_id, team_member):
         """
         Start a timer for a team member on a specific assignment.
-        FIXED: Added select_for_update to prevent race conditions.
+        The running timer is kept by the configured active timer backend (projects/timers.py).
         """
+        timers = get_timer_backend()
+        active_timer = None
         with transaction.atomic():
             try:
-                # FIXED: Use select_for_update to prevent race conditions
-                existing_timer = ActiveTimer.objects.select_for_update().filter(
-                    team_member=team_member
-                ).first()
+                # Cheap read first so the common "already running" case takes no locks
+                existing_timer = timers.get(team_member)
 
                 if existing_timer:
                     return False, f"Cannot start timer! Task {existing_timer.assignment.assignment_id} is currently running. Please stop it first."
@@ -922,15 +945,13 @@ class ProjectService:
                 if assignment.assigned_to != team_member:
                     return False, "You can only start timers for assignments assigned to you."
 
-                # Create active timer
-                active_timer = ActiveTimer.objects.create(
-                    assignment=assignment,
-                    team_member=team_member,
-                    started_at=timezone.now()
-                )
+                # Create active timer; the backend makes sure only one runs per member
+                active_timer, existing_timer = timers.start(team_member, assignment, timezone.now())
+                if existing_timer:
+                    return False, f"Cannot start timer! Task {existing_timer.assignment.assignment_id} is currently running. Please stop it first."
 
                 # Log the action
-                TimerActionLog.objects.create(
+                TimerAuditLog.record(
                     assignment=assignment,
                     team_member=team_member,
                     action='START',
@@ -944,6 +965,8 @@ class ProjectService:
                 logger.warning(f"Assignment not found: {assignment_id}")
                 return False, "Assignment not found"
             except Exception as e:
+                if active_timer:
+                    timers.cancel(active_timer)
                 logger.exception(f"Error starting timer: {str(e)}")
                 return False, f"An error occurred: {str(e)}"
 
@@ -951,14 +974,19 @@ class ProjectService:
     def stop_timer(team_member, description=""):
         """
         Stop the active timer for a team member.
-        FIXED: Added select_for_update and minimum duration validation.
+        The timer is claimed from the active timer backend so only one request
+        can stop it, then the session is persisted in a single transaction.
+
+        Returns:
+            tuple: (success, result)
+                - If successful: (True, list of TimeSessions, one per local day the timer ran on)
+                - If failed: (False, error_message)
         """
+        timers = get_timer_backend()
+        active_timer = None
         with transaction.atomic():
             try:
-                # FIXED: Use select_for_update to prevent race conditions
-                active_timer = ActiveTimer.objects.select_for_update().filter(
-                    team_member=team_member
-                ).first()
+                active_timer = timers.claim(team_member)
 
                 if not active_timer:
                     return False, "No active timer found to stop."
@@ -971,55 +999,171 @@ class ProjectService:
 
                 # NEW: Prevent stopping if less than 1 minute has been recorded
                 if duration_seconds < 60:
+                    timers.release(active_timer)
                     logger.warning(f"Attempt to stop timer for {team_member.username} with less than 1 minute recorded. Duration: {duration_seconds} seconds")
                     return False, "Timer must be run for at least 1 minute before stopping."
 
-                # Calculate duration in minutes, ensuring minimum 1 minute for recording
-                duration_minutes = int(duration_seconds // 60)
-                if duration_minutes < 1:
-                    duration_minutes = 1 # Ensure at least 1 minute is recorded if it's been over 60 seconds but less than 2 minutes.
-
-                # Determine the work date (use start time's date)
-                work_date = start_time.date()
-
-                # Create time session
-                time_session = TimeSession.objects.create(
-                    assignment=active_timer.assignment,
-                    team_member=team_member,
-                    started_at=start_time,
-                    ended_at=end_time,
-                    duration_minutes=duration_minutes,
-                    date_worked=work_date,
-                    description=description,
-                    session_type='TIMER'
-                )
-
-                # FIXED: Use atomic daily total update
-                ProjectService._update_daily_total(
-                    active_timer.assignment,
-                    team_member,
-                    work_date,
-                    duration_minutes
-                )
-
-                # Log the action
-                TimerActionLog.objects.create(
-                    assignment=active_timer.assignment,
-                    team_member=team_member,
-                    action='STOP',
-                    details=f"Stopped timer at {end_time.strftime('%Y-%m-%d %H:%M:%S')}, Duration: {ProjectService._format_minutes(duration_minutes)}"
+                # One session per local day the timer ran on
+                sessions = ProjectService._persist_timer_sessions(
+                    [(active_timer, end_time, description)],
+                    stop_details="Stopped timer at {end_time}, Duration: {duration}"
                 )
 
                 # Delete the active timer
-                active_timer.delete()
+                timers.finish(active_timer)
 
+                duration_minutes = sum(session.duration_minutes for session in sessions)
                 logger.info(f"Timer stopped for {team_member.username}, Duration: {duration_minutes} minutes")
-                return True, time_session
+                return True, sessions
 
             except Exception as e:
+                if active_timer:
+                    timers.release(active_timer)
                 logger.exception(f"Error stopping timer: {str(e)}")
                 return False, f"An error occurred: {str(e)}"
 
+    @staticmethod
+    def stop_stale_timers(max_hours=None, now=None, dry_run=False):
+        """
+        Auto-stop timers that have been running longer than TIMER_MAX_SESSION_HOURS.
+
+        Each stale timer is stopped at started_at + max_hours (not now), so a
+        forgotten timer records at most the cap. All of them are persisted in
+        one transaction with a single bulk insert of their time sessions.
+
+        Args:
+            max_hours: Cap in hours (default: TIMER_MAX_SESSION_HOURS)
+            now: Current time (default: timezone.now())
+            dry_run: Only return the stale timers, without stopping them
+
+        Returns:
+            tuple: (success, list of stopped ActiveTimers or error message)
+        """
+        if max_hours is None:
+            max_hours = getattr(settings, 'TIMER_MAX_SESSION_HOURS', DEFAULT_TIMER_MAX_SESSION_HOURS)
+        now = now or timezone.now()
+        cap = timedelta(hours=max_hours)
+
+        stale_timers = ActiveTimer.objects.filter(
+            started_at__lte=now - cap
+        ).select_related('assignment', 'team_member').order_by('started_at')
+
+        if dry_run:
+            return True, list(stale_timers)
+
+        timers = get_timer_backend()
+        claimed = []
+        with transaction.atomic():
+            try:
+                for stale_timer in stale_timers.select_for_update(skip_locked=True, of=('self',)):
+                    # Take it away from the backend so a concurrent stop_timer can't also stop it
+                    active_timer = timers.claim(stale_timer.team_member)
+                    if active_timer is None:
+                        continue
+                    if active_timer.id != stale_timer.id:
+                        # Stopped and restarted since the scan; the new timer isn't stale
+                        timers.release(active_timer)
+                        continue
+                    claimed.append(stale_timer)
+
+                ProjectService._persist_timer_sessions(
+                    [(timer, timer.started_at + cap, "") for timer in claimed],
+                    stop_details=f"Auto-stopped after {max_hours} hours at {{end_time}}, Duration: {{duration}}"
+                )
+                for timer in claimed:
+                    timers.finish(timer)
+
+            except Exception as e:
+                for timer in claimed:
+                    timers.release(timer)
+                logger.exception(f"Error stopping stale timers: {str(e)}")
+                return False, f"An error occurred: {str(e)}"
+
+        if claimed:
+            logger.info(f"Auto-stopped {len(claimed)} timers running longer than {max_hours} hours")
+        return True, claimed
+
+    @staticmethod
+    def _split_at_midnight(start_time, end_time):
+        """
+        Split a timer run at local midnight.
+
+        Minutes are counted from the start of the run and each day gets the
+        whole minutes that end on it, so the days add up to the run's total.
+
+        Returns:
+            list: (date, segment start, segment end, minutes) per local day, skipping days with 0 minutes
+        """
+        tz = timezone.get_current_timezone()
+        segments = []
+        segment_start = start_time
+        counted_minutes = 0
+        while segment_start < end_time:
+            day = timezone.localtime(segment_start, tz).date()
+            next_midnight = timezone.make_aware(datetime.combine(day + timedelta(days=1), datetime.min.time()), tz)
+            segment_end = min(next_midnight, end_time)
+            elapsed_minutes = int((segment_end - start_time).total_seconds() // 60)
+            if elapsed_minutes > counted_minutes:
+                segments.append((day, segment_start, segment_end, elapsed_minutes - counted_minutes))
+                counted_minutes = elapsed_minutes
+            segment_start = segment_end
+        return segments
+
+    @staticmethod
+    def _persist_timer_sessions(stops, stop_details):
+        """
+        Save the time sessions, daily totals and STOP log entries for stopped timers.
+        Call inside a transaction; removing the timers is left to the caller.
+
+        Args:
+            stops: (ActiveTimer, end time, description) tuples
+            stop_details: Log message, formatted with {end_time} and {duration}
+
+        Returns:
+            list: The created TimeSessions, in stop order and then by day
+        """
+        sessions = []
+        for active_timer, end_time, description in stops:
+            for work_date, segment_start, segment_end, minutes in ProjectService._split_at_midnight(
+                active_timer.started_at, end_time
+            ):
+                sessions.append(TimeSession(
+                    assignment_id=active_timer.assignment_id,
+                    team_member_id=active_timer.team_member_id,
+                    started_at=segment_start,
+                    ended_at=segment_end,
+                    duration_minutes=minutes,
+                    date_worked=work_date,
+                    description=description,
+                    session_type='TIMER'
+                ))
+        TimeSession.objects.bulk_create(sessions)
+        TimeLedger.record_sessions(sessions)
+
+        deltas = {}
+        for session in sessions:
+            key = TimeLedger.key(session)
+            deltas[key] = deltas.get(key, 0) + session.duration_minutes
+        ProjectService._update_daily_totals(deltas)
+
+        # Cache backends hand back timers without their assignment/member loaded
+        assignments = TaskAssignment.objects.in_bulk({session.assignment_id for session in sessions})
+        members = User.objects.in_bulk({session.team_member_id for session in sessions})
+
+        for active_timer, end_time, description in stops:
+            duration_minutes = int((end_time - active_timer.started_at).total_seconds() // 60)
+            TimerAuditLog.record(
+                assignment=assignments.get(active_timer.assignment_id) or active_timer.assignment,
+                team_member=members.get(active_timer.team_member_id) or active_timer.team_member,
+                action='STOP',
+                details=stop_details.format(
+                    end_time=end_time.strftime('%Y-%m-%d %H:%M:%S'),
+                    duration=ProjectService._format_minutes(duration_minutes)
+                )
+            )
+
+        return sessions
+
     @staticmethod
     def add_manual_time(assignment_id, team_member, date_worked, hours, minutes, description="", reason=None):
         """
@@ -1069,13 +1213,14 @@ class ProjectService:
                     session_type='MANUAL',
                     reason=reason
                 )
+                TimeLedger.record_sessions([time_session])
 
                 # Update daily total
                 ProjectService._update_daily_total(assignment, team_member, date_worked, total_minutes)
 
                 # Log the action with reason included
                 reason_display = dict(TimeSession.REASON_CHOICES).get(reason, reason)
-                TimerActionLog.objects.create(
+                TimerAuditLog.record(
                     assignment=assignment,
                     team_member=team_member,
                     action='MANUAL_ADD',
@@ -1092,6 +1237,88 @@ class ProjectService:
                 logger.exception(f"Error adding manual time: {str(e)}")
                 return False, f"An error occurred: {str(e)}"
 
+    @staticmethod
+    def add_manual_time_bulk(team_member, entries):
+        """
+        Add many manual time entries at once, e.g. a week of offline work.
+        All rows are validated together and saved in one transaction with a
+        single session insert and one grouped daily-total upsert.
+
+        Args:
+            team_member: User object of the team member
+            entries: List of dicts with assignment_id, date_worked, minutes,
+                reason and an optional description
+
+        Returns:
+            tuple: (success, result)
+                - If successful: (True, list of time_session_objects)
+                - If failed: (False, error_message listing every invalid row)
+        """
+        if not entries:
+            return False, "Add at least one time entry."
+
+        today = timezone.localdate()
+        reasons = dict(TimeSession.REASON_CHOICES)
+        assignments = TaskAssignment.objects.filter(assigned_to=team_member).in_bulk(
+            {str(entry['assignment_id']) for entry in entries}
+        )
+        assignments = {str(assignment_id): assignment for assignment_id, assignment in assignments.items()}
+
+        errors = []
+        for row, entry in enumerate(entries, start=1):
+            if str(entry['assignment_id']) not in assignments:
+                errors.append(f"Row {row}: You can only add time for assignments assigned to you.")
+            if entry['minutes'] <= 0:
+                errors.append(f"Row {row}: Duration must be greater than 0 minutes.")
+            if entry.get('reason') not in reasons:
+                errors.append(f"Row {row}: A reason is required for manual time entries.")
+            if entry['date_worked'] > today:
+                errors.append(f"Row {row}: Work date cannot be in the future.")
+
+        if errors:
+            return False, " ".join(errors)
+
+        with transaction.atomic():
+            try:
+                sessions = []
+                for entry in entries:
+                    day_start = timezone.make_aware(datetime.combine(entry['date_worked'], datetime.min.time()))
+                    sessions.append(TimeSession(
+                        assignment=assignments[str(entry['assignment_id'])],
+                        team_member=team_member,
+                        started_at=day_start,
+                        ended_at=day_start + timedelta(minutes=entry['minutes']),
+                        duration_minutes=entry['minutes'],
+                        date_worked=entry['date_worked'],
+                        description=entry.get('description', ''),
+                        session_type='MANUAL',
+                        reason=entry['reason']
+                    ))
+                TimeSession.objects.bulk_create(sessions)
+                TimeLedger.record_sessions(sessions)
+
+                deltas = {}
+                for session in sessions:
+                    key = TimeLedger.key(session)
+                    deltas[key] = deltas.get(key, 0) + session.duration_minutes
+                ProjectService._update_daily_totals(deltas)
+
+                # Buffered, so the log entries are written with one insert on commit
+                for session in sessions:
+                    TimerAuditLog.record(
+                        assignment=session.assignment,
+                        team_member=team_member,
+                        action='MANUAL_ADD',
+                        details=f"Added {ProjectService._format_minutes(session.duration_minutes)} for {session.date_worked}, Reason: {reasons[session.reason]}, Description: {session.description}"
+                    )
+
+                logger.info(f"Bulk manual time added for {team_member.username}: {len(sessions)} entries, {sum(deltas.values())} minutes")
+                return True, sessions
+
+            except Exception as e:
+                logger.exception(f"Error adding bulk manual time: {str(e)}")
+                return False, f"An error occurred: {str(e)}"
+
     @staticmethod
     def complete_assignment(assignment_id, team_member):
         """
@@ -1129,12 +1356,9 @@ class ProjectService:
                     return False, "Cannot complete assignment with zero hours worked. Please log some time before marking this assignment as completed."
 
                 # Stop any active timer for this assignment
-                active_timer = ActiveTimer.objects.filter(
-                    team_member=team_member,
-                    assignment=assignment
-                ).first()
+                active_timer = get_timer_backend().get(team_member)
 
-                if active_timer:
+                if active_timer and active_timer.assignment_id == assignment.id:
                     # Stop the timer first
                     success, result = ProjectService.stop_timer(team_member, "Completed assignment")
                     if not success:
@@ -1147,7 +1371,7 @@ class ProjectService:
                 assignment.save()
 
                 # Log the action
-                TimerActionLog.objects.create(
+                TimerAuditLog.record(
                     assignment=assignment,
                     team_member=team_member,
                     action='COMPLETE',
@@ -1194,6 +1418,7 @@ class ProjectService:
                 session.duration_minutes = new_duration_minutes
                 session.is_edited = True  # NEW: Mark as edited
                 session.save()
+                TimeLedger.record_edit(session, old_duration)
 
                 # Recalculate daily total
                 ProjectService._recalculate_daily_total(
@@ -1203,7 +1428,7 @@ class ProjectService:
                 )
 
                 # Log the action
-                TimerActionLog.objects.create(
+                TimerAuditLog.record(
                     assignment=session.assignment,
                     team_member=team_member,
                     action='EDIT_SESSION',
@@ -1223,36 +1448,13 @@ class ProjectService:
     @staticmethod
     def _recalculate_daily_total(assignment, team_member, work_date):
         """
-        Recalculate daily total from all sessions for a specific date.
+        Recalculate daily total from the time ledger for a specific date.
         This replaces manual editing and ensures consistency.
         """
-        with transaction.atomic():
-            try:
-                # Calculate total from all sessions for this date
-                total_minutes = TimeSession.objects.filter(
-                    assignment=assignment,
-                    team_member=team_member,
-                    date_worked=work_date
-                ).aggregate(
-                    total=Sum('duration_minutes')
-                )['total'] or 0
-
-                # Update or create daily total
-                daily_total, created = DailyTimeTotal.objects.get_or_create(
-                    assignment=assignment,
-                    team_member=team_member,
-                    date_worked=work_date,
-                    defaults={'total_minutes': total_minutes}
-                )
-
-                if not created:
-                    daily_total.total_minutes = total_minutes
-                    # Mark as not manually edited since we're recalculating from sessions
-                    daily_total.is_manually_edited = False
-                    daily_total.save()
-
-            except Exception as e:
-                logger.exception(f"Error recalculating daily total: {str(e)}")
+        try:
+            TimeLedger.project([(assignment.id, team_member.id, work_date)])
+        except Exception as e:
+            logger.exception(f"Error recalculating daily total: {str(e)}")
 
     @staticmethod
     def get_team_member_dashboard_data(team_member):
@@ -1272,7 +1474,7 @@ class ProjectService:
                 'task__project',           # For project info
                 'task__project__product',  # ADD: For product name
                 'task__product_task'       # For task name
-            ).order_by('expected_delivery_date')
+            ).with_work_totals().order_by('expected_delivery_date')
 
             # Get completed assignments (last 7 days) - VERIFY select_related includes product path
             week_ago_date = today - timedelta(days=7)
@@ -1286,10 +1488,10 @@ class ProjectService:
                 'task__project',           # For project info
                 'task__project__product',  # ADD: For product name
                 'task__product_task'       # For task name
-            ).order_by('-completion_date')
+            ).with_work_totals().order_by('-completion_date')
 
-            # Get active timer
-            active_timer = ActiveTimer.objects.filter(team_member=team_member).select_related('assignment').first()
+            # Get active timer (served from the cache with a cache-backed timer backend)
+            active_timer = get_timer_backend().get(team_member)
 
             # Calculate today's total hours
             today_total_minutes = DailyTimeTotal.objects.filter(
@@ -1307,44 +1509,24 @@ class ProjectService:
             # Calculate elapsed time for active timer
             elapsed_time = None
             if active_timer:
-                elapsed_seconds = (timezone.now() - active_timer.started_at).total_seconds()
-                elapsed_minutes = int(elapsed_seconds // 60)
-                elapsed_time = {
-                    'hours': elapsed_minutes // 60,
-                    'minutes': elapsed_minutes % 60,
-                    'seconds': int(elapsed_seconds % 60),
-                    'formatted': ProjectService._format_minutes(elapsed_minutes)
-                }
+                # Reuse the already loaded assignment instead of fetching it again
+                for assignment in active_assignments:
+                    if assignment.id == active_timer.assignment_id:
+                        active_timer.assignment = assignment
+                        break
+                elapsed_time = ProjectService._get_elapsed_time(active_timer)
 
             # Get today's roster data for legacy misc hours
-            today_roster, _ = ProjectService.get_or_create_daily_roster(team_member, today)
-            
-            # Get today's new individual misc hours entries
-            from .models import MiscHours
-            today_misc_entries = MiscHours.objects.filter(
-                team_member=team_member,
-                date=today
-            )
-            
-            # Calculate total misc hours from both sources
-            legacy_misc_minutes = today_roster.misc_hours
-            new_misc_minutes = sum(entry.duration_minutes for entry in today_misc_entries)
-            total_misc_minutes = legacy_misc_minutes + new_misc_minutes
-            total_minutes = today_total_minutes + total_misc_minutes
-            
+            today_roster = ProjectService.get_daily_roster(team_member, today)
+
             dashboard_data = {
                 'active_assignments': active_assignments,
                 'completed_assignments': completed_assignments,
                 'active_timer': active_timer,
                 'elapsed_time': elapsed_time,
-                'today_summary': {
-                    'assignment_minutes': today_total_minutes,
-                    'misc_minutes': total_misc_minutes,
-                    'total_minutes': total_minutes,
-                    'formatted_assignment': ProjectService._format_minutes(today_total_minutes),
-                    'formatted_misc': ProjectService._format_minutes(total_misc_minutes),
-                    'formatted_total': ProjectService._format_minutes(total_minutes)
-                }
+                'today_summary': ProjectService._build_today_summary(
+                    team_member, today, today_total_minutes, today_roster.misc_hours
+                )
             }
 
             return True, dashboard_data
@@ -1353,6 +1535,182 @@ class ProjectService:
             logger.exception(f"Error getting dashboard data: {str(e)}")
             return False, f"An error occurred: {str(e)}"
 
+    @staticmethod
+    def _get_elapsed_time(active_timer):
+        """Elapsed time of a running timer, split for display."""
+        elapsed_seconds = (timezone.now() - active_timer.started_at).total_seconds()
+        elapsed_minutes = int(elapsed_seconds // 60)
+        return {
+            'hours': elapsed_minutes // 60,
+            'minutes': elapsed_minutes % 60,
+            'seconds': int(elapsed_seconds % 60),
+            'formatted': ProjectService._format_minutes(elapsed_minutes)
+        }
+
+    @staticmethod
+    def get_dashboard_assignments(team_member, assignment_ids):
+        """
+        Reload some rows of the team member dashboard's active assignments
+        table, e.g. after a timer action changed them.
+
+        Returns:
+            dict: assignment id -> assignment, only for assignments still active
+            and not completed
+        """
+        assignments = TaskAssignment.objects.filter(
+            id__in=assignment_ids,
+            assigned_to=team_member,
+            is_active=True,
+            is_completed=False
+        ).select_related(
+            'task__project',
+            'task__project__product',
+            'task__project__project_incharge',
+            'task__product_task'
+        ).with_work_totals()
+
+        result = {}
+        for assignment in assignments:
+            assignment.total_working_hours = ProjectService._get_assignment_total_hours(assignment)
+            result[assignment.id] = assignment
+        return result
+
+    @staticmethod
+    def _build_today_summary(team_member, today, assignment_minutes, roster_misc_minutes):
+        """
+        Today's time card: assignment time plus misc hours from both the
+        roster (legacy) and the individual MiscHours entries.
+        """
+        from .models import MiscHours
+        entry_misc_minutes = MiscHours.objects.filter(
+            team_member=team_member,
+            date=today
+        ).aggregate(total=Sum('duration_minutes'))['total'] or 0
+
+        total_misc_minutes = (roster_misc_minutes or 0) + entry_misc_minutes
+        total_minutes = assignment_minutes + total_misc_minutes
+        return {
+            'assignment_minutes': assignment_minutes,
+            'misc_minutes': total_misc_minutes,
+            'total_minutes': total_minutes,
+            'formatted_assignment': ProjectService._format_minutes(assignment_minutes),
+            'formatted_misc': ProjectService._format_minutes(total_misc_minutes),
+            'formatted_total': ProjectService._format_minutes(total_minutes)
+        }
+
+    @staticmethod
+    def get_live_state(team_member):
+        """
+        Running timer and today's totals for the live dashboard stream.
+        Read-only, unlike the dashboard which creates today's roster row.
+
+        Returns:
+            tuple: (success, state) where state is JSON serializable
+        """
+        try:
+            today = date.today()
+
+            timer = None
+            active_timer = get_timer_backend().get(team_member)
+            if active_timer:
+                timer = {
+                    'assignment_id': str(active_timer.assignment_id),
+                    'assignment_code': TaskAssignment.objects.filter(
+                        id=active_timer.assignment_id
+                    ).values_list('assignment_id', flat=True).first(),
+                    'started_at': active_timer.started_at.isoformat(),
+                }
+
+            assignment_minutes = DailyTimeTotal.objects.filter(
+                team_member=team_member,
+                date_worked=today
+            ).aggregate(total=Sum('total_minutes'))['total'] or 0
+            roster_misc_minutes = DailyRoster.objects.filter(
+                team_member=team_member,
+                date=today
+            ).values_list('misc_hours', flat=True).first()
+
+            return True, {
+                'timer': timer,
+                'today_summary': ProjectService._build_today_summary(
+                    team_member, today, assignment_minutes, roster_misc_minutes
+                ),
+            }
+
+        except Exception as e:
+            logger.exception(f"Error getting live state: {str(e)}")
+            return False, f"An error occurred: {str(e)}"
+
+    @staticmethod
+    def get_working_now():
+        """
+        Team members with a running timer, for the DPM's live board: one joined
+        query for the timers with their member, assignment, task and project,
+        and one grouped query for the time those members logged today.
+
+        The result is cached for WORKING_NOW_CACHE_SECONDS under the team's
+        live version token, so any timer or time change is picked up at once
+        while several DPMs watching the board share one computation.
+
+        Returns:
+            tuple: (success, {'timers': timer dicts, longest running first})
+        """
+        try:
+            cache_seconds = getattr(settings, 'WORKING_NOW_CACHE_SECONDS', DEFAULT_WORKING_NOW_CACHE_SECONDS)
+            cache_key = WORKING_NOW_CACHE_KEY.format(version=LiveUpdates.version(TEAM_SCOPE))
+            cache = LiveUpdates.cache()
+            if cache_seconds:
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return True, cached
+
+            today = date.today()
+            timers = list(ActiveTimer.objects.order_by('started_at').values(
+                'team_member_id',
+                'team_member__username',
+                'team_member__first_name',
+                'team_member__last_name',
+                'assignment_id',
+                'assignment__assignment_id',
+                'assignment__sub_task',
+                'assignment__task__project__hs_id',
+                'assignment__task__project__project_name',
+                'assignment__task__product_task__name',
+                'started_at',
+            ))
+            logged_today = dict(DailyTimeTotal.objects.filter(
+                team_member_id__in=[timer['team_member_id'] for timer in timers],
+                date_worked=today
+            ).order_by().values('team_member').annotate(
+                total=Sum('total_minutes')
+            ).values_list('team_member', 'total'))
+
+            result = {'timers': []}
+            for timer in timers:
+                name = f"{timer['team_member__first_name']} {timer['team_member__last_name']}".strip()
+                today_minutes = logged_today.get(timer['team_member_id']) or 0
+                result['timers'].append({
+                    'team_member_id': str(timer['team_member_id']),
+                    'team_member_name': name or timer['team_member__username'],
+                    'assignment_id': str(timer['assignment_id']),
+                    'assignment_code': timer['assignment__assignment_id'],
+                    'sub_task': timer['assignment__sub_task'],
+                    'project_hs_id': timer['assignment__task__project__hs_id'],
+                    'project_name': timer['assignment__task__project__project_name'],
+                    'task_name': timer['assignment__task__product_task__name'],
+                    'started_at': timer['started_at'].isoformat(),
+                    'today_minutes': today_minutes,
+                    'formatted_today': ProjectService._format_minutes(today_minutes),
+                })
+
+            if cache_seconds:
+                cache.set(cache_key, result, cache_seconds)
+            return True, result
+
+        except Exception as e:
+            logger.exception(f"Error getting running timers: {str(e)}")
+            return False, f"An error occurred: {str(e)}"
+
     @staticmethod
     def get_team_member_all_completed_assignments(team_member, start_date=None, end_date=None):
         """
@@ -1382,7 +1740,7 @@ class ProjectService:
                 'task__project',           # For project info
                 'task__project__product',  # For product name
                 'task__product_task'       # For task name
-            ).order_by('-completion_date')  # Most recent first
+            ).with_work_totals().order_by('-completion_date')  # Most recent first
 
             # Add total working hours to each assignment
             for assignment in completed_assignments:
@@ -1402,19 +1760,10 @@ class ProjectService:
             # Calculate average productivity (projected/worked * 100)
             productivity_values = []
             for assignment in completed_assignments:
-                # Get projected minutes
-                projected_minutes = assignment.projected_hours or 0
-
-                # Get worked minutes from daily totals
-                from django.db.models import Sum
-                worked_minutes = DailyTimeTotal.objects.filter(
-                    assignment=assignment
-                ).aggregate(total=Sum('total_minutes'))['total'] or 0
-
-                if worked_minutes > 0 and projected_minutes > 0:
-                    productivity = (projected_minutes / worked_minutes) * 100
+                # productivity (projected/worked * 100) is annotated by with_work_totals()
+                if assignment.productivity is not None:
                     # Cap at reasonable maximum (999%)
-                    productivity_values.append(min(productivity, 999))
+                    productivity_values.append(min(assignment.productivity, 999))
 
             if productivity_values:
                 completed_assignments.avg_productivity = round(sum(productivity_values) / len(productivity_values), 1)
@@ -1455,44 +1804,12 @@ class ProjectService:
                 'task__product_task',
                 'assigned_to',
                 'assigned_by'
-            ).prefetch_related(
-                'daily_totals'
+            ).with_work_totals()
+
+            query = ProjectService._filter_task_assignments(
+                query, assignment_status, team_member, project, dpm, start_date, end_date
             )
-            
-            # Filter by assignment status
-            if assignment_status == 'active':
-                query = query.filter(is_completed=False)
-            elif assignment_status == 'completed':
-                query = query.filter(is_completed=True)
-            # 'all' doesn't need additional filtering
-            
-            # Filter by team member
-            if team_member:
-                query = query.filter(assigned_to=team_member)
-            
-            # Filter by project
-            if project:
-                query = query.filter(task__project=project)
-            
-            # Filter by DPM
-            if dpm:
-                query = query.filter(task__project__dpm=dpm)
-            
-            # Apply date filtering based on assignment status
-            if start_date or end_date:
-                if assignment_status == 'completed':
-                    # For completed assignments, filter by completion_date
-                    if start_date:
-                        query = query.filter(completion_date__date__gte=start_date)
-                    if end_date:
-                        query = query.filter(completion_date__date__lte=end_date)
-                else:
-                    # For active assignments (or all), filter by assigned_date
-                    if start_date:
-                        query = query.filter(assigned_date__date__gte=start_date)
-                    if end_date:
-                        query = query.filter(assigned_date__date__lte=end_date)
-            
+
             # Order by appropriate date field
             if assignment_status == 'completed':
                 query = query.order_by('-completion_date')
@@ -1502,19 +1819,9 @@ class ProjectService:
             # Add computed fields for display
             assignments = []
             for assignment in query:
-                # Calculate total hours worked
-                total_minutes = sum(dt.total_minutes for dt in assignment.daily_totals.all())
-                total_hours_formatted = ProjectService._format_minutes(total_minutes)
-                
-                # Calculate progress percentage
-                if assignment.projected_hours and assignment.projected_hours > 0:
-                    progress_percentage = (total_minutes / assignment.projected_hours) * 100
-                else:
-                    progress_percentage = 0
-                
-                # Add computed fields to assignment object
-                assignment.total_hours_worked = total_hours_formatted
-                assignment.progress_percentage = round(progress_percentage, 1)
+                # Worked minutes and progress are annotated by with_work_totals()
+                assignment.total_hours_worked = ProjectService._format_minutes(assignment.total_worked_minutes)
+                assignment.progress_percentage = round(assignment.progress_percentage, 1)
                 assignment.projected_hours_formatted = ProjectService._format_minutes(assignment.projected_hours or 0)
                 
                 assignments.append(assignment)
@@ -1525,40 +1832,143 @@ class ProjectService:
             logger.exception(f"Error getting DPM task assignments: {str(e)}")
             return False, f"An error occurred: {str(e)}"
 
+    @staticmethod
+    def get_assignment_workload(assignment_status='active', team_member=None, project=None, dpm=None, start_date=None, end_date=None):
+        """
+        Projected and worked hours per team member for the assignment workload graph.
+        Aggregated in the database with one grouped query over the assignments and
+        one over their daily totals, however many assignments match.
+
+        Args:
+            Same filters as get_dpm_all_task_assignments
+
+        Returns:
+            tuple: (success, result)
+                - If successful: (True, chart_data dict)
+                - If failed: (False, error_message)
+        """
+        try:
+            assignments = ProjectService._filter_task_assignments(
+                TaskAssignment.objects.all(), assignment_status, team_member, project, dpm, start_date, end_date
+            ).order_by()
+
+            member_rows = list(assignments.values(
+                'assigned_to', 'assigned_to__username', 'assigned_to__first_name', 'assigned_to__last_name'
+            ).annotate(
+                projected=Sum('projected_hours'),
+                assignment_count=Count('id'),
+            ))
+
+            worked_by_member = dict(
+                DailyTimeTotal.objects.filter(
+                    assignment__in=assignments.values('id')
+                ).order_by().values('assignment__assigned_to').annotate(
+                    worked=Sum('total_minutes')
+                ).values_list('assignment__assigned_to', 'worked')
+            )
+
+            workload = []
+            for row in member_rows:
+                full_name = f"{row['assigned_to__first_name']} {row['assigned_to__last_name']}".strip()
+                workload.append({
+                    'name': full_name or row['assigned_to__username'],
+                    'username': row['assigned_to__username'],
+                    'hours': (row['projected'] or 0) / 60.0,
+                    'worked_hours': (worked_by_member.get(row['assigned_to']) or 0) / 60.0,
+                    'assignments': row['assignment_count'],
+                })
+
+            # Sort by hours (descending)
+            workload.sort(key=lambda item: item['hours'], reverse=True)
+
+            hours_data = [round(item['hours'], 1) for item in workload]
+            worked_hours_data = [round(item['worked_hours'], 1) for item in workload]
+
+            return True, {
+                'labels': [item['name'] for item in workload],
+                'hours': hours_data,
+                'worked_hours': worked_hours_data,
+                'remaining_hours': [round(max(0, item['hours'] - item['worked_hours']), 1) for item in workload],
+                'assignments': [item['assignments'] for item in workload],
+                'total_members': len(workload),
+                'total_assignments': sum(item['assignments'] for item in workload),
+                'total_hours': round(sum(hours_data), 1),
+                'total_worked_hours': round(sum(worked_hours_data), 1),
+                'avg_hours_per_member': round(sum(hours_data) / len(workload), 1) if workload else 0
+            }
+
+        except Exception as e:
+            logger.exception(f"Error getting assignment workload: {str(e)}")
+            return False, f"An error occurred: {str(e)}"
+
+    @staticmethod
+    def _filter_task_assignments(query, assignment_status, team_member, project, dpm, start_date, end_date):
+        """Apply the DPM assignment overview filters to a TaskAssignment queryset."""
+        # Filter by assignment status
+        if assignment_status == 'active':
+            query = query.filter(is_completed=False)
+        elif assignment_status == 'completed':
+            query = query.filter(is_completed=True)
+        # 'all' doesn't need additional filtering
+        
+        # Filter by team member
+        if team_member:
+            query = query.filter(assigned_to=team_member)
+        
+        # Filter by project
+        if project:
+            query = query.filter(task__project=project)
+        
+        # Filter by DPM
+        if dpm:
+            query = query.filter(task__project__dpm=dpm)
+        
+        # Apply date filtering based on assignment status
+        if start_date or end_date:
+            if assignment_status == 'completed':
+                # For completed assignments, filter by completion_date
+                if start_date:
+                    query = query.filter(completion_date__date__gte=start_date)
+                if end_date:
+                    query = query.filter(completion_date__date__lte=end_date)
+            else:
+                # For active assignments (or all), filter by assigned_date
+                if start_date:
+                    query = query.filter(assigned_date__date__gte=start_date)
+                if end_date:
+                    query = query.filter(assigned_date__date__lte=end_date)
+
+        return query
+
     # Helper methods (private)
     @staticmethod
     def _update_daily_total(assignment, team_member, work_date, additional_minutes):
-        """Update or create daily total by adding minutes. SAFE from race conditions."""
-        with transaction.atomic():
-            try:
-                # First, try to get or create the daily total
-                daily_total, created = DailyTimeTotal.objects.get_or_create(
-                    assignment=assignment,
-                    team_member=team_member,
-                    date_worked=work_date,
-                    defaults={'total_minutes': additional_minutes}
-                )
+        """
+        Add minutes just recorded in the time ledger to the daily total.
+        Uses a single upsert statement, so concurrent updates of the same day
+        can't race. A manually edited total is recalculated from the ledger.
+        """
+        ProjectService._update_daily_totals({(assignment.id, team_member.id, work_date): additional_minutes})
 
-                if not created and not daily_total.is_manually_edited:
-                    # Use F() expression for atomic update - prevents race conditions
-                    DailyTimeTotal.objects.filter(
-                        id=daily_total.id,
-                        is_manually_edited=False  # Double-check it wasn't manually edited
-                    ).update(
-                        total_minutes=F('total_minutes') + additional_minutes,
-                        last_updated=timezone.now()
-                    )
+    @staticmethod
+    def _update_daily_totals(deltas):
+        """
+        Add minutes to several daily totals with one grouped upsert.
 
-            except Exception as e:
-                logger.exception(f"Error updating daily total atomically: {str(e)}")
-                # Fallback to non-atomic update if F() fails (rare edge case)
-                try:
-                    daily_total.refresh_from_db()
-                    if not daily_total.is_manually_edited:
-                        daily_total.total_minutes += additional_minutes
-                        daily_total.save()
-                except Exception as fallback_error:
-                    logger.exception(f"Fallback update also failed: {fallback_error}")
+        Args:
+            deltas: (assignment id, team member id, date) -> minutes to add
+        """
+        try:
+            # Savepoint, so a failed upsert doesn't break the caller's transaction
+            with transaction.atomic():
+                TimeLedger.add_to_totals(deltas)
+        except Exception as e:
+            logger.exception(f"Error updating daily totals: {str(e)}")
+            # Fall back to re-summing the days from the ledger
+            try:
+                TimeLedger.project(deltas.keys())
+            except Exception as fallback_error:
+                logger.exception(f"Fallback update also failed: {fallback_error}")
 
     @staticmethod
     def _format_minutes(total_minutes):
@@ -1571,10 +1981,15 @@ class ProjectService:
 
     @staticmethod
     def _get_assignment_total_hours(assignment):
-        """Get total hours for an assignment across all days."""
-        total_minutes = DailyTimeTotal.objects.filter(
-            assignment=assignment
-        ).aggregate(total=Sum('total_minutes'))['total'] or 0
+        """
+        Get total hours for an assignment across all days.
+        Uses the with_work_totals() annotation when present instead of querying.
+        """
+        total_minutes = getattr(assignment, 'total_worked_minutes', None)
+        if total_minutes is None:
+            total_minutes = DailyTimeTotal.objects.filter(
+                assignment=assignment
+            ).aggregate(total=Sum('total_minutes'))['total'] or 0
 
         return ProjectService._format_minutes(total_minutes)
     @staticmethod
@@ -1835,16 +2250,7 @@ class ProjectService:
         Returns:
             tuple: (daily_roster_object, created_boolean)
         """
-        day_of_week = date.weekday()
-        from .models import Holiday
-        is_holiday = Holiday.objects.filter(date=date, location='Gurgaon', is_active=True).exists()
-
-        if is_holiday:
-            default_status = 'HOLIDAY'
-        elif day_of_week in [5, 6]:
-            default_status = 'WEEK_OFF'
-        else:
-            default_status = 'PRESENT'
+        default_status = RosterDefaults.default_status(date, RosterDefaults.holidays(date, date))
 
         # Let Django handle the database errors
         return DailyRoster.objects.get_or_create(
@@ -1855,6 +2261,27 @@ class ProjectService:
                 'is_auto_created': True
             }
         )
+
+    @staticmethod
+    def get_daily_roster(team_member, day):
+        """
+        Get a daily roster entry for reading. In virtual roster mode a day
+        without a stored entry gets an unsaved one with the default status
+        instead of a new row (see projects/roster.py).
+
+        Returns:
+            DailyRoster: Stored or virtual roster entry
+        """
+        if not RosterDefaults.is_virtual():
+            return ProjectService.get_or_create_daily_roster(team_member, day)[0]
+
+        roster = DailyRoster.objects.filter(team_member=team_member, date=day).first()
+        if roster is None:
+            roster = RosterDefaults.virtual(
+                team_member, day, RosterDefaults.default_status(day, RosterDefaults.holidays(day, day))
+            )
+        return roster
+
     @staticmethod
     def get_monthly_roster(team_member, year, month):
         """
@@ -1863,7 +2290,7 @@ class ProjectService:
         """
         try:
             from django.db.models import Sum
-            from .models import Holiday, MiscHours
+            from .models import MiscHours
             
             # Get all dates in the month
             _, last_day = calendar.monthrange(year, month)
@@ -1875,14 +2302,8 @@ class ProjectService:
             ]
 
             # QUERY 1: Get all holidays for the month in one query
-            holidays = set(
-                Holiday.objects.filter(
-                    date__gte=start_date,
-                    date__lte=end_date,
-                    location='Gurgaon',
-                    is_active=True
-                ).values_list('date', flat=True)
-            )
+            holidays = RosterDefaults.holidays(start_date, end_date)
+            virtual_mode = RosterDefaults.is_virtual()
 
             # QUERY 2: Get all existing roster entries for the month in one query
             existing_rosters = {
@@ -1936,22 +2357,20 @@ class ProjectService:
                     roster = existing_rosters[single_date]
                 else:
                     # Determine default status based on holiday/weekend
-                    day_of_week = single_date.weekday()
-                    if single_date in holidays:
-                        default_status = 'HOLIDAY'
-                    elif day_of_week in [5, 6]:  # Saturday, Sunday
-                        default_status = 'WEEK_OFF'
-                    else:
-                        default_status = 'PRESENT'
+                    default_status = RosterDefaults.default_status(single_date, holidays)
 
-                    # Create new roster object (will be bulk created later)
-                    roster = DailyRoster(
-                        team_member=team_member,
-                        date=single_date,
-                        status=default_status,
-                        is_auto_created=True
-                    )
-                    rosters_to_create.append(roster)
+                    if virtual_mode:
+                        # Shown with its default, nothing is written
+                        roster = RosterDefaults.virtual(team_member, single_date, default_status)
+                    else:
+                        # Create new roster object (will be bulk created later)
+                        roster = DailyRoster(
+                            team_member=team_member,
+                            date=single_date,
+                            status=default_status,
+                            is_auto_created=True
+                        )
+                        rosters_to_create.append(roster)
 
                 # Pre-calculate values to avoid triggering property queries
                 assignment_minutes = daily_totals_dict.get(single_date, 0)
@@ -1990,6 +2409,9 @@ class ProjectService:
                         except Exception:
                             pass  # Continue if individual create also fails
 
+                # bulk_create skips the post_save signal that maintains the reporting rollup
+                DailyMemberRollup.refresh((team_member.id, roster.date) for roster in rosters_to_create)
+
             # Create calendar grid structure (identical to original)
             cal = calendar.Calendar(firstweekday=calendar.SUNDAY)
             calendar_weeks = []
@@ -2128,11 +2550,13 @@ class ProjectService:
                     duration_minutes=total_minutes
                 )
 
-                # Ensure daily roster exists (but don't update misc_hours field - it's deprecated)
-                roster, created = ProjectService.get_or_create_daily_roster(team_member, work_date)
-                if created or roster.is_auto_created:
-                    roster.is_auto_created = False
-                    roster.save()
+                # Ensure daily roster exists (but don't update misc_hours field - it's deprecated).
+                # A virtual roster keeps only explicit status edits.
+                if not RosterDefaults.is_virtual():
+                    roster, created = ProjectService.get_or_create_daily_roster(team_member, work_date)
+                    if created or roster.is_auto_created:
+                        roster.is_auto_created = False
+                        roster.save()
 
                 logger.info(f"Misc hours added for {team_member.username} on {work_date}: {total_minutes} minutes - {activity}")
                 return True, misc_hours_entry
@@ -2146,6 +2570,23 @@ class ProjectService:
     def _calculate_timer_usage_percentage(assignment, team_member):
         """
         Calculate what percentage of total work time came from timer sessions vs manual entries.
+        See get_timer_usage for how edited timer sessions are split.
+
+        Args:
+            assignment: TaskAssignment object
+            team_member: User object
+
+        Returns:
+            float: Timer usage percentage (0.0 to 100.0)
+        """
+        usage = ProjectService.get_timer_usage([assignment.id], team_member)
+        return usage[assignment.id]['percentage'] if assignment.id in usage else 0.0
+
+    @staticmethod
+    def get_timer_usage(assignment_ids, team_member=None):
+        """
+        Split the logged time of many assignments into timer and manual
+        contributions with one grouped query.
 
         For edited timer sessions, we split the contribution:
         - Timer contribution: min(original_duration, final_duration)
@@ -2155,72 +2596,69 @@ class ProjectService:
         - Editing down (75→60 mins): User says only 60 mins was actual timer work
         - Editing up (60→75 mins): Timer captured 60 mins, user added 15 mins manually
 
+        The original duration is what the timer recorded (ended_at - started_at).
+
         Args:
-            assignment: TaskAssignment object
-            team_member: User object
+            assignment_ids: IDs of the assignments
+            team_member: Count only this member's sessions (default: each assignment's assignee)
 
         Returns:
-            float: Timer usage percentage (0.0 to 100.0)
+            dict: assignment id -> {'timer_minutes', 'manual_minutes', 'percentage'},
+                only for assignments with logged time
         """
-        try:
-            # Get all time sessions for this assignment
-            sessions = TimeSession.objects.filter(
-                assignment=assignment,
-                team_member=team_member
-            )
-
-            if not sessions.exists():
-                return 0.0
-
-            timer_minutes = 0
-            manual_minutes = 0
+        assignment_ids = list(assignment_ids)
+        if not assignment_ids:
+            return {}
 
-            for session in sessions:
-                session_duration = session.duration_minutes or 0
+        try:
+            minutes = Coalesce('duration_minutes', 0)
+            timer_rows = Q(session_type='TIMER')
+            # Edited timer sessions that still have the timer's own start/end
+            split_rows = timer_rows & Q(is_edited=True, started_at__isnull=False, ended_at__isnull=False)
+
+            usage = {}
+            # Chunked only to stay under the databases' parameter limits
+            for offset in range(0, len(assignment_ids), 1000):
+                sessions = TimeSession.objects.filter(assignment_id__in=assignment_ids[offset:offset + 1000])
+                if team_member is not None:
+                    sessions = sessions.filter(team_member=team_member)
+                else:
+                    sessions = sessions.filter(team_member_id=F('assignment__assigned_to_id'))
 
-                if session.session_type == 'MANUAL':
-                    # Manual entries: 100% manual contribution
-                    manual_minutes += session_duration
+                rows = sessions.order_by().alias(
+                    original_minutes=DurationMinutes(
+                        ExpressionWrapper(F('ended_at') - F('started_at'), output_field=DurationField())
+                    )
+                ).values('assignment_id').annotate(
+                    timer=Sum(Case(
+                        When(split_rows & Q(duration_minutes__gt=F('original_minutes')), then=F('original_minutes')),
+                        When(timer_rows, then=minutes),
+                        default=Value(0),
+                        output_field=IntegerField()
+                    )),
+                    manual=Sum(Case(
+                        When(session_type='MANUAL', then=minutes),
+                        When(split_rows & Q(duration_minutes__gt=F('original_minutes')),
+                             then=F('duration_minutes') - F('original_minutes')),
+                        default=Value(0),
+                        output_field=IntegerField()
+                    )),
+                )
 
-                elif session.session_type == 'TIMER':
-                    if not session.is_edited:
-                        # Unedited timer sessions: 100% timer contribution
-                        timer_minutes += session_duration
-                    else:
-                        # Edited timer sessions: Split contribution based on original vs final duration
-                        if session.started_at and session.ended_at:
-                            # Calculate original timer duration (what the timer actually recorded)
-                            original_duration_seconds = (session.ended_at - session.started_at).total_seconds()
-                            original_duration_minutes = int(original_duration_seconds // 60)
-
-                            # Final duration is what the user edited it to
-                            final_duration_minutes = session_duration
-
-                            if final_duration_minutes <= original_duration_minutes:
-                                # User edited down: timer contributed the final amount, no manual addition
-                                timer_minutes += final_duration_minutes
-                                # manual_minutes += 0  (no manual contribution)
-                            else:
-                                # User edited up: timer contributed original amount, user added the difference manually
-                                timer_minutes += original_duration_minutes
-                                manual_minutes += (final_duration_minutes - original_duration_minutes)
-                        else:
-                            # Fallback: if timestamps are missing, treat as 100% timer
-                            # (This shouldn't happen based on user confirmation, but defensive programming)
-                            timer_minutes += session_duration
-
-            total_minutes = timer_minutes + manual_minutes
-
-            if total_minutes == 0:
-                return 0.0
-
-            # Calculate percentage with proper rounding
-            timer_percentage = (timer_minutes / total_minutes) * 100
-            return round(timer_percentage, 1)
+                for row in rows:
+                    timer_minutes, manual_minutes = int(row['timer'] or 0), int(row['manual'] or 0)
+                    total_minutes = timer_minutes + manual_minutes
+                    usage[row['assignment_id']] = {
+                        'timer_minutes': timer_minutes,
+                        'manual_minutes': manual_minutes,
+                        # Calculate percentage with proper rounding
+                        'percentage': round((timer_minutes / total_minutes) * 100, 1) if total_minutes else 0.0,
+                    }
+            return usage
 
         except Exception as e:
             logger.exception(f"Error calculating timer usage percentage: {str(e)}")
-            return 0.0
+            return {}
 
     @staticmethod
     def _calculate_days_remaining(expected_delivery_date):
@@ -2364,64 +2802,182 @@ class ProjectService:
         Get ONLY the monthly summary data for a team member - optimized for roster list view.
         This avoids expensive calendar generation and daily roster creation.
         """
+        success, result = ProjectService.get_team_monthly_roster_summaries([team_member.id], year, month)
+        if not success:
+            return False, result
+        return True, result[team_member.id]
+
+    @staticmethod
+    def get_team_monthly_roster_summaries(team_member_ids, year, month):
+        """
+        Monthly roster summaries for many team members at once, with one
+        GROUP BY query each over DailyRoster, DailyTimeTotal and MiscHours
+        however many members there are (plus one for the default days in
+        virtual roster mode).
+
+        Args:
+            team_member_ids: Ids of the team members
+            year: Year
+            month: Month (1-12)
+
+        Returns:
+            tuple: (success, {team member id: summary}) with the same summary
+            keys as get_monthly_roster_summary_only
+        """
         try:
-            from django.db.models import Sum, Count, Q
-            from .models import DailyRoster, MiscHours
-            
+            from django.db.models import Count, Q
+            from .models import MiscHours
+
             # Get the date range for the month
             _, last_day = calendar.monthrange(year, month)
             start_date = date(year, month, 1)
             end_date = date(year, month, last_day)
-            
-            # Fetch existing roster entries in a single query
-            roster_entries = DailyRoster.objects.filter(
-                team_member=team_member,
-                date__gte=start_date,
-                date__lte=end_date
-            ).select_related('team_member')
-            
-            # Calculate status counts
-            status_counts = roster_entries.aggregate(
-                present_days=Count('id', filter=Q(status='PRESENT')),
-                leave_days=Count('id', filter=Q(status__in=['LEAVE', 'SICK_LEAVE'])),
-                weekoff_days=Count('id', filter=Q(status='WEEK_OFF'))
-            )
-            
-            # Calculate assignment hours from DailyTimeTotal (real source of assignment hours)
-            from .models import DailyTimeTotal
-            assignment_minutes = DailyTimeTotal.objects.filter(
-                team_member=team_member,
-                date_worked__gte=start_date,
-                date_worked__lte=end_date
-            ).aggregate(total=Sum('total_minutes'))['total'] or 0
-            
-            # Calculate legacy misc hours
-            legacy_misc_minutes = roster_entries.aggregate(
-                total=Sum('misc_hours')
-            )['total'] or 0
-            
-            # Calculate new misc hours in a single query
-            new_misc_minutes = MiscHours.objects.filter(
-                team_member=team_member,
-                date__gte=start_date,
-                date__lte=end_date
-            ).aggregate(total=Sum('duration_minutes'))['total'] or 0
-            
-            total_misc_minutes = legacy_misc_minutes + new_misc_minutes
-            
-            summary = {
-                'present_days': status_counts['present_days'],
-                'leave_days': status_counts['leave_days'],
-                'weekoff_days': status_counts['weekoff_days'],
-                'task_hours': ProjectService._format_minutes(assignment_minutes),
-                'misc_hours': ProjectService._format_minutes(total_misc_minutes),
-                'total_hours': ProjectService._format_minutes(assignment_minutes + total_misc_minutes)
+            team_member_ids = list(team_member_ids)
+
+            # QUERY 1: status counts and legacy misc hours per member
+            roster_totals = {
+                item['team_member']: item
+                for item in DailyRoster.objects.filter(
+                    team_member_id__in=team_member_ids,
+                    date__range=[start_date, end_date]
+                ).order_by().values('team_member').annotate(
+                    present_days=Count('id', filter=Q(status='PRESENT')),
+                    leave_days=Count('id', filter=Q(status__in=['LEAVE', 'SICK_LEAVE'])),
+                    weekoff_days=Count('id', filter=Q(status='WEEK_OFF')),
+                    legacy_misc=Sum('misc_hours')
+                )
             }
-            
-            return True, summary
+
+            # QUERY 2: assignment time per member (DailyTimeTotal is the real source)
+            assignment_totals = dict(DailyTimeTotal.objects.filter(
+                team_member_id__in=team_member_ids,
+                date_worked__range=[start_date, end_date]
+            ).order_by().values('team_member').annotate(
+                total=Sum('total_minutes')
+            ).values_list('team_member', 'total'))
+
+            # QUERY 3: new misc hours entries per member
+            misc_totals = dict(MiscHours.objects.filter(
+                team_member_id__in=team_member_ids,
+                date__range=[start_date, end_date]
+            ).order_by().values('team_member').annotate(
+                total=Sum('duration_minutes')
+            ).values_list('team_member', 'total'))
+
+            # QUERY 4 (virtual roster mode): default days without a stored entry
+            default_days = {}
+            if RosterDefaults.is_virtual():
+                default_days = RosterDefaults.default_day_counts(team_member_ids, start_date, end_date)
+
+            summaries = {}
+            for team_member_id in team_member_ids:
+                roster = roster_totals.get(team_member_id, {})
+                defaults = default_days.get(team_member_id, {})
+                assignment_minutes = assignment_totals.get(team_member_id) or 0
+                total_misc_minutes = (roster.get('legacy_misc') or 0) + (misc_totals.get(team_member_id) or 0)
+                summaries[team_member_id] = {
+                    'present_days': roster.get('present_days', 0) + defaults.get('PRESENT', 0),
+                    'leave_days': roster.get('leave_days', 0),
+                    'weekoff_days': roster.get('weekoff_days', 0) + defaults.get('WEEK_OFF', 0),
+                    'task_hours': ProjectService._format_minutes(assignment_minutes),
+                    'misc_hours': ProjectService._format_minutes(total_misc_minutes),
+                    'total_hours': ProjectService._format_minutes(assignment_minutes + total_misc_minutes)
+                }
+
+            return True, summaries
+
+        except Exception as e:
+            logger.exception(f"Error getting team monthly roster summaries: {str(e)}")
+            return False, f"An error occurred: {str(e)}"
+
+    @staticmethod
+    def get_team_roster_matrix(team_members, start_date, end_date):
+        """
+        Team x day roster matrix: every member's status and logged time for
+        each day of a range, from one GROUP BY query each over DailyRoster,
+        DailyTimeTotal and MiscHours. Days without a stored roster entry show
+        their default status (nothing is written, whatever the roster mode).
+
+        Args:
+            team_members: Team member users, in display order
+            start_date: First day
+            end_date: Last day
+
+        Returns:
+            tuple: (success, {'days': [date, ...], 'rows': [{'member', 'cells', 'totals'}, ...]})
+        """
+        try:
+            from .models import MiscHours
+
+            team_members = list(team_members)
+            team_member_ids = [member.id for member in team_members]
+            days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+            holidays = RosterDefaults.holidays(start_date, end_date)
+
+            # QUERY 1: stored statuses and legacy misc hours
+            rosters = {
+                (member_id, day): (status, misc or 0)
+                for member_id, day, status, misc in DailyRoster.objects.filter(
+                    team_member_id__in=team_member_ids,
+                    date__range=[start_date, end_date]
+                ).order_by().values_list('team_member', 'date', 'status', 'misc_hours')
+            }
+
+            # QUERY 2: assignment time per member and day
+            minutes = {
+                (item['team_member'], item['date_worked']): item['total'] or 0
+                for item in DailyTimeTotal.objects.filter(
+                    team_member_id__in=team_member_ids,
+                    date_worked__range=[start_date, end_date]
+                ).order_by().values('team_member', 'date_worked').annotate(total=Sum('total_minutes'))
+            }
+
+            # QUERY 3: misc hours entries per member and day
+            for item in MiscHours.objects.filter(
+                team_member_id__in=team_member_ids,
+                date__range=[start_date, end_date]
+            ).order_by().values('team_member', 'date').annotate(total=Sum('duration_minutes')):
+                key = (item['team_member'], item['date'])
+                minutes[key] = minutes.get(key, 0) + (item['total'] or 0)
+
+            rows = []
+            for member in team_members:
+                cells = []
+                status_counts = {}
+                total_minutes = 0
+                for day in days:
+                    status, legacy_misc = rosters.get((member.id, day), (None, 0))
+                    is_default = status is None
+                    if is_default:
+                        status = RosterDefaults.default_status(day, holidays)
+                    day_minutes = minutes.get((member.id, day), 0) + legacy_misc
+                    status_counts[status] = status_counts.get(status, 0) + 1
+                    total_minutes += day_minutes
+                    cells.append({
+                        'date': day,
+                        'status': status,
+                        'is_default': is_default,
+                        'minutes': day_minutes,
+                        'formatted': ProjectService._format_minutes(day_minutes) if day_minutes else '',
+                    })
+                rows.append({
+                    'member': member,
+                    'cells': cells,
+                    'totals': {
+                        'present_days': status_counts.get('PRESENT', 0),
+                        'half_days': status_counts.get('HALF_DAY', 0),
+                        'leave_days': status_counts.get('LEAVE', 0) + status_counts.get('SICK_LEAVE', 0),
+                        'weekoff_days': status_counts.get('WEEK_OFF', 0),
+                        'holiday_days': status_counts.get('HOLIDAY', 0),
+                        'total_minutes': total_minutes,
+                        'total_hours': ProjectService._format_minutes(total_minutes),
+                    },
+                })
+
+            return True, {'days': days, 'rows': rows}
 
         except Exception as e:
-            logger.exception(f"Error getting monthly roster summary: {str(e)}")
+            logger.exception(f"Error getting team roster matrix: {str(e)}")
             return False, f"An error occurred: {str(e)}"
 
     @staticmethod
@@ -2434,7 +2990,7 @@ class ProjectService:
         """
         try:
             from django.db.models import Sum
-            from .models import Holiday, MiscHours
+            from .models import MiscHours
             
             # Get all dates in the month
             _, last_day = calendar.monthrange(year, month)
@@ -2446,14 +3002,8 @@ class ProjectService:
             ]
 
             # QUERY 1: Get all holidays for the month in one query
-            holidays = set(
-                Holiday.objects.filter(
-                    date__gte=start_date,
-                    date__lte=end_date,
-                    location='Gurgaon',
-                    is_active=True
-                ).values_list('date', flat=True)
-            )
+            holidays = RosterDefaults.holidays(start_date, end_date)
+            virtual_mode = RosterDefaults.is_virtual()
 
             # QUERY 2: Get all existing roster entries for the month in one query
             existing_rosters = {
@@ -2507,22 +3057,20 @@ class ProjectService:
                     roster = existing_rosters[single_date]
                 else:
                     # Determine default status based on holiday/weekend
-                    day_of_week = single_date.weekday()
-                    if single_date in holidays:
-                        default_status = 'HOLIDAY'
-                    elif day_of_week in [5, 6]:  # Saturday, Sunday
-                        default_status = 'WEEK_OFF'
-                    else:
-                        default_status = 'PRESENT'
+                    default_status = RosterDefaults.default_status(single_date, holidays)
 
-                    # Create new roster object (will be bulk created later)
-                    roster = DailyRoster(
-                        team_member=team_member,
-                        date=single_date,
-                        status=default_status,
-                        is_auto_created=True
-                    )
-                    rosters_to_create.append(roster)
+                    if virtual_mode:
+                        # Shown with its default, nothing is written
+                        roster = RosterDefaults.virtual(team_member, single_date, default_status)
+                    else:
+                        # Create new roster object (will be bulk created later)
+                        roster = DailyRoster(
+                            team_member=team_member,
+                            date=single_date,
+                            status=default_status,
+                            is_auto_created=True
+                        )
+                        rosters_to_create.append(roster)
 
                 # Pre-calculate values to avoid triggering property queries
                 assignment_minutes = daily_totals_dict.get(single_date, 0)
@@ -2561,6 +3109,9 @@ class ProjectService:
                         except Exception:
                             pass  # Continue if individual create also fails
 
+                # bulk_create skips the post_save signal that maintains the reporting rollup
+                DailyMemberRollup.refresh((team_member.id, roster.date) for roster in rosters_to_create)
+
             # Create calendar grid structure (identical to original)
             cal = calendar.Calendar(firstweekday=calendar.SUNDAY)
             calendar_weeks = []
@@ -2625,150 +3176,200 @@ class ReportingService:
     def get_team_member_metrics(team_member, start_date, end_date):
         """
         Calculate team member metrics on-demand for date range.
-        Much simpler than the stored approach!
         """
-        from decimal import Decimal
-        from django.db.models import F, Case, When, IntegerField
+        return ReportingService.get_team_metrics([team_member], start_date, end_date)[team_member.id]
+
+    @staticmethod
+    def _get_live_work_stats(member_ids, start_date, end_date):
+        """
+        Assignment, time and roster totals per team member, computed from the source tables.
+
+        Returns:
+            dict: team member id -> totals (same keys as DailyMemberRollup.get_range_totals)
+        """
+        from django.db.models import Case, When, IntegerField, Value
+
+        rated = Q(quality_rating__isnull=False) & ~Q(quality_rating=0)
+        work_stats = {member_id: {} for member_id in member_ids}
 
-        # Get completed assignments in date range
+        # Completed assignments in date range: projected time and quality ratings
         completed_assignments = TaskAssignment.objects.filter(
-            assigned_to=team_member,
+            assigned_to_id__in=member_ids,
             is_completed=True,
             completion_date__date__range=[start_date, end_date]
-        ).select_related('task__project')
-
-        # Get daily totals for utilization calculation
-        daily_totals = DailyTimeTotal.objects.filter(
-            team_member=team_member,
-            date_worked__range=[start_date, end_date]
-        ).values('date_worked').annotate(
-            day_total=Sum('total_minutes')
         )
+        for row in completed_assignments.order_by().values('assigned_to').annotate(
+            projected=Sum('projected_hours'),
+            assignment_count=Count('id'),
+            rated_count=Count('id', filter=rated),
+            rating_total=Sum('quality_rating', filter=rated),
+        ):
+            work_stats[row['assigned_to']].update(row)
+
+        # All time worked on those assignments (not limited to the date range)
+        for row in DailyTimeTotal.objects.filter(
+            team_member_id__in=member_ids,
+            assignment__assigned_to_id=F('team_member_id'),
+            assignment__is_completed=True,
+            assignment__completion_date__date__range=[start_date, end_date]
+        ).order_by().values('team_member').annotate(worked=Sum('total_minutes')):
+            work_stats[row['team_member']]['worked_on_completed'] = row['worked'] or 0
+
+        # Time worked within the date range, for utilization
+        for row in DailyTimeTotal.objects.filter(
+            team_member_id__in=member_ids,
+            date_worked__range=[start_date, end_date]
+        ).order_by().values('team_member').annotate(worked=Sum('total_minutes')):
+            work_stats[row['team_member']]['worked_in_range'] = row['worked'] or 0
 
-        # Get roster data for availability calculation
-        roster_days = DailyRoster.objects.filter(
-            team_member=team_member,
+        # Roster availability: 8 hours for PRESENT/LEAVE/HALF_DAY for utilization,
+        # 8 hours PRESENT / 4 hours HALF_DAY for efficiency
+        for row in DailyRoster.objects.filter(
+            team_member_id__in=member_ids,
             date__range=[start_date, end_date]
-        )
-
-        # Calculate productivity metrics
-        total_projected = 0
-        total_worked = 0
-        quality_ratings = []
-
-        for assignment in completed_assignments:
-            projected = assignment.projected_hours or 0
-            worked = DailyTimeTotal.objects.filter(
-                assignment=assignment,
-                team_member=team_member
-            ).aggregate(total=Sum('total_minutes'))['total'] or 0
-
-            total_projected += projected
-            total_worked += worked
+        ).order_by().values('team_member').annotate(
+            available=Sum(Case(
+                When(status__in=['PRESENT', 'LEAVE', 'HALF_DAY'], then=Value(480)),
+                default=Value(0),
+                output_field=IntegerField()
+            )),
+            efficiency_available=Sum(Case(
+                When(status='PRESENT', then=Value(480)),
+                When(status='HALF_DAY', then=Value(240)),
+                default=Value(0),
+                output_field=IntegerField()
+            )),
+            misc=Sum('misc_hours'),
+        ):
+            work_stats[row['team_member']].update(row)
+
+        return work_stats
 
-            if assignment.quality_rating:
-                quality_ratings.append(float(assignment.quality_rating))
-
-        # Calculate utilization (total worked vs available time)
-        total_available_minutes = 0
-        total_worked_minutes = 0
-
-        for roster in roster_days:
-            if roster.status in ['PRESENT', 'LEAVE', 'HALF_DAY']:
-                total_available_minutes += 480  # 8 hours
-
-        total_worked_minutes = sum(dt['day_total'] for dt in daily_totals)
-
-        # Calculate efficiency (assignment + misc hours vs present/half days only)
-        efficiency_available_minutes = 0
-        total_misc_minutes = 0
-
-        for roster in roster_days:
-            if roster.status == 'PRESENT':
-                efficiency_available_minutes += 480  # 8 hours
-            elif roster.status == 'HALF_DAY':
-                efficiency_available_minutes += 240  # 4 hours
-
-            # Add misc hours to total work time for efficiency calculation
-            total_misc_minutes += roster.misc_hours
-
-        total_efficiency_work_minutes = total_worked_minutes + total_misc_minutes
+    @staticmethod
+    def get_team_metrics(team_members, start_date, end_date):
+        """
+        Calculate metrics for many team members at once.
 
-        # Calculate delivery performance
-        deliveries = ProjectDelivery.objects.filter(
-            project_incharge=team_member,
-            delivery_date__range=[start_date, end_date]
-        )
+        Runs one grouped query per data source (completed assignments, time
+        worked on them, daily totals, roster, deliveries) regardless of how
+        many members or assignments there are. Ranges long enough for
+        DailyMemberRollup.covers() read the DailyMemberStats rollup instead,
+        leaving only the rollup and delivery queries.
 
-        delivery_ratings = [
-            float(d.delivery_performance_rating)
-            for d in deliveries
-            if d.delivery_performance_rating
-        ]
+        Args:
+            team_members: Iterable of team member users
+            start_date: First day of the period
+            end_date: Last day of the period
 
-        # Calculate on-time delivery rate using database fields, not the property
-        # A delivery is on-time if actual_completion_date <= expected_completion_date
-        # Handle cases where expected_completion_date might be null
-        on_time_deliveries = deliveries.filter(
-            expected_completion_date__isnull=False
-        ).filter(
-            actual_completion_date__lte=F('expected_completion_date')
-        )
-        on_time_count = on_time_deliveries.count()
-        total_deliveries = deliveries.count()
+        Returns:
+            dict: team member id -> metrics dict (same shape as get_team_member_metrics)
+        """
+        member_ids = [member.id for member in team_members]
+        if DailyMemberRollup.covers(start_date, end_date):
+            # Long ranges read the materialized per-day rollup instead of the source tables
+            work_stats = DailyMemberRollup.get_range_totals(member_ids, start_date, end_date)
+        else:
+            work_stats = ReportingService._get_live_work_stats(member_ids, start_date, end_date)
+
+        if RosterDefaults.is_virtual():
+            # Days without a stored roster entry are available by default when PRESENT
+            for member_id, defaults in RosterDefaults.default_day_counts(member_ids, start_date, end_date).items():
+                stats = work_stats.setdefault(member_id, {})
+                stats['available'] = (stats.get('available') or 0) + defaults['PRESENT'] * 480
+                stats['efficiency_available'] = (stats.get('efficiency_available') or 0) + defaults['PRESENT'] * 480
+
+        # Delivery performance. A delivery is on-time if
+        # actual_completion_date <= expected_completion_date.
+        delivery_rated = Q(delivery_performance_rating__isnull=False) & ~Q(delivery_performance_rating=0)
+        delivery_stats = {
+            row['project_incharge']: row
+            for row in ProjectDelivery.objects.filter(
+                project_incharge_id__in=member_ids,
+                delivery_date__range=[start_date, end_date]
+            ).order_by().values('project_incharge').annotate(
+                delivery_count=Count('id'),
+                rated_count=Count('id', filter=delivery_rated),
+                rating_total=Sum('delivery_performance_rating', filter=delivery_rated),
+                on_time_count=Count('id', filter=Q(
+                    expected_completion_date__isnull=False,
+                    actual_completion_date__lte=F('expected_completion_date')
+                )),
+            )
+        }
 
-        return {
-            'period': f"{start_date} to {end_date}",
-            'productivity': {
-                'score': (total_projected / total_worked * 100) if total_worked > 0 else None,
-                'projected_hours': total_projected / 60,
-                'worked_hours': total_worked / 60,
-            },
-            'optimization': {
-                'score': ((total_projected - total_worked) / total_projected * 100) if total_projected > 0 else None,
-                'projected_hours': total_projected / 60,
-                'worked_hours': total_worked / 60,
-                'saved_hours': (total_projected - total_worked) / 60 if total_projected > 0 else 0,
-            },
-            'utilization': {
-                'score': (total_worked_minutes / total_available_minutes * 100) if total_available_minutes > 0 else None,
-                'worked_minutes': total_worked_minutes,
-                'available_minutes': total_available_minutes,
-            },
-            'efficiency': {
-                'score': (total_efficiency_work_minutes / efficiency_available_minutes * 100) if efficiency_available_minutes > 0 else None,
-                'total_work_minutes': total_efficiency_work_minutes,
-                'assignment_minutes': total_worked_minutes,
-                'misc_minutes': total_misc_minutes,
-                'available_minutes': efficiency_available_minutes,
-            },
-            'quality': {
-                'average_rating': sum(quality_ratings) / len(quality_ratings) if quality_ratings else None,
-                'total_assignments': len(completed_assignments),
-                'rated_assignments': len(quality_ratings),
-            },
-            'delivery': {
-                'average_rating': sum(delivery_ratings) / len(delivery_ratings) if delivery_ratings else None,
-                'total_projects': total_deliveries,
-                'on_time_rate': (on_time_count / total_deliveries * 100) if total_deliveries > 0 else None,
-                'on_time_count': on_time_count,
+        metrics = {}
+        for member_id in member_ids:
+            work = work_stats.get(member_id, {})
+            deliveries = delivery_stats.get(member_id, {})
+
+            total_projected = work.get('projected') or 0
+            total_worked = work.get('worked_on_completed') or 0
+            total_worked_minutes = work.get('worked_in_range') or 0
+            total_available_minutes = work.get('available') or 0
+            efficiency_available_minutes = work.get('efficiency_available') or 0
+            total_misc_minutes = work.get('misc') or 0
+            total_efficiency_work_minutes = total_worked_minutes + total_misc_minutes
+
+            rated_assignments = work.get('rated_count') or 0
+            rated_deliveries = deliveries.get('rated_count', 0)
+            total_deliveries = deliveries.get('delivery_count', 0)
+            on_time_count = deliveries.get('on_time_count', 0)
+
+            metrics[member_id] = {
+                'period': f"{start_date} to {end_date}",
+                'productivity': {
+                    'score': (total_projected / total_worked * 100) if total_worked > 0 else None,
+                    'projected_hours': total_projected / 60,
+                    'worked_hours': total_worked / 60,
+                },
+                'optimization': {
+                    'score': ((total_projected - total_worked) / total_projected * 100) if total_projected > 0 else None,
+                    'projected_hours': total_projected / 60,
+                    'worked_hours': total_worked / 60,
+                    'saved_hours': (total_projected - total_worked) / 60 if total_projected > 0 else 0,
+                },
+                'utilization': {
+                    'score': (total_worked_minutes / total_available_minutes * 100) if total_available_minutes > 0 else None,
+                    'worked_minutes': total_worked_minutes,
+                    'available_minutes': total_available_minutes,
+                },
+                'efficiency': {
+                    'score': (total_efficiency_work_minutes / efficiency_available_minutes * 100) if efficiency_available_minutes > 0 else None,
+                    'total_work_minutes': total_efficiency_work_minutes,
+                    'assignment_minutes': total_worked_minutes,
+                    'misc_minutes': total_misc_minutes,
+                    'available_minutes': efficiency_available_minutes,
+                },
+                'quality': {
+                    'average_rating': float(work['rating_total']) / rated_assignments if rated_assignments else None,
+                    'total_assignments': work.get('assignment_count') or 0,
+                    'rated_assignments': rated_assignments,
+                },
+                'delivery': {
+                    'average_rating': float(deliveries['rating_total']) / rated_deliveries if rated_deliveries else None,
+                    'total_projects': total_deliveries,
+                    'on_time_rate': (on_time_count / total_deliveries * 100) if total_deliveries > 0 else None,
+                    'on_time_count': on_time_count,
+                }
             }
-        }
+
+        return metrics
 
     @staticmethod
     def get_team_overview(start_date, end_date):
         """
-        Get overview for all team members (much faster without stored metrics).
+        Get overview for all team members, computed in a fixed number of queries.
         """
-        team_members = User.objects.filter(role='TEAM_MEMBER')
-        overview_data = []
+        team_members = list(User.objects.filter(role='TEAM_MEMBER'))
+        team_metrics = ReportingService.get_team_metrics(team_members, start_date, end_date)
 
-        for member in team_members:
-            metrics = ReportingService.get_team_member_metrics(member, start_date, end_date)
-            overview_data.append({
+        overview_data = [
+            {
                 'team_member': member,
-                'metrics': metrics
-            })
+                'metrics': team_metrics[member.id]
+            }
+            for member in team_members
+        ]
 
         # Sort by productivity
         overview_data.sort(
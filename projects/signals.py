@@ -1,9 +1,17 @@
 # Update projects/signals.py - Much simpler without stored metrics!
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
+from django.core.signals import request_finished
 from django.dispatch import receiver
-from .models import ProjectStatusHistory, TaskAssignment, Project
+from .models import ProjectStatusHistory, TaskAssignment, Project, ProjectStatusOption, DailyTimeTotal, DailyRoster, MiscHours, TimeSession, ActiveTimer, Holiday
 from .services import ReportingService
+from .status_registry import StatusRegistry
+from .rollups import DailyMemberRollup
+from .audit import TimerAuditLog
+from .ledger import TimeLedger
+from .live import LiveUpdates
+from .holidays import HolidayCalendar
+from accounts.models import User
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,8 +25,8 @@ def track_status_changes(sender, instance, created, **kwargs):
     if not created:
         return
     
-    # Check if this is a "Final Delivery" status using category_two field
-    if instance.status.category_two == 'Final Delivery':
+    # Check if this is a "Final Delivery" status using the cached classification
+    if StatusRegistry.is_delivered(instance.status_id):
         try:
             # Just track the delivery event - no metrics calculation needed!
             ReportingService.track_project_delivery(
@@ -43,7 +51,7 @@ def log_project_state_transition(sender, instance, **kwargs):
             old_project = Project.objects.get(pk=instance.pk)
             
             # Check if status is changing
-            if old_project.current_status != instance.current_status:
+            if old_project.current_status_id != instance.current_status_id:
                 old_is_delivered = old_project.is_delivered
                 new_is_delivered = instance.is_delivered
                 
@@ -53,4 +61,137 @@ def log_project_state_transition(sender, instance, **kwargs):
                     else:
                         logger.info(f"Project {instance.hs_id} transitioning from DELIVERED to PIPELINE")
         except Project.DoesNotExist:
-            pass
\ No newline at end of file
+            pass
+
+
+@receiver(post_save, sender=ProjectStatusOption)
+@receiver(post_delete, sender=ProjectStatusOption)
+def invalidate_status_classification(sender, **kwargs):
+    """
+    Status options are edited through the admin; drop the cached classification
+    so the next lookup picks up the change.
+    """
+    StatusRegistry.invalidate()
+
+
+
+# Reporting rollup (DailyMemberStats) maintenance. Each receiver is a no-op
+# unless REPORTING_ROLLUP_ENABLED is set.
+
+def _should_refresh_rollup(origin=None, **kwargs):
+    """
+    Skip cascades from deleting a user: their rollup rows are being deleted
+    too, and refreshing would re-insert rows pointing at the deleted user.
+    """
+    if not DailyMemberRollup.is_enabled():
+        return False
+    origin_model = getattr(origin, 'model', None) or type(origin)
+    return origin_model is not User
+
+
+@receiver(post_save, sender=DailyTimeTotal)
+@receiver(post_delete, sender=DailyTimeTotal)
+def refresh_rollup_for_time_total(sender, instance, **kwargs):
+    if not _should_refresh_rollup(**kwargs):
+        return
+    try:
+        assignment = instance.assignment
+    except TaskAssignment.DoesNotExist:
+        # Being deleted along with its assignment
+        assignment = None
+    if assignment is None:
+        DailyMemberRollup.refresh([(instance.team_member_id, instance.date_worked)])
+    else:
+        DailyMemberRollup.refresh_for_time_total(assignment, instance.team_member_id, instance.date_worked)
+
+
+@receiver(post_save, sender=DailyRoster)
+@receiver(post_delete, sender=DailyRoster)
+@receiver(post_save, sender=MiscHours)
+@receiver(post_delete, sender=MiscHours)
+def refresh_rollup_for_day(sender, instance, **kwargs):
+    if _should_refresh_rollup(**kwargs):
+        DailyMemberRollup.refresh([(instance.team_member_id, instance.date)])
+
+
+@receiver(pre_save, sender=TaskAssignment)
+def remember_assignment_completion_day(sender, instance, **kwargs):
+    """
+    Remember which rollup row the assignment was counted in before this save,
+    so un-completing or re-dating it also refreshes the old day.
+    """
+    instance._previous_completion_key = None
+    if DailyMemberRollup.is_enabled() and instance.pk:
+        previous = TaskAssignment.objects.filter(pk=instance.pk).only(
+            'assigned_to', 'is_completed', 'completion_date'
+        ).first()
+        if previous:
+            instance._previous_completion_key = DailyMemberRollup.completion_key(previous)
+
+
+@receiver(post_save, sender=TaskAssignment)
+@receiver(post_delete, sender=TaskAssignment)
+def refresh_rollup_for_assignment(sender, instance, **kwargs):
+    if _should_refresh_rollup(**kwargs):
+        DailyMemberRollup.refresh([
+            getattr(instance, '_previous_completion_key', None),
+            DailyMemberRollup.completion_key(instance),
+        ])
+
+
+@receiver(post_delete, sender=TimeSession)
+def record_session_deletion(sender, instance, origin=None, **kwargs):
+    """
+    Take a deleted session's minutes out of the time ledger and its daily
+    total. Cascades from deleting the assignment or user are skipped: their
+    ledger entries and totals are deleted with them.
+    """
+    origin_model = getattr(origin, 'model', None) or type(origin)
+    if origin_model is not TimeSession:
+        return
+    TimeLedger.record_deletions([instance])
+    TimeLedger.project([TimeLedger.key(instance)])
+
+
+@receiver(post_save, sender=ActiveTimer)
+@receiver(post_save, sender=DailyRoster)
+@receiver(post_delete, sender=DailyRoster)
+@receiver(post_save, sender=MiscHours)
+@receiver(post_delete, sender=MiscHours)
+def announce_live_update(sender, instance, **kwargs):
+    """
+    Tell the live dashboard streams a member's timer or today's totals changed.
+    Logged time announces itself through the time ledger, stopped timers
+    through the timer backend.
+    """
+    LiveUpdates.touch([instance.team_member_id])
+
+
+@receiver(pre_save, sender=Holiday)
+def remember_holiday_calendar_year(sender, instance, **kwargs):
+    """
+    Remember the calendar year the holiday was in before this save, so moving
+    it to another date or location also refreshes the old one.
+    """
+    instance._previous_calendar_year = None
+    if instance.pk:
+        previous = Holiday.objects.filter(pk=instance.pk).only('date', 'location').first()
+        if previous:
+            instance._previous_calendar_year = (previous.location, previous.date.year)
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def refresh_holiday_calendar(sender, instance, **kwargs):
+    years = {(instance.location, instance.date.year), getattr(instance, '_previous_calendar_year', None)}
+    for location, year in filter(None, years):
+        HolidayCalendar.invalidate(location, year)
+
+
+@receiver(request_finished)
+def flush_timer_audit_log(sender, **kwargs):
+    """
+    Write timer audit entries recorded outside a transaction that are still
+    waiting for the size/time threshold, so none outlive the request.
+    """
+    TimerAuditLog.flush()
@@ -0,0 +1,154 @@
+#projects/status_registry.py
+"""
+Classification of project statuses into pipeline / delivered / dropped.
+
+Lists, dashboards and signals all need to know which statuses count as
+delivered or dropped. Rather than re-querying ProjectStatusOption (or
+hardcoding status names) on every request, the classification is loaded
+once, kept in Django's cache and in process memory, and invalidated by the
+save/delete signals on ProjectStatusOption.
+
+Every process keeps its own copy tagged with a generation token stored in the
+STATUS_REGISTRY_CACHE cache. Invalidation replaces the token, so with a shared
+cache backend every process reloads on its next lookup. The token and the
+cached classification expire after STATUS_REGISTRY_TTL seconds, which bounds
+how stale another process's copy can get when the cache is not shared between
+processes (the default local-memory cache).
+"""
+import logging
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+PIPELINE = 'pipeline'
+DELIVERED = 'delivered'
+DROPPED = 'dropped'
+
+# category_two value that marks a status as delivered
+DELIVERED_CATEGORY = 'Final Delivery'
+# Statuses that close a project without a delivery
+DROPPED_STATUS_NAMES = ('Opp Dropped', 'Deemed Consumed')
+DROPPED_CATEGORIES = ('Deemed Consumed',)
+
+CLASSIFICATION_CACHE_KEY = 'projects:status_classification'
+GENERATION_CACHE_KEY = 'projects:status_classification:generation'
+DEFAULT_REGISTRY_TTL = 5 * 60  # seconds
+
+
+def classify_status(name, category_two):
+    """
+    Classify a single status from its name and category_two.
+    """
+    category = (category_two or '').strip().lower()
+    if category == DELIVERED_CATEGORY.lower():
+        return DELIVERED
+    if category in {c.lower() for c in DROPPED_CATEGORIES}:
+        return DROPPED
+    if (name or '').strip().lower() in {n.lower() for n in DROPPED_STATUS_NAMES}:
+        return DROPPED
+    return PIPELINE
+
+
+class StatusRegistry:
+    """
+    Cached lookup of status id -> classification.
+    """
+
+    # Process-local copy: {'generation': token, 'statuses': {status_id: classification}}
+    _local = None
+
+    @staticmethod
+    def cache():
+        return caches[getattr(settings, 'STATUS_REGISTRY_CACHE', 'default')]
+
+    @staticmethod
+    def ttl():
+        return getattr(settings, 'STATUS_REGISTRY_TTL', DEFAULT_REGISTRY_TTL)
+
+    @staticmethod
+    def _current_generation():
+        cache = StatusRegistry.cache()
+        generation = cache.get(GENERATION_CACHE_KEY)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            # add() so concurrent processes agree on a single token
+            if not cache.add(GENERATION_CACHE_KEY, generation, StatusRegistry.ttl()):
+                generation = cache.get(GENERATION_CACHE_KEY, generation)
+        return generation
+
+    @staticmethod
+    def _load():
+        from .models import ProjectStatusOption
+
+        statuses = {
+            str(status_id): classify_status(name, category_two)
+            for status_id, name, category_two in ProjectStatusOption.objects.values_list(
+                'id', 'name', 'category_two'
+            )
+        }
+        logger.debug(f"Loaded status classification for {len(statuses)} statuses")
+        return statuses
+
+    @staticmethod
+    def get_classifications():
+        """
+        Returns:
+            dict: status id (as a string) -> PIPELINE / DELIVERED / DROPPED
+        """
+        generation = StatusRegistry._current_generation()
+        local = StatusRegistry._local
+        if local and local['generation'] == generation:
+            return local['statuses']
+
+        cache = StatusRegistry.cache()
+        statuses = cache.get(CLASSIFICATION_CACHE_KEY)
+        if statuses is None or statuses.get('generation') != generation:
+            statuses = {'generation': generation, 'statuses': StatusRegistry._load()}
+            cache.set(CLASSIFICATION_CACHE_KEY, statuses, StatusRegistry.ttl())
+
+        StatusRegistry._local = statuses
+        return statuses['statuses']
+
+    @staticmethod
+    def invalidate():
+        """Drop the cached classification in this and (via the cache) every other process."""
+        StatusRegistry._local = None
+        cache = StatusRegistry.cache()
+        cache.delete(CLASSIFICATION_CACHE_KEY)
+        cache.set(GENERATION_CACHE_KEY, uuid.uuid4().hex, StatusRegistry.ttl())
+
+    @staticmethod
+    def classify(status_id):
+        """Classification for one status id. Unknown or missing statuses count as pipeline."""
+        if status_id is None:
+            return PIPELINE
+        return StatusRegistry.get_classifications().get(str(status_id), PIPELINE)
+
+    @staticmethod
+    def status_ids(*classifications):
+        """
+        Ids of every status in the given classifications.
+
+        Returns:
+            list: Status UUIDs, usable in `current_status_id__in` filters
+        """
+        return [
+            uuid.UUID(status_id)
+            for status_id, classification in StatusRegistry.get_classifications().items()
+            if classification in classifications
+        ]
+
+    @staticmethod
+    def delivered_status_ids():
+        return StatusRegistry.status_ids(DELIVERED)
+
+    @staticmethod
+    def closed_status_ids():
+        """Statuses that take a project off the DPM's working list (delivered or dropped)."""
+        return StatusRegistry.status_ids(DELIVERED, DROPPED)
+
+    @staticmethod
+    def is_delivered(status_id):
+        return StatusRegistry.classify(status_id) == DELIVERED
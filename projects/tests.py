@@ -1,28 +1,43 @@
 #projects/tests.py
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client, AsyncClient, skipUnlessDBFeature, override_settings
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, F, Sum
 from datetime import date, datetime, timedelta
 from decimal import Decimal
+from unittest import mock, skipUnless
+import time
 import uuid
 import json
+from io import StringIO
 
 # Import models
 from .models import (
     ProductSubcategory, Product, ProjectStatusOption, Project, 
     ProjectStatusHistory, ProductTask, ProjectTask, TaskAssignment,
     ActiveTimer, TimeSession, DailyTimeTotal, TimerActionLog,
-    DailyRoster, Holiday, ProjectDelivery
+    DailyRoster, Holiday, ProjectDelivery, IdSequence, DailyMemberStats, TimeLedgerEntry, MiscHours
 )
 from accounts.models import User
 from locations.models import Region, City
 
 # Import services and forms
 from .services import ProjectService, ReportingService
+from .status_registry import StatusRegistry, PIPELINE, DELIVERED, DROPPED
+from .audit import TimerAuditLog
+from .timers import CacheTimerBackend, get_timer_backend, recover_active_timers
+from .ledger import TimeLedger
+from .live import LiveUpdates, TEAM_SCOPE
+from .roster import RosterDefaults
+from .holidays import HolidayCalendar
+from .idempotency import IdempotencyKeys
+from .search import IContainsSearchBackend, PostgresTrigramSearchBackend, MySQLFullTextSearchBackend, get_search_backend
+from .sequences import SequenceService, HS_ID_SEQUENCE, format_hs_id, parse_hs_id, get_allocator
 from .forms import (
     ProjectCreateForm, ProjectStatusUpdateForm, ProjectFilterForm,
     ProjectTaskForm, TaskAssignmentForm, TaskAssignmentUpdateForm,
@@ -154,6 +169,66 @@ class ProjectStatusOptionModelTests(TestCase):
         self.assertEqual(names, ['Status 1', 'Status 2', 'Status 3'])
 
 
+class StatusRegistryTests(TestCase):
+    """Test cases for the cached status classification"""
+
+    def setUp(self):
+        StatusRegistry.invalidate()
+        self.pipeline_status = ProjectStatusOption.objects.create(
+            name='In Progress', category_one='Work In Progress', category_two='Pipeline', order=1
+        )
+        self.delivered_status = ProjectStatusOption.objects.create(
+            name='Final Delivery', category_one='Final Delivery', category_two='Final Delivery', order=2
+        )
+        self.dropped_status = ProjectStatusOption.objects.create(
+            name='Opp Dropped', category_one='', category_two='', order=3
+        )
+
+    def test_classification(self):
+        """Test pipeline / delivered / dropped classification"""
+        self.assertEqual(StatusRegistry.classify(self.pipeline_status.id), PIPELINE)
+        self.assertEqual(StatusRegistry.classify(self.delivered_status.id), DELIVERED)
+        self.assertEqual(StatusRegistry.classify(self.dropped_status.id), DROPPED)
+        self.assertEqual(StatusRegistry.classify(None), PIPELINE)
+        self.assertEqual(StatusRegistry.delivered_status_ids(), [self.delivered_status.id])
+        self.assertCountEqual(
+            StatusRegistry.closed_status_ids(),
+            [self.delivered_status.id, self.dropped_status.id]
+        )
+
+    def test_lookups_are_cached(self):
+        """Test that classification doesn't query once loaded"""
+        StatusRegistry.get_classifications()
+        with self.assertNumQueries(0):
+            StatusRegistry.is_delivered(self.delivered_status.id)
+            StatusRegistry.delivered_status_ids()
+
+    def test_status_option_changes_invalidate_cache(self):
+        """Test that saving or deleting a status option refreshes the classification"""
+        self.assertFalse(StatusRegistry.is_delivered(self.pipeline_status.id))
+
+        self.pipeline_status.category_two = 'Final Delivery'
+        self.pipeline_status.save()
+        self.assertTrue(StatusRegistry.is_delivered(self.pipeline_status.id))
+
+        dropped_id = self.dropped_status.id
+        self.dropped_status.delete()
+        self.assertEqual(StatusRegistry.classify(dropped_id), PIPELINE)
+
+    @override_settings(STATUS_REGISTRY_TTL=60)
+    def test_classification_expires_without_invalidation(self):
+        """Test that a process whose cache missed the invalidation reloads after STATUS_REGISTRY_TTL"""
+        StatusRegistry.invalidate()
+        self.assertFalse(StatusRegistry.is_delivered(self.pipeline_status.id))
+
+        # An edit in another process: no signal reaches this process's local-memory cache
+        ProjectStatusOption.objects.filter(pk=self.pipeline_status.pk).update(category_two='Final Delivery')
+        self.assertFalse(StatusRegistry.is_delivered(self.pipeline_status.id))
+
+        with mock.patch('time.time', return_value=time.time() + 61):
+            self.assertTrue(StatusRegistry.is_delivered(self.pipeline_status.id))
+
+
 class ProjectModelTests(TestCase):
     """Test cases for Project model"""
     
@@ -296,6 +371,52 @@ class ProjectModelTests(TestCase):
         self.assertEqual(history_entry.status, self.status)
         self.assertEqual(history_entry.changed_by, self.user)
 
+    def test_status_dates_follow_status_history(self):
+        """Test that latest_status_changed_at and delivered_at track the status history"""
+        delivered_status = ProjectStatusOption.objects.create(
+            name='Delivered',
+            category_one='Delivered',
+            category_two='Final Delivery',
+            order=10
+        )
+        project = Project.objects.create(**self.project_data)
+        created_entry = project.status_history.get()
+        self.assertEqual(project.latest_status_changed_at, created_entry.changed_at)
+        self.assertIsNone(project.delivered_at)
+
+        project.current_status = delivered_status
+        project.save()
+        delivery_entry = project.status_history.get(status=delivered_status)
+        project.refresh_from_db()
+        self.assertEqual(project.latest_status_changed_at, delivery_entry.changed_at)
+        self.assertEqual(project.delivered_at, delivery_entry.changed_at)
+        self.assertEqual(project.delivery_date, delivery_entry.changed_at)
+
+        # Removing the delivery entry rolls both dates back
+        delivery_entry.delete()
+        project.refresh_from_db()
+        self.assertEqual(project.latest_status_changed_at, created_entry.changed_at)
+        self.assertIsNone(project.delivered_at)
+
+    def test_refresh_status_dates_after_bulk_create(self):
+        """Test recomputing status dates after history is bulk created"""
+        project = Project.objects.create(**self.project_data)
+        later = timezone.now() + timedelta(days=3)
+        ProjectStatusHistory.objects.bulk_create([
+            ProjectStatusHistory(
+                project=project,
+                status=self.status,
+                category_one_snapshot='Category 1',
+                category_two_snapshot='Category 2',
+                changed_by=self.user,
+                changed_at=later
+            )
+        ])
+
+        self.assertEqual(Project.refresh_status_dates(), 1)
+        project.refresh_from_db()
+        self.assertEqual(project.latest_status_changed_at, later)
+
 
 class ProjectTaskModelTests(TestCase):
     """Test cases for ProjectTask model"""
@@ -375,6 +496,34 @@ class ProjectTaskModelTests(TestCase):
         self.assertNotEqual(task1.task_id, task2.task_id)
         self.assertTrue(task1.task_id.startswith('TID_'))
         self.assertTrue(task2.task_id.startswith('TID_'))
+
+    def test_task_ids_are_sequential(self):
+        """Test that task IDs come from the task_id sequence"""
+        task1 = ProjectTask.objects.create(**self.task_data)
+        task2 = ProjectTask.objects.create(**self.task_data)
+        self.assertEqual((task1.task_id, task2.task_id), ('TID_00001', 'TID_00002'))
+
+    def test_bulk_create_with_reserved_task_ids(self):
+        """Test allocating a block of task IDs for bulk_create"""
+        ProjectTask.objects.create(**self.task_data)
+        tasks = get_allocator('task_id').assign(
+            ProjectTask(**self.task_data) for _ in range(3)
+        )
+        ProjectTask.objects.bulk_create(tasks)
+
+        self.assertEqual(
+            list(ProjectTask.objects.order_by('task_id').values_list('task_id', flat=True)),
+            ['TID_00001', 'TID_00002', 'TID_00003', 'TID_00004']
+        )
+        self.assertEqual(get_allocator('task_id').peek(), 'TID_00005')
+
+    def test_explicit_task_ids_are_not_reissued(self):
+        """Test that assign() moves the sequence past explicit IDs"""
+        tasks = get_allocator('task_id').assign([
+            ProjectTask(task_id='TID_00010', **self.task_data),
+            ProjectTask(**self.task_data),
+        ])
+        self.assertEqual([task.task_id for task in tasks], ['TID_00010', 'TID_00011'])
     
     def test_get_formatted_time(self):
         """Test get_formatted_time method"""
@@ -464,6 +613,54 @@ class TaskAssignmentModelTests(TestCase):
             'assigned_by': self.dpm
         }
     
+    def test_assignment_ids_are_sequential(self):
+        """Test that assignment IDs come from the assignment_id sequence"""
+        assignment1 = TaskAssignment.objects.create(**self.assignment_data)
+        assignment2 = TaskAssignment.objects.create(**self.assignment_data)
+        self.assertEqual(
+            (assignment1.assignment_id, assignment2.assignment_id),
+            ('ASID_000001', 'ASID_000002')
+        )
+
+    def test_with_work_totals(self):
+        """Test worked minutes, progress and productivity annotations"""
+        worked = TaskAssignment.objects.create(**self.assignment_data)
+        idle = TaskAssignment.objects.create(**self.assignment_data)
+        for days_ago, minutes in enumerate([60, 90]):
+            DailyTimeTotal.objects.create(
+                assignment=worked,
+                team_member=self.team_member,
+                date_worked=date.today() - timedelta(days=days_ago),
+                total_minutes=minutes
+            )
+
+        annotated = {a.pk: a for a in TaskAssignment.objects.with_work_totals()}
+
+        self.assertEqual(annotated[worked.pk].total_worked_minutes, 150)
+        self.assertAlmostEqual(annotated[worked.pk].progress_percentage, 125.0)
+        self.assertAlmostEqual(annotated[worked.pk].productivity, 80.0)
+        self.assertEqual(annotated[idle.pk].total_worked_minutes, 0)
+        self.assertEqual(annotated[idle.pk].progress_percentage, 0)
+        self.assertIsNone(annotated[idle.pk].productivity)
+        self.assertEqual(annotated[worked.pk].get_total_working_hours(), "02:30")
+
+    def test_dashboard_queries_do_not_grow_with_assignments(self):
+        """Test the team member dashboard doesn't query per assignment"""
+        def dashboard_queries():
+            with CaptureQueriesContext(connection) as context:
+                success, data = ProjectService.get_team_member_dashboard_data(self.team_member)
+                list(data['active_assignments'])
+            return len(context.captured_queries)
+
+        self.assignment_data['is_active'] = True
+        TaskAssignment.objects.create(**self.assignment_data)
+        ProjectService.get_or_create_daily_roster(self.team_member, date.today())
+        baseline = dashboard_queries()
+        for _ in range(3):
+            TaskAssignment.objects.create(**self.assignment_data)
+
+        self.assertEqual(dashboard_queries(), baseline)
+
     def test_create_task_assignment(self):
         """Test creating a task assignment"""
         assignment = TaskAssignment.objects.create(**self.assignment_data)
@@ -599,7 +796,87 @@ class ProjectServiceTests(TestCase):
         
         self.assertFalse(success)
         self.assertEqual(error, "Project not found")
-    
+
+    def test_project_list_filters_by_latest_status_date(self):
+        """Test that the pipeline list filters and sorts on the latest status date"""
+        success, older = ProjectService.create_project(self.project_data, self.dpm)
+        self.assertTrue(success)
+        success, newer = ProjectService.create_project(self.project_data, self.dpm)
+        self.assertTrue(success)
+        ProjectStatusHistory.objects.filter(project=older).update(
+            changed_at=timezone.now() - timedelta(days=10)
+        )
+        Project.refresh_status_dates()
+
+        success, (page_obj, _) = ProjectService.get_project_list()
+        self.assertTrue(success)
+        self.assertEqual([p.id for p in page_obj], [newer.id, older.id])
+
+        success, (page_obj, _) = ProjectService.get_project_list(
+            date_from=timezone.localdate() - timedelta(days=1)
+        )
+        self.assertEqual([p.id for p in page_obj], [newer.id])
+    
+    def test_project_list_cursor_pagination(self):
+        """Test walking the project list forwards and backwards with cursors"""
+        projects = []
+        for _ in range(5):
+            success, project = ProjectService.create_project(self.project_data, self.dpm)
+            self.assertTrue(success)
+            projects.append(project)
+        # One project without any status history sorts last
+        Project.objects.filter(pk=projects[0].pk).update(latest_status_changed_at=None)
+        expected = [p.id for p in Project.objects.order_by(
+            F('latest_status_changed_at').desc(nulls_last=True), '-created_at', '-id'
+        )]
+
+        seen, cursors, cursor = [], [], None
+        while True:
+            success, (page_obj, _) = ProjectService.get_project_list(
+                items_per_page=2, pagination='cursor', cursor=cursor
+            )
+            self.assertTrue(success)
+            seen.extend(p.id for p in page_obj)
+            cursors.append(page_obj)
+            if not page_obj.has_next():
+                break
+            cursor = page_obj.next_cursor
+        self.assertEqual(seen, expected)
+        self.assertEqual(cursors[0].paginator.count, 5)
+
+        # Step back from the last page to the one before it
+        success, (previous_page, _) = ProjectService.get_project_list(
+            items_per_page=2, pagination='cursor', cursor=cursors[-1].previous_cursor
+        )
+        self.assertEqual([p.id for p in previous_page], expected[2:4])
+        self.assertTrue(previous_page.has_previous())
+
+    @override_settings(CURSOR_PAGINATION_AFTER_PAGE=2)
+    def test_project_list_switches_to_cursor_after_numbered_pages(self):
+        """Test that numbered pages past the threshold continue in cursor mode"""
+        for _ in range(7):
+            ProjectService.create_project(self.project_data, self.dpm)
+        expected = [p.id for p in Project.objects.order_by(
+            F('latest_status_changed_at').desc(nulls_last=True), '-created_at', '-id'
+        )]
+
+        success, (first_page, _) = ProjectService.get_project_list(items_per_page=2, page=1)
+        self.assertIsNone(first_page.next_cursor)
+        success, (second_page, _) = ProjectService.get_project_list(items_per_page=2, page=2)
+        self.assertIsNotNone(second_page.next_cursor)
+
+        success, (third_page, _) = ProjectService.get_project_list(
+            items_per_page=2, pagination='cursor', cursor=second_page.next_cursor
+        )
+        self.assertEqual([p.id for p in third_page], expected[4:6])
+
+    def test_project_list_ignores_invalid_cursor(self):
+        """Test that a garbled cursor falls back to the first page"""
+        ProjectService.create_project(self.project_data, self.dpm)
+        success, (page_obj, _) = ProjectService.get_project_list(pagination='cursor', cursor='not-a-cursor')
+        self.assertTrue(success)
+        self.assertEqual(len(page_obj), 1)
+
     def test_update_project_status_service(self):
         """Test updating project status through service"""
         # Create project
@@ -656,6 +933,69 @@ class ProjectServiceTests(TestCase):
         self.assertIn("already the current status", error)
 
 
+class ProjectSearchBackendTests(TestCase):
+    """Test cases for the project search backends"""
+
+    def setUp(self):
+        self.dpm = User.objects.create_user(username='searchdpm', password='testpass123', role='DPM')
+        region = Region.objects.create(name='Search Region')
+        self.project_data = {
+            'builder_name': 'Sobha Developers',
+            'city': City.objects.create(name='Search City', region=region),
+            'product': Product.objects.create(name='Search Product', expected_tat=30),
+            'quantity': 1,
+            'purchase_date': date.today(),
+            'sales_confirmation_date': date.today(),
+            'expected_tat': 30,
+            'account_manager': 'Manager',
+            'dpm': self.dpm,
+            'current_status': ProjectStatusOption.objects.create(
+                name='Search Status', category_one='C1', category_two='C2', order=1
+            ),
+        }
+        self.first = Project.objects.create(opportunity_id='OPP-100', project_name='Lake View', **self.project_data)
+        self.second = Project.objects.create(opportunity_id='OPP-200', project_name='Hill Top A1', **self.project_data)
+
+    def test_icontains_backend_matches_all_fields(self):
+        """Test the fallback backend searches name, builder, HS_ID and opportunity ID"""
+        backend = IContainsSearchBackend()
+        self.assertEqual(list(backend.search(Project.objects.all(), 'lake')), [self.first])
+        self.assertEqual(backend.search(Project.objects.all(), 'sobha').count(), 2)
+        self.assertEqual(list(backend.search(Project.objects.all(), 'OPP-2')), [self.second])
+
+    def test_identifier_matches_listed_first(self):
+        """Test that identifier searches list HS_ID / opportunity ID matches first without dropping name matches"""
+        backend = PostgresTrigramSearchBackend()
+        # 'A1' is the first project's HS_ID and also appears in the second's name
+        self.assertEqual(list(backend.search(Project.objects.order_by('-id'), 'a1')), [self.first, self.second])
+        self.assertEqual(list(backend.search(Project.objects.all(), 'OPP-1')), [self.first])
+        # Non-identifier searches use the full text search
+        self.assertEqual(list(backend.search(Project.objects.all(), 'Hill Top')), [self.second])
+
+    def test_mysql_backend_unions_fulltext_and_identifier_matches(self):
+        """Test that the FULLTEXT match and the HS_ID / opportunity ID substring match run as separate SELECTs"""
+        sql = str(MySQLFullTextSearchBackend().text_search(Project.objects.all(), 'view 100').query)
+        fulltext_select, identifier_select = sql.split(' UNION ')
+        self.assertIn('MATCH (U0."project_name", U0."builder_name")', fulltext_select)
+        self.assertNotIn('LIKE', fulltext_select)
+        self.assertIn('U0."hs_id" LIKE', identifier_select)
+        self.assertIn('U0."opportunity_id" LIKE', identifier_select)
+
+    @skipUnless(connection.vendor == 'mysql', 'FULLTEXT indexes are MySQL only')
+    def test_mysql_search_uses_fulltext_index(self):
+        """Test that MySQL answers the MATCH with the FULLTEXT index"""
+        plan = MySQLFullTextSearchBackend().search(Project.objects.all(), 'lake view').explain(format='json')
+        self.assertIn('"access_type": "fulltext"', plan)
+        self.assertIn('"key": "projects_project_search_ft"', plan)
+        self.assertEqual(list(MySQLFullTextSearchBackend().search(Project.objects.all(), 'lake view')), [self.first])
+
+    def test_backend_selection(self):
+        """Test picking the backend by database vendor or setting"""
+        self.assertIsInstance(get_search_backend(), IContainsSearchBackend)
+        with self.settings(PROJECT_SEARCH_BACKEND='projects.search.PostgresTrigramSearchBackend'):
+            self.assertIsInstance(get_search_backend(), PostgresTrigramSearchBackend)
+
+
 class ProjectViewTests(TestCase):
     """Test cases for project views"""
     
@@ -715,6 +1055,15 @@ class ProjectViewTests(TestCase):
         
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Test Project')
+
+    def test_project_list_cursor_pagination(self):
+        """Test the project list in keyset pagination mode"""
+        self.client.login(username='dpm', password='testpass123')
+        response = self.client.get(reverse('projects:project_list'), {'pagination': 'cursor'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['projects'].is_keyset)
+        self.assertContains(response, 'Test Project')
     
     def test_project_detail_requires_login(self):
         """Test that project detail requires login"""
@@ -1084,6 +1433,44 @@ class HolidayModelTests(TestCase):
         self.assertEqual(holiday2.location, 'Mumbai')
 
 
+class HolidayCalendarTests(TestCase):
+    """Test cases for the cached holiday calendar"""
+
+    def setUp(self):
+        for location in ('Gurgaon', 'Mumbai'):
+            self.addCleanup(HolidayCalendar.invalidate, location, 2024)
+            HolidayCalendar.invalidate(location, 2024)
+        self.christmas = Holiday.objects.create(date=date(2024, 12, 25), name='Christmas Day', location='Gurgaon', year=2024)
+        Holiday.objects.create(date=date(2024, 12, 28), name='Saturday Holiday', location='Gurgaon', year=2024)
+        Holiday.objects.create(date=date(2024, 12, 26), name='Mumbai Holiday', location='Mumbai', year=2024)
+
+    def test_year_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(HolidayCalendar.is_holiday(date(2024, 12, 25)))
+            self.assertFalse(HolidayCalendar.is_holiday(date(2024, 12, 26)))
+            self.assertEqual(HolidayCalendar.holidays(date(2024, 12, 1), date(2024, 12, 27)), {date(2024, 12, 25)})
+        with self.assertNumQueries(1):
+            self.assertTrue(HolidayCalendar.is_holiday(date(2024, 12, 26), 'Mumbai'))
+
+    def test_working_days(self):
+        # December 2024: 22 weekdays, Christmas on a Wednesday, the other holiday on a Saturday
+        self.assertEqual(HolidayCalendar.weekdays(date(2024, 12, 1), date(2024, 12, 31)), 22)
+        self.assertEqual(HolidayCalendar.working_days(date(2024, 12, 1), date(2024, 12, 31)), 21)
+        self.assertEqual(HolidayCalendar.working_days(date(2024, 12, 1), date(2024, 12, 31), 'Mumbai'), 21)
+        self.assertEqual(HolidayCalendar.working_days(date(2024, 12, 28), date(2024, 12, 29)), 0)
+
+    def test_saving_or_deleting_a_holiday_refreshes_its_year(self):
+        self.assertTrue(HolidayCalendar.is_holiday(date(2024, 12, 25)))
+
+        self.christmas.date = date(2024, 12, 24)
+        self.christmas.save()
+        self.assertFalse(HolidayCalendar.is_holiday(date(2024, 12, 25)))
+        self.assertTrue(HolidayCalendar.is_holiday(date(2024, 12, 24)))
+
+        self.christmas.delete()
+        self.assertFalse(HolidayCalendar.is_holiday(date(2024, 12, 24)))
+
+
 class ReportingServiceTests(TestCase):
     """Test cases for ReportingService"""
     
@@ -1130,6 +1517,1389 @@ class ReportingServiceTests(TestCase):
         self.assertIn('team_members', overview)
 
 
+class TeamMetricsTests(TestCase):
+    """Test cases for the set-based team metrics"""
+
+    def setUp(self):
+        self.dpm = User.objects.create_user(username='metricsdpm', password='testpass123', role='DPM')
+        self.alice = User.objects.create_user(username='alice', password='testpass123', role='TEAM_MEMBER')
+        self.bob = User.objects.create_user(username='bob', password='testpass123', role='TEAM_MEMBER')
+        region = Region.objects.create(name='Metrics Region')
+        product = Product.objects.create(name='Metrics Product', expected_tat=30)
+        self.project = Project.objects.create(
+            opportunity_id='OPP-M',
+            project_name='Metrics Project',
+            builder_name='Builder',
+            city=City.objects.create(name='Metrics City', region=region),
+            product=product,
+            quantity=1,
+            purchase_date=date.today(),
+            sales_confirmation_date=date.today(),
+            expected_tat=30,
+            account_manager='Manager',
+            dpm=self.dpm,
+            current_status=ProjectStatusOption.objects.create(
+                name='Metrics Status', category_one='C1', category_two='C2', order=1
+            )
+        )
+        self.task = ProjectTask.objects.create(
+            project=self.project,
+            product_task=ProductTask.objects.create(product=product, name='Metrics Task'),
+            task_type='NEW',
+            estimated_time=120,
+            created_by=self.dpm
+        )
+        self.today = date.today()
+        self.start_date = self.today - timedelta(days=6)
+
+        self._completed_assignment(self.alice, projected=120, worked=[90, 30], rating=Decimal('4.0'))
+        self._completed_assignment(self.alice, projected=60, worked=[60], rating=None)
+        self._completed_assignment(self.bob, projected=240, worked=[300], rating=Decimal('3.0'))
+
+        DailyRoster.objects.create(team_member=self.alice, date=self.today, status='PRESENT', misc_hours=30)
+        DailyRoster.objects.create(team_member=self.alice, date=self.today - timedelta(days=1), status='HALF_DAY')
+        DailyRoster.objects.create(team_member=self.bob, date=self.today, status='LEAVE')
+
+        ProjectDelivery.objects.create(
+            project=self.project,
+            project_incharge=self.alice,
+            delivery_date=self.today,
+            delivery_performance_rating=Decimal('5.0'),
+            project_name=self.project.project_name,
+            hs_id=self.project.hs_id,
+            expected_completion_date=self.today,
+            actual_completion_date=self.today
+        )
+
+    def _completed_assignment(self, member, projected, worked, rating):
+        assignment = TaskAssignment.objects.create(
+            task=self.task,
+            assigned_to=member,
+            projected_hours=projected,
+            sub_task='Work',
+            rework_type='NEW',
+            expected_delivery_date=timezone.now() + timedelta(days=1),
+            assigned_by=self.dpm,
+            is_completed=True,
+            completion_date=timezone.now(),
+            quality_rating=rating
+        )
+        for days_ago, minutes in enumerate(worked):
+            DailyTimeTotal.objects.create(
+                assignment=assignment,
+                team_member=member,
+                date_worked=self.today - timedelta(days=days_ago),
+                total_minutes=minutes
+            )
+        return assignment
+
+    def test_metrics_values(self):
+        """Test the computed metrics for one team member"""
+        metrics = ReportingService.get_team_member_metrics(self.alice, self.start_date, self.today)
+
+        self.assertEqual(metrics['productivity']['score'], 100.0)
+        self.assertEqual(metrics['productivity']['projected_hours'], 3.0)
+        self.assertEqual(metrics['utilization']['worked_minutes'], 180)
+        self.assertEqual(metrics['utilization']['available_minutes'], 960)
+        self.assertEqual(metrics['efficiency']['available_minutes'], 720)
+        self.assertEqual(metrics['efficiency']['total_work_minutes'], 210)
+        self.assertEqual(metrics['quality']['average_rating'], 4.0)
+        self.assertEqual(metrics['quality']['total_assignments'], 2)
+        self.assertEqual(metrics['quality']['rated_assignments'], 1)
+        self.assertEqual(metrics['delivery']['total_projects'], 1)
+        self.assertEqual(metrics['delivery']['on_time_rate'], 100.0)
+        self.assertEqual(metrics['delivery']['average_rating'], 5.0)
+
+    def test_team_overview_uses_fixed_queries(self):
+        """Test that the overview query count doesn't grow with the team"""
+        with self.assertNumQueries(6):
+            overview = ReportingService.get_team_overview(self.start_date, self.today)
+
+        self.assertEqual([row['team_member'] for row in overview], [self.alice, self.bob])
+        bob_metrics = overview[1]['metrics']
+        self.assertEqual(bob_metrics['productivity']['score'], 80.0)
+        self.assertEqual(bob_metrics['optimization']['saved_hours'], -1.0)
+        self.assertIsNone(bob_metrics['efficiency']['score'])
+        self.assertIsNone(bob_metrics['delivery']['on_time_rate'])
+
+
+@override_settings(REPORTING_ROLLUP_ENABLED=True, REPORTING_ROLLUP_MIN_DAYS=1)
+class DailyMemberRollupTests(TeamMetricsTests):
+    """
+    Test cases for the DailyMemberStats reporting rollup. Inherits the team
+    metrics tests so the same numbers are checked against the rollup, which
+    setUp's writes maintain incrementally.
+    """
+
+    def test_team_overview_uses_fixed_queries(self):
+        """Test that the overview reads only users, the rollup and deliveries"""
+        with self.assertNumQueries(3):
+            overview = ReportingService.get_team_overview(self.start_date, self.today)
+
+        bob_metrics = overview[1]['metrics']
+        self.assertEqual(bob_metrics['productivity']['score'], 80.0)
+        self.assertEqual(bob_metrics['utilization']['available_minutes'], 480)
+
+    def test_rows_maintained_incrementally(self):
+        """Test the rollup row written by the setUp writes"""
+        stats = DailyMemberStats.objects.get(team_member=self.alice, date=self.today)
+
+        self.assertEqual(stats.assignment_minutes, 150)
+        self.assertEqual(stats.misc_minutes, 30)
+        self.assertEqual(stats.roster_status, 'PRESENT')
+        self.assertEqual(stats.completed_assignments, 2)
+        self.assertEqual(stats.projected_minutes, 180)
+        self.assertEqual(stats.completed_worked_minutes, 180)
+        self.assertEqual(stats.rated_assignments, 1)
+        self.assertEqual(stats.rating_total, Decimal('4.0'))
+
+    def test_manual_time_updates_row(self):
+        """Test that the upsert path in _update_daily_total refreshes the rollup"""
+        assignment = self._completed_assignment(self.bob, projected=30, worked=[20], rating=None)
+
+        success, _ = ProjectService.add_manual_time(
+            assignment.id, self.bob, self.today, 0, 15, reason='FORGOT_TIMER'
+        )
+
+        self.assertTrue(success)
+        stats = DailyMemberStats.objects.get(team_member=self.bob, date=self.today)
+        self.assertEqual(stats.assignment_minutes, 335)
+        self.assertEqual(stats.completed_worked_minutes, 335)
+
+    def test_uncompleting_assignment_clears_completion_day(self):
+        """Test that reopening an assignment removes it from its old completion day"""
+        assignment = TaskAssignment.objects.filter(assigned_to=self.bob).get()
+        assignment.is_completed = False
+        assignment.completion_date = None
+        assignment.save()
+
+        stats = DailyMemberStats.objects.get(team_member=self.bob, date=self.today)
+        self.assertEqual(stats.completed_assignments, 0)
+        self.assertEqual(stats.projected_minutes, 0)
+        self.assertEqual(stats.assignment_minutes, 300)
+
+    def test_reconcile_command_repairs_rows(self):
+        """Test that the reconcile command rebuilds drifted and stale rows"""
+        DailyMemberStats.objects.filter(team_member=self.alice, date=self.today).update(assignment_minutes=0)
+        stale = DailyMemberStats.objects.create(team_member=self.bob, date=self.start_date, assignment_minutes=99)
+
+        call_command('reconcile_daily_member_stats', days=7, stdout=StringIO())
+
+        stats = DailyMemberStats.objects.get(team_member=self.alice, date=self.today)
+        self.assertEqual(stats.assignment_minutes, 150)
+        self.assertFalse(DailyMemberStats.objects.filter(pk=stale.pk).exists())
+
+    def test_disabled_rollup_is_not_maintained(self):
+        """Test that nothing is written while the rollup is off"""
+        with self.settings(REPORTING_ROLLUP_ENABLED=False):
+            DailyRoster.objects.create(team_member=self.bob, date=self.start_date, status='PRESENT')
+
+        self.assertFalse(DailyMemberStats.objects.filter(team_member=self.bob, date=self.start_date).exists())
+
+
+class AssignmentWorkloadTests(TestCase):
+    """Test cases for the assignment workload graph aggregation"""
+
+    def setUp(self):
+        self.client = Client()
+        self.dpm = User.objects.create_user(username='graphdpm', password='testpass123', role='DPM')
+        self.alice = User.objects.create_user(
+            username='graphalice', password='testpass123', role='TEAM_MEMBER', first_name='Alice', last_name='Rao'
+        )
+        self.bob = User.objects.create_user(username='graphbob', password='testpass123', role='TEAM_MEMBER')
+        region = Region.objects.create(name='Graph Region')
+        product = Product.objects.create(name='Graph Product', expected_tat=30)
+        project = Project.objects.create(
+            opportunity_id='OPP-G',
+            project_name='Graph Project',
+            builder_name='Builder',
+            city=City.objects.create(name='Graph City', region=region),
+            product=product,
+            quantity=1,
+            purchase_date=date.today(),
+            sales_confirmation_date=date.today(),
+            expected_tat=30,
+            account_manager='Manager',
+            dpm=self.dpm,
+            current_status=ProjectStatusOption.objects.create(
+                name='Graph Status', category_one='C1', category_two='C2', order=1
+            )
+        )
+        self.task = ProjectTask.objects.create(
+            project=project,
+            product_task=ProductTask.objects.create(product=product, name='Graph Task'),
+            task_type='NEW',
+            estimated_time=120,
+            created_by=self.dpm
+        )
+
+    def _assignment(self, member, projected, worked):
+        assignment = TaskAssignment.objects.create(
+            task=self.task,
+            assigned_to=member,
+            projected_hours=projected,
+            sub_task='Work',
+            rework_type='NEW',
+            expected_delivery_date=timezone.now() + timedelta(days=1),
+            assigned_by=self.dpm
+        )
+        for days_ago, minutes in enumerate(worked):
+            DailyTimeTotal.objects.create(
+                assignment=assignment,
+                team_member=member,
+                date_worked=date.today() - timedelta(days=days_ago),
+                total_minutes=minutes
+            )
+        return assignment
+
+    def test_workload_aggregated_per_member(self):
+        """Test projected and worked hours are summed per team member"""
+        self._assignment(self.alice, projected=120, worked=[30, 30])
+        self._assignment(self.alice, projected=180, worked=[])
+        self._assignment(self.bob, projected=60, worked=[90])
+
+        success, chart_data = ProjectService.get_assignment_workload()
+
+        self.assertTrue(success)
+        self.assertEqual(chart_data['labels'], ['Alice Rao', 'graphbob'])
+        self.assertEqual(chart_data['hours'], [5.0, 1.0])
+        self.assertEqual(chart_data['worked_hours'], [1.0, 1.5])
+        self.assertEqual(chart_data['remaining_hours'], [4.0, 0])
+        self.assertEqual(chart_data['assignments'], [2, 1])
+        self.assertEqual(chart_data['total_assignments'], 3)
+        self.assertEqual(chart_data['avg_hours_per_member'], 3.0)
+
+    def test_workload_queries_do_not_grow_with_assignments(self):
+        """Test the graph aggregation runs a fixed number of queries"""
+        for _ in range(5):
+            self._assignment(self.alice, projected=60, worked=[15, 15])
+
+        with self.assertNumQueries(2):
+            success, chart_data = ProjectService.get_assignment_workload(assignment_status='all')
+
+        self.assertTrue(success)
+        self.assertEqual(chart_data['worked_hours'], [2.5])
+
+    def test_graph_view_chart_data(self):
+        """Test the AJAX chart data response of the graph view"""
+        self._assignment(self.bob, projected=60, worked=[30])
+        self.client.login(username='graphdpm', password='testpass123')
+
+        response = self.client.post(
+            reverse('projects:assignment_graph_view'),
+            {'get_chart_data': '1', 'assignment_status': 'active'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['worked_hours'], [0.5])
+
+        response = self.client.get(reverse('projects:assignment_graph_view'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.context['initial_chart_data'])['hours'], [1.0])
+
+    def test_overview_shows_timer_usage(self):
+        """Test that the assignments overview shows every row's timer usage"""
+        assignment = self._assignment(self.bob, projected=60, worked=[])
+        start = timezone.now() - timedelta(hours=2)
+        for session_type in ('TIMER', 'MANUAL'):
+            TimeSession.objects.create(
+                assignment=assignment, team_member=self.bob, started_at=start,
+                ended_at=start + timedelta(minutes=30), duration_minutes=30,
+                date_worked=date.today(), session_type=session_type
+            )
+        self.client.login(username='graphdpm', password='testpass123')
+
+        response = self.client.get(reverse('projects:dpm_assignments_overview'), {'assignment_status': 'active'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['assignments'][0].timer_usage['percentage'], 50.0)
+        self.assertContains(response, '50.0%')
+
+
+class TimerFixturesMixin:
+    """A team member with one active assignment, for the timer tests"""
+
+    def setUp(self):
+        self.dpm = User.objects.create_user(username='timerdpm', password='testpass123', role='DPM')
+        self.member = User.objects.create_user(username='timermember', password='testpass123', role='TEAM_MEMBER')
+        region = Region.objects.create(name='Timer Region')
+        product = Product.objects.create(name='Timer Product', expected_tat=30)
+        project = Project.objects.create(
+            opportunity_id='OPP-T',
+            project_name='Timer Project',
+            builder_name='Builder',
+            city=City.objects.create(name='Timer City', region=region),
+            product=product,
+            quantity=1,
+            purchase_date=date.today(),
+            sales_confirmation_date=date.today(),
+            expected_tat=30,
+            account_manager='Manager',
+            dpm=self.dpm,
+            current_status=ProjectStatusOption.objects.create(
+                name='Timer Status', category_one='C1', category_two='C2', order=1
+            )
+        )
+        task = ProjectTask.objects.create(
+            project=project,
+            product_task=ProductTask.objects.create(product=product, name='Timer Task'),
+            task_type='NEW',
+            estimated_time=120,
+            created_by=self.dpm
+        )
+        self.assignment = TaskAssignment.objects.create(
+            task=task,
+            assigned_to=self.member,
+            projected_hours=120,
+            sub_task='Work',
+            rework_type='NEW',
+            expected_delivery_date=timezone.now() + timedelta(days=1),
+            assigned_by=self.dpm,
+            is_active=True
+        )
+
+    def _backdate_timer(self, minutes=None, started_at=None):
+        """Pretend the running timer was started `minutes` ago (or at `started_at`)."""
+        timers = get_timer_backend()
+        timer = timers.get(self.member)
+        timer.started_at = started_at or timezone.now() - timedelta(minutes=minutes)
+        ActiveTimer.objects.filter(pk=timer.pk).update(started_at=timer.started_at)
+        if isinstance(timers, CacheTimerBackend):
+            timers.prime(timer)
+
+
+class TimerServiceTests(TimerFixturesMixin, TestCase):
+    """Test cases for starting and stopping timers with the default (database) timer backend"""
+
+    def test_only_one_timer_per_member(self):
+        """Test that a second timer can't be started while one is running"""
+        success, timer = ProjectService.start_timer(self.assignment.id, self.member)
+        self.assertTrue(success)
+
+        success, message = ProjectService.start_timer(self.assignment.id, self.member)
+        self.assertFalse(success)
+        self.assertIn(self.assignment.assignment_id, message)
+        self.assertEqual(ActiveTimer.objects.filter(team_member=self.member).count(), 1)
+
+    def test_stop_persists_session(self):
+        """Test that stopping records the session and daily total and clears the timer"""
+        ProjectService.start_timer(self.assignment.id, self.member)
+        self._backdate_timer(30)
+
+        success, sessions = ProjectService.stop_timer(self.member, 'Done')
+
+        self.assertTrue(success)
+        self.assertEqual([session.duration_minutes for session in sessions], [30])
+        self.assertEqual(DailyTimeTotal.objects.get(assignment=self.assignment).total_minutes, 30)
+        self.assertFalse(ActiveTimer.objects.filter(team_member=self.member).exists())
+        self.assertIsNone(get_timer_backend().get(self.member))
+
+        success, message = ProjectService.stop_timer(self.member)
+        self.assertFalse(success)
+
+    def test_short_stop_keeps_timer_running(self):
+        """Test that a stop under a minute is refused and leaves the timer running"""
+        ProjectService.start_timer(self.assignment.id, self.member)
+
+        success, message = ProjectService.stop_timer(self.member)
+
+        self.assertFalse(success)
+        self.assertIsNotNone(get_timer_backend().get(self.member))
+        self.assertTrue(ActiveTimer.objects.filter(team_member=self.member).exists())
+
+    def test_audit_log_written_on_commit(self):
+        """Test that timer audit entries are written when the transaction commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectService.start_timer(self.assignment.id, self.member)
+            self.assertFalse(TimerActionLog.objects.exists())
+
+        self.assertEqual(list(TimerActionLog.objects.values_list('action', flat=True)), ['START'])
+
+    def test_audit_log_batched_into_one_insert(self):
+        """Test that a transaction's audit entries are written with a single query"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                for action in ('START', 'STOP', 'COMPLETE'):
+                    TimerAuditLog.record(self.assignment, self.member, action)
+
+        with self.assertNumQueries(1):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(TimerActionLog.objects.count(), 3)
+
+    def test_audit_log_dropped_on_rollback(self):
+        """Test that entries from a rolled back transaction are never written"""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    TimerAuditLog.record(self.assignment, self.member, 'START', 'rolled back')
+                    raise IntegrityError('rollback')
+            except IntegrityError:
+                pass
+            with transaction.atomic():
+                TimerAuditLog.record(self.assignment, self.member, 'STOP', 'committed')
+
+        self.assertEqual(list(TimerActionLog.objects.values_list('details', flat=True)), ['committed'])
+
+    def test_audit_log_dropped_on_savepoint_rollback(self):
+        """Test that entries from a rolled back nested atomic block are dropped when the outer one commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                TimerAuditLog.record(self.assignment, self.member, 'START', 'outer')
+                with transaction.atomic():
+                    TimerAuditLog.record(self.assignment, self.member, 'STOP', 'released savepoint')
+                try:
+                    with transaction.atomic():
+                        TimerAuditLog.record(self.assignment, self.member, 'COMPLETE', 'rolled back')
+                        raise IntegrityError('rollback')
+                except IntegrityError:
+                    pass
+
+        self.assertCountEqual(
+            TimerActionLog.objects.values_list('details', flat=True),
+            ['outer', 'released savepoint']
+        )
+
+    def test_audit_log_sync_setting(self):
+        """Test that TIMER_AUDIT_LOG_SYNC writes entries immediately"""
+        with self.settings(TIMER_AUDIT_LOG_SYNC=True):
+            TimerAuditLog.record(self.assignment, self.member, 'START')
+
+        self.assertEqual(TimerActionLog.objects.count(), 1)
+
+    def test_stop_splits_session_at_local_midnight(self):
+        """Test that a timer running past midnight is recorded on each local day"""
+        now = timezone.localtime()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        ProjectService.start_timer(self.assignment.id, self.member)
+        self._backdate_timer(started_at=midnight - timedelta(minutes=90))
+
+        success, sessions = ProjectService.stop_timer(self.member, 'Overnight')
+
+        self.assertTrue(success)
+        totals = dict(DailyTimeTotal.objects.filter(assignment=self.assignment).values_list('date_worked', 'total_minutes'))
+        self.assertEqual(set(totals), {midnight.date() - timedelta(days=1), midnight.date()})
+        self.assertEqual(totals[midnight.date() - timedelta(days=1)], 90)
+        self.assertEqual([session.date_worked for session in sessions], [midnight.date() - timedelta(days=1), midnight.date()])
+        self.assertEqual(sessions[-1].started_at, midnight)
+        self.assertEqual(TimeSession.objects.filter(assignment=self.assignment).count(), 2)
+
+    def test_split_minutes_add_up(self):
+        """Test that split segments add up to the whole run's minutes"""
+        tz = timezone.get_current_timezone()
+        start = timezone.make_aware(datetime(2025, 3, 1, 23, 59, 30), tz)
+        end = timezone.make_aware(datetime(2025, 3, 3, 0, 0, 50), tz)
+
+        segments = ProjectService._split_at_midnight(start, end)
+
+        self.assertEqual([segment[0] for segment in segments], [date(2025, 3, 2), date(2025, 3, 3)])
+        self.assertEqual(sum(segment[3] for segment in segments), int((end - start).total_seconds() // 60))
+
+    def test_stale_timers_stopped_at_cap(self):
+        """Test that the sweeper stops timers past the cap and records only the capped time"""
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectService.start_timer(self.assignment.id, self.member)
+        self._backdate_timer(30 * 60)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            success, stopped = ProjectService.stop_stale_timers(max_hours=12)
+
+        self.assertTrue(success)
+        self.assertEqual(len(stopped), 1)
+        self.assertFalse(ActiveTimer.objects.exists())
+        self.assertIsNone(get_timer_backend().get(self.member))
+        self.assertEqual(
+            TimeSession.objects.filter(assignment=self.assignment).aggregate(total=Sum('duration_minutes'))['total'],
+            12 * 60
+        )
+        self.assertIn('Auto-stopped', TimerActionLog.objects.get(action='STOP').details)
+
+    def test_stale_timer_sweep_leaves_recent_timers(self):
+        """Test that timers under the cap keep running, and dry runs change nothing"""
+        ProjectService.start_timer(self.assignment.id, self.member)
+        self._backdate_timer(60)
+
+        success, stopped = ProjectService.stop_stale_timers(max_hours=12)
+        self.assertEqual(stopped, [])
+
+        out = StringIO()
+        call_command('stop_stale_timers', '--max-hours=0', '--dry-run', stdout=out)
+        self.assertIn('1 timers', out.getvalue())
+        self.assertTrue(ActiveTimer.objects.exists())
+        self.assertIsNotNone(get_timer_backend().get(self.member))
+
+
+    def test_timer_usage_splits_edited_sessions(self):
+        """Test the timer/manual split, including sessions edited up and down, in one query"""
+        start = timezone.now() - timedelta(hours=5)
+        for recorded, final, edited, session_type in [
+            (60, 60, False, 'TIMER'),
+            (75, 60, True, 'TIMER'),   # edited down: 60 timer
+            (60, 75, True, 'TIMER'),   # edited up: 60 timer + 15 manual
+            (30, 30, False, 'MANUAL'),
+        ]:
+            TimeSession.objects.create(
+                assignment=self.assignment, team_member=self.member, started_at=start,
+                ended_at=start + timedelta(minutes=recorded, seconds=30), duration_minutes=final,
+                date_worked=date.today(), session_type=session_type, is_edited=edited
+            )
+        other = TaskAssignment.objects.create(
+            task=self.assignment.task, assigned_to=self.member, projected_hours=60, sub_task='Other',
+            rework_type='NEW', expected_delivery_date=timezone.now() + timedelta(days=1), assigned_by=self.dpm
+        )
+
+        with self.assertNumQueries(1):
+            usage = ProjectService.get_timer_usage([self.assignment.id, other.id])
+
+        self.assertEqual(usage, {
+            self.assignment.id: {'timer_minutes': 180, 'manual_minutes': 45, 'percentage': 80.0}
+        })
+        self.assertEqual(ProjectService._calculate_timer_usage_percentage(self.assignment, self.member), 80.0)
+        self.assertEqual(ProjectService._calculate_timer_usage_percentage(other, self.member), 0.0)
+
+@override_settings(ACTIVE_TIMER_BACKEND='projects.timers.LocalMemoryTimerBackend')
+class CacheTimerServiceTests(TimerServiceTests):
+    """Test cases for the cache-backed timer backend (runs the database backend tests too)"""
+
+    def setUp(self):
+        super().setUp()
+        get_timer_backend().cache.clear()
+
+    def test_dashboard_reads_timer_from_cache(self):
+        """Test that the dashboard gets the running timer without querying ActiveTimer"""
+        ProjectService.start_timer(self.assignment.id, self.member)
+        ProjectService.get_or_create_daily_roster(self.member, date.today())
+
+        with CaptureQueriesContext(connection) as context:
+            success, data = ProjectService.get_team_member_dashboard_data(self.member)
+
+        self.assertTrue(success)
+        self.assertEqual(data['active_timer'].assignment, self.assignment)
+        self.assertFalse(any('projects_activetimer' in query['sql'] for query in context.captured_queries))
+
+    def test_recover_after_cache_loss(self):
+        """Test that the recovery command restores timers from the ActiveTimer rows"""
+        ProjectService.start_timer(self.assignment.id, self.member)
+        timers = get_timer_backend()
+        timers.cache.clear()
+        self.assertIsNone(timers.get(self.member))
+
+        call_command('recover_active_timers', stdout=StringIO())
+
+        self.assertEqual(timers.get(self.member).assignment_id, self.assignment.id)
+
+    def test_stop_after_cache_loss(self):
+        """Test that a timer missing from the cache can still be stopped"""
+        ProjectService.start_timer(self.assignment.id, self.member)
+        ActiveTimer.objects.update(started_at=timezone.now() - timedelta(minutes=5))
+        get_timer_backend().cache.clear()
+
+        success, sessions = ProjectService.stop_timer(self.member)
+
+        self.assertTrue(success)
+        self.assertEqual(sessions[0].duration_minutes, 5)
+        self.assertFalse(ActiveTimer.objects.exists())
+
+    def test_recover_clears_uncommitted_start(self):
+        """Test that a cached timer without an ActiveTimer row is cleared"""
+        ProjectService.start_timer(self.assignment.id, self.member)
+        ActiveTimer.objects.all().delete()
+
+        restored, cleared = recover_active_timers()
+
+        self.assertEqual((restored, cleared), (0, 1))
+        self.assertIsNone(get_timer_backend().get(self.member))
+
+
+class TimeLedgerFixturesMixin:
+    """A team member with an assignment to log time on yesterday, for the time ledger tests"""
+
+    def setUp(self):
+        self.dpm = User.objects.create_user(username='ledgerdpm', password='testpass123', role='DPM')
+        self.member = User.objects.create_user(username='ledgermember', password='testpass123', role='TEAM_MEMBER')
+        region = Region.objects.create(name='Ledger Region')
+        product = Product.objects.create(name='Ledger Product', expected_tat=30)
+        project = Project.objects.create(
+            opportunity_id='OPP-L',
+            project_name='Ledger Project',
+            builder_name='Builder',
+            city=City.objects.create(name='Ledger City', region=region),
+            product=product,
+            quantity=1,
+            purchase_date=date.today(),
+            sales_confirmation_date=date.today(),
+            expected_tat=30,
+            account_manager='Manager',
+            dpm=self.dpm,
+            current_status=ProjectStatusOption.objects.create(
+                name='Ledger Status', category_one='C1', category_two='C2', order=1
+            )
+        )
+        task = ProjectTask.objects.create(
+            project=project,
+            product_task=ProductTask.objects.create(product=product, name='Ledger Task'),
+            task_type='NEW',
+            estimated_time=120,
+            created_by=self.dpm
+        )
+        self.assignment = TaskAssignment.objects.create(
+            task=task,
+            assigned_to=self.member,
+            projected_hours=120,
+            sub_task='Work',
+            rework_type='NEW',
+            expected_delivery_date=timezone.now() + timedelta(days=1),
+            assigned_by=self.dpm,
+            is_active=True
+        )
+        self.day = date.today() - timedelta(days=1)
+
+    def _add_time(self, minutes):
+        success, session = ProjectService.add_manual_time(
+            self.assignment.id, self.member, self.day, 0, minutes, reason='OFFLINE_WORK'
+        )
+        self.assertTrue(success, session)
+        return session
+
+    def _total(self):
+        return DailyTimeTotal.objects.filter(assignment=self.assignment, date_worked=self.day).first()
+
+
+class TimeLedgerTests(TimeLedgerFixturesMixin, TestCase):
+    """Test cases for the time ledger and the DailyTimeTotal projection"""
+
+    def test_writes_append_ledger_entries(self):
+        """Test that adding and editing time appends entries summing to the daily total"""
+        self._add_time(30)
+        session = self._add_time(45)
+        TimeSession.objects.filter(pk=session.pk).update(session_type='TIMER')
+
+        success, session = ProjectService.edit_session_duration(session.id, self.member, 20)
+
+        self.assertTrue(success)
+        self.assertEqual(
+            list(TimeLedgerEntry.objects.values_list('event_type', 'minutes_delta')),
+            [('SESSION_CREATED', 30), ('SESSION_CREATED', 45), ('DURATION_EDITED', -25)]
+        )
+        self.assertEqual(self._total().total_minutes, 50)
+        self.assertEqual(TimeLedger.verify(), {'missing_events': {}, 'stale_totals': {}})
+
+    def test_manually_edited_total_follows_ledger(self):
+        """Test that new time on a manually edited total recalculates it from the ledger"""
+        self._add_time(30)
+        DailyTimeTotal.objects.update(total_minutes=999, is_manually_edited=True)
+
+        self._add_time(15)
+
+        total = self._total()
+        self.assertEqual(total.total_minutes, 45)
+        self.assertFalse(total.is_manually_edited)
+
+    def test_rebuild_replaces_drifted_totals(self):
+        """Test that a rebuild rewrites drifted totals and drops totals without entries"""
+        self._add_time(30)
+        DailyTimeTotal.objects.update(total_minutes=999, is_manually_edited=True)
+        DailyTimeTotal.objects.create(
+            assignment=self.assignment, team_member=self.member, date_worked=self.day - timedelta(days=1), total_minutes=10
+        )
+
+        self.assertEqual(len(TimeLedger.verify()['stale_totals']), 2)
+        written, deleted = TimeLedger.rebuild(start_date=self.day - timedelta(days=7), member_ids=[self.member.id])
+
+        self.assertEqual((written, deleted), (1, 1))
+        self.assertEqual(list(DailyTimeTotal.objects.values_list('total_minutes', flat=True)), [30])
+
+    def test_session_deletion_is_recorded(self):
+        """Test that deleting a session appends a SESSION_DELETED entry and updates the total"""
+        self._add_time(30)
+        self._add_time(45).delete()
+
+        self.assertEqual(TimeLedgerEntry.objects.filter(event_type='SESSION_DELETED').get().minutes_delta, -45)
+        self.assertEqual(self._total().total_minutes, 30)
+
+    def test_verify_command_fixes_sessions_written_around_the_ledger(self):
+        """Test that verify_time_ledger --fix reconciles the ledger with the sessions"""
+        self._add_time(30)
+        now = timezone.now()
+        TimeSession.objects.create(
+            assignment=self.assignment, team_member=self.member, started_at=now, ended_at=now,
+            duration_minutes=15, date_worked=self.day, session_type='MANUAL'
+        )
+
+        out = StringIO()
+        call_command('verify_time_ledger', '--fix', stdout=out)
+
+        self.assertIn('Ledger differs from sessions: 1', out.getvalue())
+        self.assertEqual(TimeLedgerEntry.objects.get(event_type='RECONCILED').minutes_delta, 15)
+        self.assertEqual(self._total().total_minutes, 45)
+        self.assertEqual(TimeLedger.verify(), {'missing_events': {}, 'stale_totals': {}})
+
+    def test_daily_totals_upserted_in_one_statement(self):
+        """Test that new and existing daily totals are updated with a single upsert"""
+        self._add_time(30)
+        other_day = self.day - timedelta(days=1)
+
+        with self.assertNumQueries(1):
+            TimeLedger.add_to_totals({
+                (self.assignment.id, self.member.id, self.day): 15,
+                (self.assignment.id, self.member.id, other_day): 20,
+            })
+
+        totals = dict(DailyTimeTotal.objects.values_list('date_worked', 'total_minutes'))
+        self.assertEqual(totals, {self.day: 45, other_day: 20})
+
+    def test_admin_cannot_change_logged_time(self):
+        """Test that the admin can't change a session's time behind the ledger's back"""
+        session = self._add_time(30)
+        User.objects.create_superuser(username='ledgeradmin', password='testpass123', role='DPM')
+        self.client.login(username='ledgeradmin', password='testpass123')
+
+        response = self.client.get(reverse('admin:projects_timesession_change', args=[session.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'name="duration_minutes"')
+        self.assertNotContains(response, 'name="date_worked"')
+        self.assertEqual(self.client.get(reverse('admin:projects_timesession_add')).status_code, 403)
+
+    def test_bulk_manual_time(self):
+        """Test that a multi-day backfill is saved with one session insert and grouped totals"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_time(30)
+        entries = [
+            {'assignment_id': self.assignment.id, 'date_worked': self.day - timedelta(days=offset),
+             'minutes': 60, 'reason': 'OFFLINE_WORK', 'description': 'Offline'}
+            for offset in range(5)
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            success, sessions = ProjectService.add_manual_time_bulk(self.member, entries)
+
+        self.assertTrue(success, sessions)
+        self.assertEqual(len(sessions), 5)
+        self.assertEqual(self._total().total_minutes, 90)
+        self.assertEqual(DailyTimeTotal.objects.count(), 5)
+        self.assertEqual(TimerActionLog.objects.filter(action='MANUAL_ADD').count(), 6)
+        self.assertEqual(TimeLedger.verify(), {'missing_events': {}, 'stale_totals': {}})
+
+    def test_bulk_manual_time_validates_all_rows(self):
+        """Test that one invalid row rejects the whole batch and every problem is reported"""
+        other = User.objects.create_user(username='ledgerother', password='testpass123', role='TEAM_MEMBER')
+        entries = [
+            {'assignment_id': self.assignment.id, 'date_worked': self.day, 'minutes': 900, 'reason': 'OFFLINE_WORK'},
+            {'assignment_id': self.assignment.id, 'date_worked': self.day, 'minutes': 0, 'reason': 'OFFLINE_WORK'},
+            {'assignment_id': self.assignment.id, 'date_worked': date.today() + timedelta(days=1), 'minutes': 30, 'reason': ''},
+        ]
+
+        success, message = ProjectService.add_manual_time_bulk(self.member, entries)
+        self.assertFalse(success)
+        self.assertIn('Row 3: Work date cannot be in the future.', message)
+        self.assertIn('Row 3: A reason is required', message)
+        self.assertIn('Row 2: Duration must be greater than 0 minutes.', message)
+        self.assertNotIn('Row 1', message)
+
+        success, message = ProjectService.add_manual_time_bulk(other, entries[:1])
+        self.assertFalse(success)
+        self.assertIn('assigned to you', message)
+        self.assertFalse(TimeSession.objects.exists())
+
+    def test_bulk_manual_time_from_dashboard(self):
+        """Test posting the bulk time formset on the team member dashboard"""
+        client = Client()
+        client.login(username='ledgermember', password='testpass123')
+        data = {
+            'add_time_bulk': '1',
+            'bulk-TOTAL_FORMS': '2',
+            'bulk-INITIAL_FORMS': '0',
+            'bulk-MIN_NUM_FORMS': '1',
+            'bulk-MAX_NUM_FORMS': '31',
+        }
+        for row, offset in enumerate((1, 2)):
+            data.update({
+                f'bulk-{row}-assignment': str(self.assignment.id),
+                f'bulk-{row}-date': (self.day - timedelta(days=offset)).isoformat(),
+                f'bulk-{row}-duration_hours': '2',
+                f'bulk-{row}-duration_minutes': '0',
+                f'bulk-{row}-reason': 'OFFLINE_WORK',
+                f'bulk-{row}-description': '',
+            })
+
+        self.assertContains(client.get(reverse('projects:team_member_dashboard')), 'id="bulkTimeModal"')
+        response = client.post(reverse('projects:team_member_dashboard'), data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            TimeSession.objects.filter(team_member=self.member).aggregate(total=Sum('duration_minutes'))['total'],
+            240
+        )
+
+
+class DailyRosterHoursTests(TimeLedgerFixturesMixin, TestCase):
+    """Test cases for DailyRoster's worked hours properties"""
+
+    def _roster(self):
+        self._add_time(30)
+        MiscHours.objects.create(team_member=self.member, date=self.day, activity='Meeting', duration_minutes=20)
+        return DailyRoster.objects.create(team_member=self.member, date=self.day, misc_hours=10)
+
+    def test_with_hours_annotates_in_one_query(self):
+        self._roster()
+
+        with self.assertNumQueries(1):
+            roster = DailyRoster.objects.with_hours().get(team_member=self.member, date=self.day)
+            self.assertEqual(roster.assignment_hours, 30)
+            self.assertEqual(roster.misc_hours_new, 20)
+            self.assertEqual(roster.total_hours, 60)
+            self.assertEqual(roster.get_total_hours_formatted(), '01:00')
+            self.assertEqual(roster.get_assignment_hours_formatted(), '00:30')
+
+    def test_properties_use_cached_values_or_query(self):
+        roster = DailyRoster.objects.get(pk=self._roster().pk)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(roster.total_hours, 60)
+
+        roster._cached_assignment_hours = 45
+        roster._cached_misc_hours_new = 0
+        roster._cached_total_hours = 55
+        with self.assertNumQueries(0):
+            self.assertEqual(roster.assignment_hours, 45)
+            self.assertEqual(roster.get_total_hours_formatted(), '00:55')
+
+
+class TeamRosterSummaryTests(TimeLedgerFixturesMixin, TestCase):
+    """Test cases for the team-wide monthly roster summary"""
+
+    def test_summaries_for_all_members_in_three_queries(self):
+        other = User.objects.create_user(username='rosterother', password='testpass123', role='TEAM_MEMBER')
+        self._add_time(90)
+        DailyRoster.objects.create(team_member=self.member, date=self.day, status='PRESENT', misc_hours=15)
+        MiscHours.objects.create(team_member=self.member, date=self.day, activity='Meeting', duration_minutes=15)
+        DailyRoster.objects.create(team_member=other, date=self.day, status='LEAVE')
+
+        with self.assertNumQueries(3):
+            success, summaries = ProjectService.get_team_monthly_roster_summaries(
+                [self.member.id, other.id], self.day.year, self.day.month
+            )
+
+        self.assertTrue(success)
+        self.assertEqual(summaries[self.member.id]['present_days'], 1)
+        self.assertEqual(summaries[self.member.id]['task_hours'], '01:30')
+        self.assertEqual(summaries[self.member.id]['total_hours'], '02:00')
+        self.assertEqual(summaries[other.id]['leave_days'], 1)
+        self.assertEqual(summaries[other.id]['total_hours'], ProjectService._format_minutes(0))
+        # The single member version gives the same summary
+        self.assertEqual(
+            ProjectService.get_monthly_roster_summary_only(self.member, self.day.year, self.day.month)[1],
+            summaries[self.member.id]
+        )
+
+
+@override_settings(ROSTER_VIRTUAL_MODE=True)
+class VirtualRosterTests(TimeLedgerFixturesMixin, TestCase):
+    """Test cases for the virtual roster mode"""
+
+    def _weekday(self):
+        day = self.day
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+        return day
+
+    def test_reads_do_not_write_rosters(self):
+        day = self._weekday()
+        roster = ProjectService.get_daily_roster(self.member, day)
+        self.assertTrue(roster.is_virtual)
+        self.assertEqual(roster.status, 'PRESENT')
+
+        success, monthly = ProjectService.get_monthly_roster(self.member, day.year, day.month)
+        self.assertTrue(success)
+        self.assertEqual(monthly['roster_entries'][0].status, RosterDefaults.default_status(date(day.year, day.month, 1), set()))
+        self.assertTrue(ProjectService.get_monthly_roster_optimized(self.member, day.year, day.month)[0])
+        self.assertFalse(DailyRoster.objects.filter(team_member=self.member).exists())
+
+        # Only an explicit edit is stored
+        ProjectService.update_roster_status(self.member, day, 'LEAVE')
+        self.assertEqual(ProjectService.get_daily_roster(self.member, day).status, 'LEAVE')
+        self.assertEqual(DailyRoster.objects.filter(team_member=self.member).count(), 1)
+
+    def test_summaries_count_default_days(self):
+        day = self._weekday()
+        DailyRoster.objects.create(team_member=self.member, date=day, status='LEAVE', is_auto_created=False)
+
+        success, summaries = ProjectService.get_team_monthly_roster_summaries([self.member.id], day.year, day.month)
+        self.assertTrue(success)
+        success, monthly = ProjectService.get_monthly_roster(self.member, day.year, day.month)
+        self.assertTrue(success)
+        for field in ('present_days', 'leave_days', 'weekoff_days'):
+            self.assertEqual(summaries[self.member.id][field], monthly['summary'][field])
+        self.assertEqual(summaries[self.member.id]['leave_days'], 1)
+
+    def test_prune_deletes_only_default_rows(self):
+        day = self._weekday()
+        saturday = day + timedelta(days=5 - day.weekday())
+        Holiday.objects.create(name='Prune Holiday', date=day - timedelta(days=1), location='Gurgaon', year=day.year)
+        self.addCleanup(HolidayCalendar.invalidate, 'Gurgaon', (day - timedelta(days=1)).year)
+        DailyRoster.objects.create(team_member=self.member, date=day, status='PRESENT')
+        DailyRoster.objects.create(team_member=self.member, date=saturday, status='WEEK_OFF')
+        DailyRoster.objects.create(team_member=self.member, date=day - timedelta(days=1), status='HOLIDAY')
+        kept = [
+            DailyRoster.objects.create(team_member=self.member, date=day - timedelta(days=7), status='LEAVE'),
+            DailyRoster.objects.create(team_member=self.member, date=day - timedelta(days=14), status='PRESENT', notes='Late'),
+            DailyRoster.objects.create(team_member=self.member, date=day - timedelta(days=21), status='PRESENT', is_auto_created=False),
+        ]
+
+        out = StringIO()
+        call_command('prune_default_rosters', '--dry-run', stdout=out)
+        self.assertIn('3 roster rows', out.getvalue())
+        self.assertEqual(DailyRoster.objects.count(), 6)
+
+        call_command('prune_default_rosters', stdout=StringIO())
+        self.assertEqual(set(DailyRoster.objects.values_list('pk', flat=True)), {roster.pk for roster in kept})
+
+
+class TeamRosterMatrixTests(TimeLedgerFixturesMixin, TestCase):
+    """Test cases for the DPMs' team roster matrix"""
+
+    def _matrix(self):
+        other = User.objects.create_user(username='matrixother', first_name='Zed', password='testpass123', role='TEAM_MEMBER')
+        self._add_time(90)
+        MiscHours.objects.create(team_member=self.member, date=self.day, activity='Meeting', duration_minutes=30)
+        DailyRoster.objects.create(team_member=other, date=self.day, status='LEAVE', is_auto_created=False)
+        return other
+
+    def test_matrix_in_three_queries_without_writing_rosters(self):
+        other = self._matrix()
+        start_date = self.day.replace(day=1)
+        end_date = start_date + timedelta(days=30)
+        HolidayCalendar.holidays(start_date, end_date)
+
+        with self.assertNumQueries(3):
+            success, matrix = ProjectService.get_team_roster_matrix([self.member, other], start_date, end_date)
+
+        self.assertTrue(success)
+        self.assertEqual(len(matrix['days']), 31)
+        member_row, other_row = matrix['rows']
+        cell = member_row['cells'][(self.day - start_date).days]
+        self.assertEqual(cell['minutes'], 120)
+        self.assertEqual(cell['formatted'], '02:00')
+        self.assertTrue(cell['is_default'])
+        self.assertEqual(other_row['cells'][(self.day - start_date).days]['status'], 'LEAVE')
+        self.assertEqual(other_row['totals']['leave_days'], 1)
+        self.assertEqual(member_row['totals']['total_hours'], '02:00')
+        self.assertEqual(DailyRoster.objects.count(), 1)
+
+    def test_matrix_page_and_csv_export(self):
+        self._matrix()
+        self.client.login(username='ledgerdpm', password='testpass123')
+        url = reverse('projects:team_roster_matrix')
+        params = {'year': self.day.year, 'month': self.day.month}
+
+        response = self.client.get(url, {**params, 'period': 'quarter'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['start_date'].month, (self.day.month - 1) // 3 * 3 + 1)
+        self.assertEqual(len(response.context['matrix']['rows']), 2)
+        start_date = response.context['start_date']
+        code = response.context['matrix']['rows'][0]['cells'][(self.day - start_date).days]['code']
+
+        response = self.client.get(url, {**params, 'export': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = response.content.decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn(f'{code} 02:00', lines[1])
+        self.assertIn('L', lines[2].split(','))
+
+        self.client.login(username='ledgermember', password='testpass123')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_legacy_sick_leave_counts_as_leave(self):
+        other = self._matrix()
+        # SICK_LEAVE was dropped from the status choices without migrating existing rows
+        sick_day = self.day - timedelta(days=1) if self.day.day > 1 else self.day + timedelta(days=1)
+        DailyRoster.objects.create(team_member=other, date=sick_day, status='SICK_LEAVE', is_auto_created=False)
+        self.client.login(username='ledgerdpm', password='testpass123')
+        url = reverse('projects:team_roster_matrix')
+        params = {'year': self.day.year, 'month': self.day.month}
+
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        other_row = response.context['matrix']['rows'][1]
+        self.assertEqual(other_row['cells'][sick_day.day - 1]['code'], 'L')
+        self.assertEqual(other_row['totals']['leave_days'], 2)
+        success, summaries = ProjectService.get_team_monthly_roster_summaries([other.id], self.day.year, self.day.month)
+        self.assertEqual(summaries[other.id]['leave_days'], 2)
+
+        response = self.client.get(url, {**params, 'export': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().splitlines()[2].split(',').count('L'), 2)
+
+
+class DailyTotalConcurrencyTests(TimeLedgerFixturesMixin, TransactionTestCase):
+    """Concurrent time entries for the same day must all land in its daily total"""
+
+    @skipUnlessDBFeature('test_db_allows_multiple_connections')
+    def test_concurrent_manual_entries(self):
+        import threading
+        from django.db import connection
+
+        thread_count = 8
+        barrier = threading.Barrier(thread_count)
+        errors = []
+
+        def add_time():
+            try:
+                barrier.wait()
+                success, result = ProjectService.add_manual_time(
+                    self.assignment.id, self.member, self.day, 0, 10, reason='OFFLINE_WORK'
+                )
+                if not success:
+                    errors.append(result)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=add_time) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(DailyTimeTotal.objects.get(date_worked=self.day).total_minutes, thread_count * 10)
+        self.assertEqual(TimeLedger.verify(), {'missing_events': {}, 'stale_totals': {}})
+
+
+class LiveUpdatesTests(TimerFixturesMixin, TestCase):
+    """Test cases for the live dashboard streams"""
+
+    def _version(self, scope):
+        return LiveUpdates.cache().get(LiveUpdates.key(scope))
+
+    def test_live_state_reports_timer_and_today_totals(self):
+        ProjectService.add_manual_time(self.assignment.id, self.member, date.today(), 1, 30, reason='OTHER')
+        ProjectService.start_timer(self.assignment.id, self.member)
+
+        success, state = ProjectService.get_live_state(self.member)
+
+        self.assertTrue(success)
+        self.assertEqual(state['timer']['assignment_id'], str(self.assignment.id))
+        self.assertEqual(state['timer']['assignment_code'], self.assignment.assignment_id)
+        self.assertEqual(state['today_summary']['assignment_minutes'], 90)
+        self.assertEqual(state['today_summary']['total_minutes'], 90)
+        # Reading the live state doesn't create today's roster row
+        self.assertFalse(DailyRoster.objects.filter(team_member=self.member, date=date.today()).exists())
+
+    def test_timer_and_time_changes_announce_update(self):
+        scope = LiveUpdates.member_scope(self.member.id)
+        versions = [self._version(scope)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectService.start_timer(self.assignment.id, self.member)
+        versions.append(self._version(scope))
+        self.assertEqual(self._version(TEAM_SCOPE), versions[-1])
+
+        self._backdate_timer(minutes=30)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectService.stop_timer(self.member, "Done")
+        versions.append(self._version(scope))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectService.add_manual_time(self.assignment.id, self.member, date.today(), 0, 15, reason='OTHER')
+        versions.append(self._version(scope))
+
+        self.assertEqual(len(set(versions)), 4)
+
+    def test_stream_under_wsgi_sends_one_event(self):
+        ProjectService.start_timer(self.assignment.id, self.member)
+        self.client.login(username='timermember', password='testpass123')
+
+        response = self.client.get(reverse('projects:my_live_updates'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertFalse(response.streaming)
+        body = response.content.decode()
+        self.assertIn('retry: ', body)
+        self.assertIn("event: state\n", body)
+        data = json.loads(body.split('data: ', 1)[1].split('\n', 1)[0])
+        self.assertEqual(data['timer']['assignment_id'], str(self.assignment.id))
+
+    def test_team_stream_is_for_dpms(self):
+        ProjectService.start_timer(self.assignment.id, self.member)
+
+        self.client.login(username='timermember', password='testpass123')
+        self.assertEqual(self.client.get(reverse('projects:team_live_updates')).status_code, 403)
+
+        self.client.login(username='timerdpm', password='testpass123')
+        response = self.client.get(reverse('projects:team_live_updates'))
+        data = json.loads(response.content.decode().split('data: ', 1)[1].split('\n', 1)[0])
+        self.assertEqual([timer['team_member_id'] for timer in data['timers']], [str(self.member.id)])
+
+    def test_working_now_board_uses_two_queries_and_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectService.add_manual_time(self.assignment.id, self.member, date.today(), 0, 45, reason='OTHER')
+            ProjectService.start_timer(self.assignment.id, self.member)
+
+        with self.assertNumQueries(2):
+            success, result = ProjectService.get_working_now()
+        self.assertTrue(success)
+        self.assertEqual(len(result['timers']), 1)
+        self.assertEqual(result['timers'][0]['assignment_code'], self.assignment.assignment_id)
+        self.assertEqual(result['timers'][0]['today_minutes'], 45)
+
+        # Served from the cache until something changes
+        with self.assertNumQueries(0):
+            ProjectService.get_working_now()
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectService.add_manual_time(self.assignment.id, self.member, date.today(), 0, 15, reason='OTHER')
+        with self.assertNumQueries(2):
+            self.assertEqual(ProjectService.get_working_now()[1]['timers'][0]['today_minutes'], 60)
+
+        self.client.login(username='timerdpm', password='testpass123')
+        self.assertContains(self.client.get(reverse('projects:working_now_board')), self.assignment.assignment_id)
+
+    async def test_stream_under_asgi_pushes_state(self):
+        client = AsyncClient()
+        await client.aforce_login(self.member)
+
+        response = await client.get(reverse('projects:my_live_updates'))
+        self.assertTrue(response.streaming)
+        chunks = aiter(response.streaming_content)
+        self.assertTrue((await anext(chunks)).startswith(b'retry: '))
+        event = (await anext(chunks)).decode()
+        self.assertTrue(event.startswith('event: state\n'))
+        self.assertIsNone(json.loads(event.split('data: ', 1)[1])['timer'])
+        await chunks.aclose()
+
+
+class TimerApiTests(TimerFixturesMixin, TestCase):
+    """Test cases for the dashboard's JSON timer API"""
+
+    def _post(self, name, key=None, **data):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(reverse(f'projects:{name}'), data, **headers)
+
+    def test_start_timer_returns_changed_state(self):
+        self.client.login(username='timermember', password='testpass123')
+        self.assertContains(self.client.get(reverse('projects:team_member_dashboard')), f'id="assignment-row-{self.assignment.id}"')
+
+        response = self._post('api_start_timer', key='start-1', assignment_id=self.assignment.id)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['ok'])
+        self.assertEqual(data['state']['timer']['assignment_id'], str(self.assignment.id))
+        self.assertIn('id="timer-display"', data['timer_card'])
+        self.assertIn('Running', data['rows'][str(self.assignment.id)])
+        self.assertIn('Mark entire assignment as completed', data['stop_timer_body'])
+
+    def test_repeated_key_replays_response_without_repeating_action(self):
+        self.client.login(username='timermember', password='testpass123')
+        self._post('api_start_timer', assignment_id=self.assignment.id)
+        self._backdate_timer(minutes=30)
+
+        first = self._post('api_stop_timer', key='stop-1', description='Done')
+        second = self._post('api_stop_timer', key='stop-1', description='Done')
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(TimeSession.objects.filter(assignment=self.assignment).count(), 1)
+        self.assertIsNone(first.json()['state']['timer'])
+        # A new key is a new action: there is no timer left to stop
+        self.assertEqual(self._post('api_stop_timer', key='stop-2').status_code, 400)
+
+    def test_stop_reports_whole_overnight_duration(self):
+        """Test that stopping a timer that ran past midnight reports the minutes of every day"""
+        self.client.login(username='timermember', password='testpass123')
+        self._post('api_start_timer', assignment_id=self.assignment.id)
+        midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        self._backdate_timer(started_at=midnight - timedelta(minutes=90))
+
+        response = self._post('api_stop_timer', key='stop-1')
+
+        total_minutes = TimeSession.objects.filter(assignment=self.assignment).aggregate(total=Sum('duration_minutes'))['total']
+        self.assertGreaterEqual(total_minutes, 90)
+        self.assertEqual(
+            response.json()['message'],
+            f"Timer stopped. Session duration: {ProjectService._format_minutes(total_minutes)}"
+        )
+
+    def test_request_with_key_in_progress_is_rejected(self):
+        self.client.login(username='timermember', password='testpass123')
+        IdempotencyKeys.claim(self.member.id, 'complete_assignment', 'complete-1')
+
+        response = self._post('api_complete_assignment', key='complete-1', assignment_id=self.assignment.id)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(TaskAssignment.objects.get(pk=self.assignment.pk).is_completed)
+
+    def test_manual_time_with_completion_removes_row(self):
+        self.client.login(username='timermember', password='testpass123')
+
+        response = self._post(
+            'api_add_manual_time', key='manual-1', assignment_id=self.assignment.id,
+            date=date.today(), duration_hours=1, duration_minutes=0, reason='OFFLINE_WORK', is_completed='on'
+        )
+
+        data = response.json()
+        self.assertTrue(data['ok'])
+        self.assertIsNone(data['rows'][str(self.assignment.id)])
+        self.assertEqual(data['state']['today_summary']['assignment_minutes'], 60)
+        self.assertTrue(TaskAssignment.objects.get(pk=self.assignment.pk).is_completed)
+
+    def test_invalid_form_and_wrong_role(self):
+        self.client.login(username='timermember', password='testpass123')
+        response = self._post('api_add_manual_time', assignment_id=self.assignment.id, date=date.today())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reason', response.json()['errors'])
+
+        self.client.login(username='timerdpm', password='testpass123')
+        self.assertEqual(self._post('api_start_timer', assignment_id=self.assignment.id).status_code, 403)
+
+
+class HsIdSequenceTests(TestCase):
+    """Test cases for the HS_ID sequence allocator"""
+
+    def setUp(self):
+        self.dpm = User.objects.create_user(
+            username='seqdpm',
+            email='seqdpm@example.com',
+            password='testpass123',
+            role='DPM'
+        )
+        self.region = Region.objects.create(name='Seq Region')
+        self.city = City.objects.create(name='Seq City', region=self.region)
+        self.product = Product.objects.create(name='Seq Product', expected_tat=30)
+        self.status = ProjectStatusOption.objects.create(
+            name='Seq Status',
+            category_one='Category 1',
+            category_two='Category 2',
+            order=1
+        )
+
+    def _project(self, **kwargs):
+        return Project(
+            opportunity_id='OPP-SEQ',
+            project_name='Seq Project',
+            builder_name='Seq Builder',
+            city=self.city,
+            product=self.product,
+            quantity=1,
+            purchase_date=date.today(),
+            sales_confirmation_date=date.today(),
+            account_manager='Seq Manager',
+            expected_tat=30,
+            current_status=self.status,
+            dpm=self.dpm,
+            **kwargs
+        )
+
+    def test_format_and_parse_round_trip(self):
+        """Test HS_ID formatting across letter boundaries"""
+        self.assertEqual(format_hs_id(1), 'A1')
+        self.assertEqual(format_hs_id(999), 'A999')
+        self.assertEqual(format_hs_id(1000), 'B1')
+        for value in (1, 500, 999, 1000, 2001):
+            self.assertEqual(parse_hs_id(format_hs_id(value)), value)
+        self.assertIsNone(parse_hs_id('invalid'))
+        self.assertIsNone(parse_hs_id('A1000'))
+
+    def test_reserve_block(self):
+        """Test reserving a block of HS_IDs for bulk imports"""
+        self.assertEqual(SequenceService.reserve_hs_ids(3), ['A1', 'A2', 'A3'])
+        self.assertEqual(SequenceService.peek_hs_id(), 'A4')
+        self._project().save()
+        self.assertEqual(Project.objects.get().hs_id, 'A4')
+
+    def test_bulk_import_assigns_around_explicit_hs_ids(self):
+        """Test that imported rows without an HS_ID never get one an imported row already has"""
+        projects = get_allocator(HS_ID_SEQUENCE).assign([
+            self._project(hs_id=''),
+            self._project(hs_id='A2'),
+            self._project(hs_id=''),
+        ])
+        Project.objects.bulk_create(projects)
+
+        self.assertEqual([project.hs_id for project in projects], ['A3', 'A2', 'A4'])
+        self.assertEqual(SequenceService.peek_hs_id(), 'A5')
+
+    def test_rollover_to_next_letter(self):
+        """Test that A999 is followed by B1"""
+        SequenceService.reset(HS_ID_SEQUENCE, 998)
+        first = self._project()
+        first.save()
+        second = self._project()
+        second.save()
+        self.assertEqual((first.hs_id, second.hs_id), ('A999', 'B1'))
+
+    def test_explicit_hs_id_advances_sequence(self):
+        """Test that explicitly assigned HS_IDs are never handed out again"""
+        self._project(hs_id='A10').save()
+        self.assertEqual(Project.generate_hs_id(), 'A11')
+
+    def test_rolled_back_create_releases_hs_id(self):
+        """Test that a failed create does not leave a gap in the sequence"""
+        try:
+            with transaction.atomic():
+                self._project().save()
+                raise IntegrityError("simulated failure")
+        except IntegrityError:
+            pass
+        self.assertEqual(Project.generate_hs_id(), 'A1')
+
+    def test_sequence_seeded_from_existing_projects(self):
+        """Test that a missing counter row starts after the highest existing HS_ID"""
+        self._project(hs_id='B5').save()
+        IdSequence.objects.all().delete()
+        self.assertEqual(SequenceService.allocate_hs_id(), 'B6')
+
+
+class HsIdConcurrencyTests(TransactionTestCase):
+    """Concurrent project creation must give unique, gap-free HS_IDs"""
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_concurrent_creates(self):
+        import threading
+        from django.db import connection
+
+        dpm = User.objects.create_user(username='condpm', password='testpass123', role='DPM')
+        region = Region.objects.create(name='Con Region')
+        project_data = {
+            'opportunity_id': 'OPP-CON',
+            'project_name': 'Concurrent Project',
+            'builder_name': 'Builder',
+            'city': City.objects.create(name='Con City', region=region),
+            'product': Product.objects.create(name='Con Product', expected_tat=30),
+            'quantity': 1,
+            'purchase_date': date.today(),
+            'sales_confirmation_date': date.today(),
+            'account_manager': 'Manager',
+            'current_status': ProjectStatusOption.objects.create(
+                name='Con Status', category_one='C1', category_two='C2', order=1
+            ),
+        }
+        thread_count = 10
+        barrier = threading.Barrier(thread_count)
+        errors = []
+
+        def create():
+            try:
+                barrier.wait()
+                success, result = ProjectService.create_project(project_data, dpm)
+                if not success:
+                    errors.append(result)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        hs_ids = sorted(Project.objects.values_list('hs_id', flat=True), key=parse_hs_id)
+        self.assertEqual(hs_ids, [format_hs_id(value) for value in range(1, thread_count + 1)])
+
+
 # Run the tests
 if __name__ == '__main__':
     import django
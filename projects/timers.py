@@ -0,0 +1,254 @@
+#projects/timers.py
+"""
+Active timer backends for ProjectService's start/stop timer methods.
+
+Every running timer has an ActiveTimer row, which is the durable record used
+for recovery and for anything that lists running timers. Backends differ in
+where the hot per-member lookup happens:
+
+- DatabaseTimerBackend: the ActiveTimer table itself, guarded by
+  select_for_update (the original behaviour, and the default).
+- CacheTimerBackend: a key-value store (Django's cache, e.g. Redis). Starting
+  claims the member's key with an atomic add, dashboards read the timer from
+  the cache without touching the database, and stopping claims the timer by
+  deleting the key before the session is persisted in one transaction.
+- LocalMemoryTimerBackend: CacheTimerBackend on a process-local store, for
+  development and tests.
+
+If the cache loses its entries (restart, eviction, a crash between claiming
+and persisting a stop), run `manage.py recover_active_timers` to rebuild them
+from the ActiveTimer rows. Set ACTIVE_TIMER_BACKEND to a dotted class path to
+choose a backend and ACTIVE_TIMER_CACHE to pick the cache alias.
+"""
+import logging
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+from .models import ActiveTimer
+from .live import LiveUpdates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMER_BACKEND = 'projects.timers.DatabaseTimerBackend'
+TIMER_CACHE_KEY = 'projects:active_timer:{team_member_id}'
+
+
+class ActiveTimerBackend:
+    """
+    Base class for active timer backends.
+    """
+
+    def get(self, team_member):
+        """
+        Returns:
+            ActiveTimer or None: The member's running timer (may be unsaved for cache backends)
+        """
+        raise NotImplementedError
+
+    def start(self, team_member, assignment, started_at):
+        """
+        Start a timer unless the member already has one. Call inside a transaction.
+
+        Returns:
+            tuple: (timer, None) when started, or (None, existing_timer)
+        """
+        raise NotImplementedError
+
+    def claim(self, team_member):
+        """
+        Take the member's running timer for stopping, so no other request stops it too.
+        Call inside the transaction that persists the stop.
+
+        Returns:
+            ActiveTimer or None
+        """
+        raise NotImplementedError
+
+    def release(self, timer):
+        """Give a claimed timer back when the stop didn't go through."""
+
+    def cancel(self, timer):
+        """Forget a timer whose start didn't go through."""
+
+    def finish(self, timer):
+        """Remove the durable record of a stopped timer. Call inside the stop transaction."""
+        ActiveTimer.objects.filter(team_member_id=timer.team_member_id).delete()
+        LiveUpdates.touch([timer.team_member_id])
+
+    def running(self):
+        """All running timers, from the durable ActiveTimer rows."""
+        return ActiveTimer.objects.select_related('assignment', 'team_member')
+
+
+class DatabaseTimerBackend(ActiveTimerBackend):
+    """
+    Keeps running timers only in the ActiveTimer table.
+    """
+
+    def get(self, team_member):
+        return ActiveTimer.objects.filter(team_member=team_member).select_related('assignment').first()
+
+    def start(self, team_member, assignment, started_at):
+        existing_timer = ActiveTimer.objects.select_for_update().filter(
+            team_member=team_member
+        ).select_related('assignment').first()
+        if existing_timer:
+            return None, existing_timer
+
+        timer = ActiveTimer.objects.create(
+            assignment=assignment,
+            team_member=team_member,
+            started_at=started_at
+        )
+        return timer, None
+
+    def claim(self, team_member):
+        return ActiveTimer.objects.select_for_update().filter(
+            team_member=team_member
+        ).select_related('assignment').first()
+
+
+class CacheTimerBackend(ActiveTimerBackend):
+    """
+    Keeps running timers in a cache, with the ActiveTimer row as the durable copy.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or caches[getattr(settings, 'ACTIVE_TIMER_CACHE', 'default')]
+
+    @staticmethod
+    def key(team_member_id):
+        return TIMER_CACHE_KEY.format(team_member_id=team_member_id)
+
+    @staticmethod
+    def serialize(timer):
+        return {
+            'id': str(timer.id),
+            'assignment_id': str(timer.assignment_id),
+            'team_member_id': timer.team_member_id,
+            'started_at': timer.started_at.isoformat(),
+        }
+
+    @staticmethod
+    def deserialize(payload):
+        return ActiveTimer(
+            id=uuid.UUID(payload['id']),
+            assignment_id=uuid.UUID(payload['assignment_id']),
+            team_member_id=payload['team_member_id'],
+            started_at=parse_datetime(payload['started_at']),
+        )
+
+    def get(self, team_member):
+        payload = self.cache.get(self.key(team_member.id))
+        return self.deserialize(payload) if payload else None
+
+    def prime(self, timer):
+        """Write a running timer to the cache."""
+        self.cache.set(self.key(timer.team_member_id), self.serialize(timer), None)
+
+    def start(self, team_member, assignment, started_at):
+        key = self.key(team_member.id)
+        timer = ActiveTimer(assignment=assignment, team_member=team_member, started_at=started_at)
+
+        # add() is atomic: only one request can claim the member's key
+        if not self.cache.add(key, self.serialize(timer), None):
+            existing_timer = self.get(team_member)
+            if existing_timer:
+                return None, existing_timer
+            # Stopped between add() and get(); report it as running rather than retrying
+            return None, timer
+
+        try:
+            # Savepoint, so a clash with a row the cache didn't know about doesn't break the caller
+            with transaction.atomic():
+                timer.save(force_insert=True)
+        except IntegrityError:
+            # The cache had lost a running timer; put the durable one back
+            existing_timer = ActiveTimer.objects.filter(team_member=team_member).first()
+            if existing_timer is None:
+                self.cache.delete(key)
+                raise
+            self.prime(existing_timer)
+            return None, existing_timer
+        except Exception:
+            self.cache.delete(key)
+            raise
+
+        return timer, None
+
+    def claim(self, team_member):
+        key = self.key(team_member.id)
+        payload = self.cache.get(key)
+        if payload:
+            # delete() tells us whether this request removed the key, i.e. won the claim
+            if not self.cache.delete(key):
+                return None
+            return self.deserialize(payload)
+
+        # Nothing cached: fall back to the durable row in case the cache was cleared
+        return ActiveTimer.objects.select_for_update().filter(team_member=team_member).first()
+
+    def release(self, timer):
+        self.prime(timer)
+
+    def cancel(self, timer):
+        payload = self.cache.get(self.key(timer.team_member_id))
+        if payload and payload['id'] == str(timer.id):
+            self.cache.delete(self.key(timer.team_member_id))
+
+
+# One store per process, so "local" timers survive between requests in the same process
+_local_timer_cache = LocMemCache('projects-active-timers', {'TIMEOUT': None})
+
+
+class LocalMemoryTimerBackend(CacheTimerBackend):
+    """
+    CacheTimerBackend on a process-local store. Only correct with a single process.
+    """
+
+    def __init__(self, cache=None):
+        super().__init__(cache or _local_timer_cache)
+
+
+def get_timer_backend():
+    """
+    Return the configured active timer backend.
+    """
+    return import_string(getattr(settings, 'ACTIVE_TIMER_BACKEND', DEFAULT_TIMER_BACKEND))()
+
+
+def recover_active_timers(backend=None):
+    """
+    Rebuild a cache backend's entries from the ActiveTimer rows.
+
+    Every member with a row gets it cached again (covering a cleared cache or
+    a stop that crashed after claiming the timer), and cached timers without
+    a row (a start whose transaction never committed) are cleared.
+
+    Returns:
+        tuple: (timers restored, stale cache entries cleared)
+    """
+    backend = backend or get_timer_backend()
+    if not isinstance(backend, CacheTimerBackend):
+        return 0, 0
+
+    from accounts.models import User
+
+    rows = {timer.team_member_id: timer for timer in ActiveTimer.objects.all()}
+    restored = cleared = 0
+    for team_member_id in User.objects.values_list('id', flat=True):
+        payload = backend.cache.get(backend.key(team_member_id))
+        timer = rows.get(team_member_id)
+        if timer is not None:
+            if not payload or payload['id'] != str(timer.id):
+                restored += 1
+                backend.prime(timer)
+        elif payload:
+            cleared += 1
+            logger.warning(f"Clearing cached timer without an ActiveTimer row for team member {team_member_id}")
+            backend.cancel(backend.deserialize(payload))
+    return restored, cleared
@@ -1,7 +1,7 @@
 #projects/urls.py
 from django.urls import path
 from . import views
-from . import views, report_views
+from . import views, report_views, live_views, api_views
 
 app_name = 'projects'
 
@@ -44,6 +44,13 @@ urlpatterns = [
     ),
     # Team member URLs
     path('tasks/my-assignments/', views.team_member_dashboard, name='team_member_dashboard'),
+    path('live/me/', live_views.my_live_updates, name='my_live_updates'),
+    path('live/team/', live_views.team_live_updates, name='team_live_updates'),
+    path('team/working-now/', views.working_now_board, name='working_now_board'),
+    path('api/timer/start/', api_views.start_timer, name='api_start_timer'),
+    path('api/timer/stop/', api_views.stop_timer, name='api_stop_timer'),
+    path('api/time/manual/', api_views.add_manual_time, name='api_add_manual_time'),
+    path('api/assignments/complete/', api_views.complete_assignment, name='api_complete_assignment'),
     path('tasks/completed-assignments/', views.completed_assignments_list, name='completed_assignments_list'),
     path('my-projects/', views.my_projects, name='my_projects'), 
     path('assignments/<uuid:assignment_id>/timesheet/', views.assignment_timesheet, name='assignment_timesheet'),
@@ -59,6 +66,7 @@ urlpatterns = [
     
     # Team Roster URLs (for DPMs)
     path('team-roster/', views.team_roster_list, name='team_roster_list'),
+    path('team-roster/matrix/', views.team_roster_matrix, name='team_roster_matrix'),
     path('team-roster/<uuid:team_member_id>/', views.team_member_monthly_roster, name='team_member_monthly_roster'),
     path('team-roster/<uuid:team_member_id>/<int:year>/<int:month>/', views.team_member_monthly_roster, name='team_member_monthly_roster_date'),
     path('team-roster/daily/', views.team_member_daily_roster, name='team_member_daily_roster'),
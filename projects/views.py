@@ -9,16 +9,16 @@ from .forms import (
     TaskAssignmentForm, TaskAssignmentUpdateForm, ProjectManagementForm, 
     AddMiscHoursForm, EditMiscHoursForm, TimerStopForm, ManualTimeEntryForm, 
     EditSessionDurationForm, DailyRosterFilterForm, TaskAssignmentFilterForm,
-    DeliveredProjectFilterForm
+    DeliveredProjectFilterForm, BulkTimeEntryFormSet
 )
 from .services import ProjectService
 from accounts.models import User
 from locations.models import Region, City
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
 from .models import (
     Project, ProjectStatusOption, ProjectTask, TaskAssignment, 
     ProjectStatusHistory, ActiveTimer, TimeSession, DailyTimeTotal, 
-    ProjectDelivery, Product, MiscHours
+    ProjectDelivery, Product, MiscHours, DailyRoster
 )
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect
@@ -28,6 +28,8 @@ import uuid
 from datetime import date, timedelta, datetime
 from django.utils import timezone
 import json
+import csv
+import calendar
 
 
 
@@ -199,6 +201,17 @@ def update_project_status(request, project_id):
     })
 
 
+def _filter_querystring(request):
+    """
+    The current list filters as a query string, without the pagination
+    parameters, for building page links.
+    """
+    query = request.GET.copy()
+    for param in ('page', 'cursor', 'pagination'):
+        query.pop(param, None)
+    return query.urlencode()
+
+
 @login_required
 def project_list(request):
     """
@@ -220,6 +233,9 @@ def project_list(request):
     date_from = request.GET.get('date_from', '')
     date_to = request.GET.get('date_to', '')
     page = request.GET.get('page', 1)
+    # Keyset pagination (?pagination=cursor) for deep pages; numbered pages link on to it
+    pagination = 'cursor' if request.GET.get('pagination') == 'cursor' else 'page'
+    cursor = request.GET.get('cursor')
 
     # Convert date strings to date objects if provided
     date_from_obj = None
@@ -248,6 +264,8 @@ def project_list(request):
         date_from=date_from_obj,
         date_to=date_to_obj,
         page=page,
+        cursor=cursor,
+        pagination=pagination,
         project_type='pipeline'  # Only get pipeline projects
     )
 
@@ -314,7 +332,8 @@ def project_list(request):
         'filters_applied_display': filters_applied_display,
         'filter_options': filter_options,
         'title': 'Pipeline Projects',
-        'is_pipeline': True  # Add flag to identify page type
+        'is_pipeline': True,  # Add flag to identify page type
+        'filter_querystring': _filter_querystring(request),
     }
 
     return render(request, 'projects/project_list.html', context)
@@ -341,6 +360,9 @@ def delivered_projects(request):
     delivery_date_from = request.GET.get('delivery_date_from', '')
     delivery_date_to = request.GET.get('delivery_date_to', '')
     page = request.GET.get('page', 1)
+    # Keyset pagination (?pagination=cursor) for deep pages; numbered pages link on to it
+    pagination = 'cursor' if request.GET.get('pagination') == 'cursor' else 'page'
+    cursor = request.GET.get('cursor')
 
     # Convert date strings to date objects if provided
     date_from_obj = None
@@ -369,6 +391,8 @@ def delivered_projects(request):
         date_from=date_from_obj,
         date_to=date_to_obj,
         page=page,
+        cursor=cursor,
+        pagination=pagination,
         project_type='delivered'  # Only get delivered projects
     )
 
@@ -457,7 +481,8 @@ def delivered_projects(request):
         'filters_applied_display': filters_applied_display,
         'filter_options': filter_options,
         'title': 'Delivered Projects',
-        'is_delivered': True  # Add flag to identify page type
+        'is_delivered': True,  # Add flag to identify page type
+        'filter_querystring': _filter_querystring(request),
     }
 
     return render(request, 'projects/delivered_projects.html', context)
@@ -812,6 +837,39 @@ def dpm_task_dashboard(request):
     return render(request, 'projects/dpm_task_dashboard.html', context)
 
 
+@login_required
+def working_now_board(request):
+    """
+    Live board of the team's running timers for DPMs. The table is kept up
+    to date by the team live stream (projects/live_views.py).
+    """
+    if request.user.role != 'DPM':
+        messages.error(request, "Access denied. This page is only for Project Managers.")
+        return redirect('home')
+
+    success, result = ProjectService.get_working_now()
+
+    if not success:
+        messages.error(request, result)
+        return redirect('home')
+
+    context = {
+        'timers': result['timers'],
+        'title': "Who's Working Now"
+    }
+
+    return render(request, 'projects/working_now_board.html', context)
+
+
+def _bulk_time_assignments(team_member):
+    """Assignments a team member can add bulk manual time to."""
+    return TaskAssignment.objects.filter(
+        assigned_to=team_member,
+        is_active=True,
+        is_completed=False
+    ).select_related('task').order_by('expected_delivery_date')
+
+
 @login_required
 def team_member_dashboard(request):
     """
@@ -845,12 +903,14 @@ def team_member_dashboard(request):
                 success, result = ProjectService.stop_timer(request.user, description)
 
                 if success:
-                    messages.success(request, f"Timer stopped. Session duration: {result.get_formatted_duration()}")
+                    # An overnight timer is saved as one session per day
+                    total_minutes = sum(session.duration_minutes for session in result)
+                    messages.success(request, f"Timer stopped. Session duration: {ProjectService._format_minutes(total_minutes)}")
 
                     # Mark as completed if requested
                     if is_completed:
                         success, complete_result = ProjectService.complete_assignment(
-                            result.assignment.id,
+                            result[-1].assignment.id,
                             request.user
                         )
                         if success:
@@ -894,6 +954,40 @@ def team_member_dashboard(request):
                     for error in errors:
                         messages.error(request, f"{field}: {error}")
 
+        # Add Manual Time for several days/assignments at once
+        elif 'add_time_bulk' in request.POST:
+            formset = BulkTimeEntryFormSet(
+                request.POST,
+                prefix='bulk',
+                form_kwargs={'assignments': _bulk_time_assignments(request.user)}
+            )
+
+            if formset.is_valid():
+                entries = [
+                    {
+                        'assignment_id': form.cleaned_data['assignment'].id,
+                        'date_worked': form.cleaned_data['date'],
+                        'minutes': (form.cleaned_data['duration_hours'] * 60) + form.cleaned_data['duration_minutes'],
+                        'reason': form.cleaned_data['reason'],
+                        'description': form.cleaned_data['description'],
+                    }
+                    for form in formset
+                ]
+                success, result = ProjectService.add_manual_time_bulk(request.user, entries)
+
+                if success:
+                    total_minutes = sum(session.duration_minutes for session in result)
+                    messages.success(request, f"Added {ProjectService._format_minutes(total_minutes)} across {len(result)} entries to your timesheet")
+                else:
+                    messages.error(request, result)
+            else:
+                for error in formset.non_form_errors():
+                    messages.error(request, error)
+                for row, form in enumerate(formset, start=1):
+                    for field, errors in form.errors.items():
+                        for error in errors:
+                            messages.error(request, f"Row {row} {field}: {error}")
+
         # Mark Completed
         elif 'mark_completed' in request.POST:
             assignment_id = request.POST.get('assignment_id')
@@ -919,6 +1013,11 @@ def team_member_dashboard(request):
     # Create forms for the modals
     timer_stop_form = TimerStopForm()
     time_entry_form = ManualTimeEntryForm(initial={'date': timezone.localtime(timezone.now()).date()})
+    bulk_time_formset = BulkTimeEntryFormSet(
+        prefix='bulk',
+        form_kwargs={'assignments': _bulk_time_assignments(request.user)},
+        initial=[{'date': timezone.localtime(timezone.now()).date(), 'reason': 'OFFLINE_WORK'}]
+    )
 
     context = {
         'active_assignments': dashboard_data['active_assignments'],
@@ -928,6 +1027,7 @@ def team_member_dashboard(request):
         'today_summary': dashboard_data['today_summary'],
         'timer_stop_form': timer_stop_form,
         'time_entry_form': time_entry_form,
+        'bulk_time_formset': bulk_time_formset,
         'title': 'My Tasks Dashboard',
         'now': timezone.now()  # For template comparisons
     }
@@ -1360,7 +1460,7 @@ def update_roster_day(request):
         work_date = datetime.strptime(date_str, '%Y-%m-%d').date()
 
         # Get existing roster to preserve misc hours and description
-        roster, _ = ProjectService.get_or_create_daily_roster(request.user, work_date)
+        roster = ProjectService.get_daily_roster(request.user, work_date)
 
         # Update roster using service
         success, result = ProjectService.update_roster_status(
@@ -1775,6 +1875,11 @@ def dpm_assignments_overview(request):
         return redirect('projects:dpm_task_dashboard')
     
     assignments = result
+
+    # Timer vs manual split for every row, in one grouped query
+    timer_usage = ProjectService.get_timer_usage([assignment.id for assignment in assignments])
+    for assignment in assignments:
+        assignment.timer_usage = timer_usage.get(assignment.id)
     
     # Create summary statistics
     total_assignments = len(assignments)
@@ -1937,8 +2042,8 @@ def assignment_graph_view(request):
             except (User.DoesNotExist, Project.DoesNotExist, ValueError):
                 pass
             
-            # Get assignments using service layer
-            success, assignments = ProjectService.get_dpm_all_task_assignments(
+            # Aggregate projected/worked hours per team member in the database
+            success, chart_data = ProjectService.get_assignment_workload(
                 assignment_status=assignment_status,
                 team_member=team_member,
                 project=project,
@@ -1948,58 +2053,7 @@ def assignment_graph_view(request):
             )
             
             if not success:
-                return JsonResponse({'error': assignments}, status=400)
-            
-            # Aggregate data by team member
-            member_workload = {}
-            total_assignments = 0
-            
-            for assignment in assignments:
-                member_name = assignment.assigned_to.get_full_name() or assignment.assigned_to.username
-                projected_hours = assignment.projected_hours or 0
-                projected_hours_decimal = projected_hours / 60.0  # Convert minutes to hours
-                
-                # Calculate worked hours for this assignment
-                worked_minutes = assignment.daily_totals.aggregate(
-                    total=Sum('total_minutes')
-                )['total'] or 0
-                worked_hours_decimal = worked_minutes / 60.0
-                
-                if member_name not in member_workload:
-                    member_workload[member_name] = {
-                        'hours': 0,
-                        'worked_hours': 0,
-                        'assignments': 0,
-                        'username': assignment.assigned_to.username
-                    }
-                
-                member_workload[member_name]['hours'] += projected_hours_decimal
-                member_workload[member_name]['worked_hours'] += worked_hours_decimal
-                member_workload[member_name]['assignments'] += 1
-                total_assignments += 1
-            
-            # Sort by hours (descending)
-            sorted_workload = sorted(member_workload.items(), key=lambda x: x[1]['hours'], reverse=True)
-            
-            # Prepare chart data
-            labels = [item[0] for item in sorted_workload]
-            hours_data = [round(item[1]['hours'], 1) for item in sorted_workload]
-            worked_hours_data = [round(item[1]['worked_hours'], 1) for item in sorted_workload]
-            remaining_hours_data = [round(max(0, item[1]['hours'] - item[1]['worked_hours']), 1) for item in sorted_workload]
-            assignments_data = [item[1]['assignments'] for item in sorted_workload]
-            
-            chart_data = {
-                'labels': labels,
-                'hours': hours_data,
-                'worked_hours': worked_hours_data,
-                'remaining_hours': remaining_hours_data,
-                'assignments': assignments_data,
-                'total_members': len(member_workload),
-                'total_assignments': total_assignments,
-                'total_hours': round(sum(hours_data), 1),
-                'total_worked_hours': round(sum(worked_hours_data), 1),
-                'avg_hours_per_member': round(sum(hours_data) / len(member_workload), 1) if member_workload else 0
-            }
+                return JsonResponse({'error': chart_data}, status=400)
             
             return JsonResponse(chart_data)
 
@@ -2031,8 +2085,8 @@ def assignment_graph_view(request):
         start_date = filter_form.cleaned_data.get('start_date')
         end_date = filter_form.cleaned_data.get('end_date')
     
-    # Get assignments using service layer
-    success, result = ProjectService.get_dpm_all_task_assignments(
+    # Aggregate projected/worked hours per team member for the initial load
+    success, initial_chart_data = ProjectService.get_assignment_workload(
         assignment_status=assignment_status,
         team_member=team_member,
         project=project,
@@ -2042,58 +2096,9 @@ def assignment_graph_view(request):
     )
     
     if not success:
-        messages.error(request, result)
+        messages.error(request, initial_chart_data)
         return redirect('projects:dpm_task_dashboard')
     
-    assignments = result
-    
-    # Aggregate data by team member for initial load
-    member_workload = {}
-    total_assignments = len(assignments)
-    
-    for assignment in assignments:
-        member_name = assignment.assigned_to.get_full_name() or assignment.assigned_to.username
-        projected_hours = assignment.projected_hours or 0
-        projected_hours_decimal = projected_hours / 60.0  # Convert minutes to hours
-        
-        # Calculate worked hours for this assignment
-        worked_minutes = assignment.daily_totals.aggregate(
-            total=Sum('total_minutes')
-        )['total'] or 0
-        worked_hours_decimal = worked_minutes / 60.0
-        
-        if member_name not in member_workload:
-            member_workload[member_name] = {
-                'hours': 0,
-                'worked_hours': 0,
-                'assignments': 0,
-                'username': assignment.assigned_to.username
-            }
-        
-        member_workload[member_name]['hours'] += projected_hours_decimal
-        member_workload[member_name]['worked_hours'] += worked_hours_decimal
-        member_workload[member_name]['assignments'] += 1
-    
-    # Sort by hours (descending)
-    sorted_workload = sorted(member_workload.items(), key=lambda x: x[1]['hours'], reverse=True)
-    
-    # Prepare initial chart data
-    worked_hours_list = [round(item[1]['worked_hours'], 1) for item in sorted_workload]
-    hours_list = [round(item[1]['hours'], 1) for item in sorted_workload]
-    
-    initial_chart_data = {
-        'labels': [item[0] for item in sorted_workload],
-        'hours': hours_list,
-        'worked_hours': worked_hours_list,
-        'remaining_hours': [round(max(0, hours_list[i] - worked_hours_list[i]), 1) for i in range(len(hours_list))],
-        'assignments': [item[1]['assignments'] for item in sorted_workload],
-        'total_members': len(member_workload),
-        'total_assignments': total_assignments,
-        'total_hours': round(sum(hours_list), 1),
-        'total_worked_hours': round(sum(worked_hours_list), 1),
-        'avg_hours_per_member': round(sum(hours_list) / len(member_workload), 1) if member_workload else 0
-    }
-    
     # Create date range display text for UI
     date_range_text = ""
     if start_date or end_date:
@@ -2114,7 +2119,6 @@ def assignment_graph_view(request):
         'assignment_status': assignment_status,
         'date_range_text': date_range_text,
         'initial_chart_data': json.dumps(initial_chart_data),
-        'workload_data': sorted_workload,
         'title': 'Assignment Workload Graph'
     }
     
@@ -2152,29 +2156,31 @@ def team_roster_list(request):
     # Get all team members (excluding DPMs)
     team_members = User.objects.filter(role='TEAM_MEMBER').order_by('first_name', 'last_name')
     
-    # Get current month summary for each team member
+    # Get current month summary for every team member with a fixed number of queries
     today = date.today()
-    team_member_data = []
-    
-    for member in team_members:
-        # Get monthly summary (optimized version)
-        success, summary = ProjectService.get_monthly_roster_summary_only(member, today.year, today.month)
-        
-        if not success:
-            summary = {
-                'present_days': 0,
-                'leave_days': 0,
-                'weekoff_days': 0,
-                'task_hours': '00:00',
-                'misc_hours': '00:00',
-                'total_hours': '00:00'
-            }
-        
-        team_member_data.append({
+    success, summaries = ProjectService.get_team_monthly_roster_summaries(
+        [member.id for member in team_members], today.year, today.month
+    )
+    if not success:
+        messages.error(request, summaries)
+        summaries = {}
+
+    empty_summary = {
+        'present_days': 0,
+        'leave_days': 0,
+        'weekoff_days': 0,
+        'task_hours': '00:00',
+        'misc_hours': '00:00',
+        'total_hours': '00:00'
+    }
+    team_member_data = [
+        {
             'member': member,
-            'summary': summary
-        })
-    
+            'summary': summaries.get(member.id, empty_summary)
+        }
+        for member in team_members
+    ]
+
     context = {
         'team_members': team_member_data,
         'current_month': today.strftime('%B %Y'),
@@ -2184,6 +2190,102 @@ def team_roster_list(request):
     return render(request, 'projects/team_roster_list.html', context)
 
 
+ROSTER_MATRIX_CODES = {
+    'PRESENT': 'P',
+    'HALF_DAY': 'HD',
+    'LEAVE': 'L',
+    # Dropped from the status choices, but older rows may still hold it
+    'SICK_LEAVE': 'L',
+    'TEAM_OUTING': 'TO',
+    'WEEK_OFF': 'WO',
+    'HOLIDAY': 'H',
+}
+
+
+@login_required
+def team_roster_matrix(request):
+    """
+    Team x day roster matrix for DPMs: every team member's status and logged
+    hours for a month or a quarter on one page, or as a CSV export.
+    """
+    if request.user.role != 'DPM':
+        messages.error(request, "Access denied. This page is only for Project Managers.")
+        return redirect('home')
+
+    today = date.today()
+    try:
+        year = int(request.GET.get('year', today.year))
+        month = int(request.GET.get('month', today.month))
+        start_date = date(year, month, 1)
+    except ValueError:
+        messages.error(request, "Invalid month.")
+        return redirect('projects:team_roster_matrix')
+
+    period = 'quarter' if request.GET.get('period') == 'quarter' else 'month'
+    if period == 'quarter':
+        start_date = date(year, (month - 1) // 3 * 3 + 1, 1)
+        months = 3
+    else:
+        months = 1
+    last_month = date(start_date.year, start_date.month + months - 1, 1)
+    end_date = last_month.replace(day=calendar.monthrange(last_month.year, last_month.month)[1])
+
+    team_members = User.objects.filter(role='TEAM_MEMBER').order_by('first_name', 'last_name')
+    success, matrix = ProjectService.get_team_roster_matrix(team_members, start_date, end_date)
+    if not success:
+        messages.error(request, matrix)
+        return redirect('projects:team_roster_list')
+
+    if request.GET.get('export') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="team-roster-{start_date:%Y-%m}-{end_date:%Y-%m}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(
+            ['Team Member', 'Username']
+            + [day.isoformat() for day in matrix['days']]
+            + ['Present', 'Half Day', 'Leave', 'Week Off', 'Holiday', 'Total Hours']
+        )
+        for row in matrix['rows']:
+            member, totals = row['member'], row['totals']
+            writer.writerow(
+                [member.get_full_name() or member.username, member.username]
+                + [
+                    f"{ROSTER_MATRIX_CODES[cell['status']]} {cell['formatted']}".strip()
+                    for cell in row['cells']
+                ]
+                + [
+                    totals['present_days'], totals['half_days'], totals['leave_days'],
+                    totals['weekoff_days'], totals['holiday_days'], totals['total_hours'],
+                ]
+            )
+        return response
+
+    for row in matrix['rows']:
+        for cell in row['cells']:
+            cell['code'] = ROSTER_MATRIX_CODES[cell['status']]
+
+    previous_start = (start_date - timedelta(days=1)).replace(day=1)
+    if period == 'quarter':
+        previous_start = date(previous_start.year, (previous_start.month - 1) // 3 * 3 + 1, 1)
+    next_start = end_date + timedelta(days=1)
+
+    context = {
+        'matrix': matrix,
+        'period': period,
+        'start_date': start_date,
+        'end_date': end_date,
+        'previous_start': previous_start,
+        'next_start': next_start,
+        'status_legend': [
+            (ROSTER_MATRIX_CODES[status], label)
+            for status, label in DailyRoster._meta.get_field('status').choices
+        ],
+        'title': 'Team Roster Matrix'
+    }
+
+    return render(request, 'projects/team_roster_matrix.html', context)
+
+
 @login_required
 def team_member_monthly_roster(request, team_member_id, year=None, month=None):
     """